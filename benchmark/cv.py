@@ -15,6 +15,7 @@ from skorch.dataset import Dataset
 from benchmark import model
 from kplex_pool import KPlexCover, CliqueCover
 from kplex_pool.utils import add_node_features
+from kplex_pool.data import BucketLoader, graph_sizes
 
 from sklearn.model_selection import StratifiedKFold, StratifiedShuffleSplit, ParameterGrid
 from sklearn.metrics import accuracy_score
@@ -124,6 +125,10 @@ if __name__ == "__main__":
     parser.add_argument('--inner_layers', type=int, default=2, metavar='L',
                         help="Number of layers within each convolutional block"
                              " (default: %(default)s).")
+    parser.add_argument('--bucket', action='store_true',
+                        help="Group the training graphs of similar size in the"
+                             " same batches, to reduce the padding of the dense"
+                             " layers (default: %(default)s).")
     parser.add_argument('--to_pickle', type=str, default='cv_results.pickle', metavar='PATH',
                         help="Path of the output pickle storing the history of the"
                              " cross-validation (default: %(default)s).")
@@ -193,6 +198,9 @@ if __name__ == "__main__":
         'module__num_layers': list(range(args.min_layers, args.max_layers + 1))
     }
 
+    if args.bucket:
+        shared_params.update(iterator_train=BucketLoader, iterator_train__sizes=graph_sizes(dataset))
+
     if args.model == 'KPlexPool':
         cover_fs = dict()
         cover = KPlexCover()
@@ -252,23 +260,31 @@ if __name__ == "__main__":
             gs_pbar.set_postfix({k.split('__')[1]: v for k, v in params.items()})
 
             if args.model == 'KPlexPool':
-                last_k = params.pop('module__k')
+                first_k = last_k = params.pop('module__k')
                 ks = [last_k]
 
-                for _ in range(2, params['module__num_layers']):
+                # The hierarchies of the shallower models are prefixes of the
+                # deepest one, whose layers are computed only when needed.
+                for _ in range(2, args.max_layers):
                     last_k = np.ceil(last_k*args.k_step_factor).astype(int)
                     ks.append(last_k)
-                
-                ks = tuple(ks)
-
-                if ks not in cover_fs:
-                    cover_fs[ks] = cover.get_cover_fun(ks, dataset,
-                                                       dense=args.dense_from if args.dense else False,
-                                                       q=args.q,
-                                                       edge_pool_op=args.edge_pool_op,
-                                                       simplify=args.simplify)
 
-                params['module__cover_fun'] = cover_fs[ks]
+                if first_k not in cover_fs:
+                    cover_fs[first_k] = cover.get_cover_fun(ks, dataset,
+                                                            dense=args.dense_from if args.dense else False,
+                                                            lazy_layers=True,
+                                                            q=args.q,
+                                                            edge_pool_op=args.edge_pool_op,
+                                                            simplify=args.simplify)
+
+                params['module__cover_fun'] = cover_fs[first_k]
+
+                if args.bucket:
+                    level = min(args.dense_from, params['module__num_layers'] - 1) if args.dense else 0
+                    params['iterator_train__sizes'] = torch.stack([
+                        graph_sizes(dataset), 
+                        graph_sizes(cover_fs[first_k].layer(level, covered=False))
+                    ], 1)
             
             net = NeuralNetClassifier(
                 train_split=predefined_split(valid_ds), 
@@ -14,7 +14,8 @@ from skorch.helper import predefined_split
 from benchmark import model
 from kplex_pool.utils import add_node_features
 from kplex_pool.kplex import KPlexCover
-from kplex_pool.data import NDPDataset, CustomDataset
+from kplex_pool.prefetch import HierarchyPrefetcher, PrefetchLoader, HierarchyLoader
+from kplex_pool.data import NDPDataset, CustomDataset, BucketLoader, graph_sizes
 
 from sklearn.model_selection import StratifiedShuffleSplit
 
@@ -92,13 +93,14 @@ if __name__ == "__main__":
                         help="Priority used to extract the pivot node (default:"
                              " %(default)s).",
                         choices=["random", "min_degree", "max_degree", "min_uncovered", 
-                                 "max_uncovered", "default"])
+                                 "max_uncovered", "min_core", "max_core", "default"])
     parser.add_argument('--kplex_priority', type=str, default='default',
                         help="Priority used to extract the next k-plex candidate"
                              " node (default: %(default)s).",
                         choices=["random", "min_degree", "max_degree", "min_uncovered", 
                                  "max_uncovered", "min_in_kplex", "max_in_kplex", 
-                                 "min_candidates", "max_candidates", "default"]) 
+                                 "min_candidates", "max_candidates", "min_core", "max_core",
+                                 "default"]) 
     parser.add_argument('--lr', type=float, default=0.001,
                         help="Learning rate (default: %(default)s).")
     parser.add_argument('--weight_decay', type=float, default=0.001, metavar='WD',
@@ -122,6 +124,38 @@ if __name__ == "__main__":
     parser.add_argument('--skip_covered', action='store_true',
                         help="Give max priority to uncovered nodes. Only applicable"
                              " to CoverPool")
+    parser.add_argument('--core_pruning', action='store_true',
+                        help="Use the core numbers of the nodes to prune the k-plex"
+                             " candidates. Only applicable to CoverPool")
+    parser.add_argument('--reorder', type=str, default=None, choices=['degree', 'rcm', 'bfs'],
+                        help="Relabel the nodes of every graph before covering it,"
+                             " to improve memory locality. Only applicable to"
+                             " CoverPool")
+    parser.add_argument('--int32', action='store_true',
+                        help="Compute the covers and coarsened graphs with"
+                             " int32 indices. Only applicable to CoverPool")
+    parser.add_argument('--lazy_dense', action='store_true',
+                        help="Densify the graphs of every batch separately,"
+                             " instead of padding the whole dataset. Only"
+                             " applicable to CoverPool")
+    parser.add_argument('--collated', action='store_true',
+                        help="Batch the sparse layers of the hierarchies from"
+                             " their concatenated tensors. Only applicable to"
+                             " CoverPool")
+    parser.add_argument('--prefetch', type=int, default=0, metavar='N',
+                        help="Build the hierarchies of the next N batches in a"
+                             " background thread. Only applicable to CoverPool"
+                             " (default: %(default)s).")
+    parser.add_argument('--workers', type=int, default=0, metavar='W',
+                        help="Assemble the batches of the precomputed"
+                             " hierarchies in W worker processes, sharing the"
+                             " hierarchies in memory. Only applicable to"
+                             " CoverPool, not with --no_cache (default:"
+                             " %(default)s).")
+    parser.add_argument('--bucket', action='store_true',
+                        help="Group the training graphs of similar size in the"
+                             " same batches, to reduce the padding of the dense"
+                             " layers.")
     parser.add_argument('--no_readout', action='store_false', 
                         help="Use only the final global pooling aggregation as input"
                              " to the dense layers.")
@@ -133,6 +167,9 @@ if __name__ == "__main__":
                              " will be ignored.")
     args = parser.parse_args()
 
+    if args.workers > 0 and not args.no_cache:
+        parser.error("--workers requires the precomputed hierarchies, not allowed with --no_cache")
+
     device = 'cuda' if torch.cuda.is_available() else 'cpu'
     torch.manual_seed(42)
     np.random.seed(42)
@@ -189,6 +226,8 @@ if __name__ == "__main__":
         'device': device
     }
 
+    sizes = [graph_sizes(dataset)]
+
     if args.model == 'CoverPool':
         ks = args.ks
 
@@ -200,13 +239,38 @@ if __name__ == "__main__":
                 last_k *= args.k_step_factor
                 ks.append(ceil(last_k))
 
-        kplex_cover = KPlexCover(args.cover_priority, args.kplex_priority, args.skip_covered)
+        kplex_cover = KPlexCover(args.cover_priority, args.kplex_priority, args.skip_covered,
+                                 args.core_pruning, reorder=args.reorder,
+                                 index_dtype=torch.int if args.int32 else torch.long)
+        hierarchy = None
+
+        if args.no_cache and args.bucket and args.dense:
+            hierarchy = kplex_cover.get_representations(dataset, ks, verbose=False, q=args.q,
+                                                        simplify=args.simplify,
+                                                        edge_pool_op=args.edge_pool_op)
+            sizes.append(graph_sizes(hierarchy[min(args.dense_from, len(ks))]))
+
         cover_fun = kplex_cover.get_cover_fun(ks, dataset if args.no_cache else None, 
                                               dense=args.dense_from if args.dense else False,
+                                              hierarchy=hierarchy,
+                                              lazy=args.lazy_dense,
+                                              collated=args.collated,
+                                              shared=args.workers > 0,
                                               q=args.q,
                                               simplify=args.simplify,
                                               edge_pool_op=args.edge_pool_op,
                                               verbose=True if args.no_cache else False)
+
+        if args.workers > 0:
+            params.update(iterator_train=HierarchyLoader, iterator_train__hierarchy=cover_fun,
+                          iterator_train__num_workers=args.workers,
+                          iterator_valid=HierarchyLoader, iterator_valid__hierarchy=cover_fun,
+                          iterator_valid__num_workers=args.workers)
+        elif args.prefetch > 0:
+            cover_fun = HierarchyPrefetcher(cover_fun, dataset, args.prefetch)
+            params.update(iterator_train=PrefetchLoader, iterator_train__prefetcher=cover_fun,
+                          iterator_valid=PrefetchLoader, iterator_valid__prefetcher=cover_fun)
+
         params.update(
             module__cover_fun=cover_fun,
             module__node_pool_op=args.node_pool_op,
@@ -221,4 +285,8 @@ if __name__ == "__main__":
     else:
         params.update(module__ratio=args.ratio)
 
+    if args.bucket:
+        loader_key = 'iterator_train__loader' if 'iterator_train' in params else 'iterator_train'
+        params.update({loader_key: BucketLoader, 'iterator_train__sizes': torch.stack(sizes, 1)})
+
     NeuralNetClassifier(**params).fit(X, y)
@@ -299,7 +299,10 @@ class CoverPool(BaseModel):
             if layer >= self.dense:
                 hierarchy.append(data.to(self.device))
             else:
-                hierarchy.append(Batch.from_data_list(data).to(self.device))
+                if not isinstance(data, Batch):
+                    data = Batch.from_data_list(data)
+
+                hierarchy.append(data.to(self.device))
         
         self.hierarchy = hierarchy
 
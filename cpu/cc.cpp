@@ -1,9 +1,10 @@
-#include <torch/extension.h>
+#include "cc.hpp"
 
 
 // Depth-first search algorithm.
-void dfs(int64_t from, int64_t current_component, at::TensorAccessor<int64_t, 1> components, 
-         std::vector<std::unordered_set<int64_t>>& neighbors, std::vector<bool>& found) {
+template<typename index_t>
+void dfs(index_t from, index_t current_component, at::TensorAccessor<index_t, 1> components, 
+         std::vector<std::unordered_set<index_t>>& neighbors, std::vector<bool>& found) {
     if (found[from])
         return;
 
@@ -17,27 +18,75 @@ void dfs(int64_t from, int64_t current_component, at::TensorAccessor<int64_t, 1>
 // Find the component of each node in the input graph. 
 at::Tensor connected_components(at::Tensor row, at::Tensor col, int64_t num_nodes) {
     auto components = at::zeros(num_nodes, row.options());
-    std::vector<std::unordered_set<int64_t>> neighbors(num_nodes);
-    std::vector<bool> found(num_nodes, false);
-    auto row_acc = row.accessor<int64_t, 1>(), col_acc = col.accessor<int64_t, 1>(), 
-        components_acc = components.accessor<int64_t, 1>();
-    int64_t current_component = 0;
-
-    for (auto i = 0; i < row.size(0); i++) {
-        neighbors[row_acc[i]].insert(col_acc[i]);
-    }
-
-    for (auto i = 0; i < num_nodes; i++) {
-        if (found[i])
-            continue;
-        
-        dfs(i, current_component, components_acc, neighbors, found);
-        ++current_component;
-    }
+
+    AT_DISPATCH_INDEX_TYPES(row.scalar_type(), "connected_components", [&] {
+        std::vector<std::unordered_set<index_t>> neighbors(num_nodes);
+        std::vector<bool> found(num_nodes, false);
+        auto row_acc = row.accessor<index_t, 1>(), col_acc = col.accessor<index_t, 1>(), 
+            components_acc = components.accessor<index_t, 1>();
+        index_t current_component = 0;
+
+        for (auto i = 0; i < row.size(0); i++) {
+            neighbors[row_acc[i]].insert(col_acc[i]);
+        }
+
+        for (index_t i = 0; i < num_nodes; i++) {
+            if (found[i])
+                continue;
+            
+            dfs<index_t>(i, current_component, components_acc, neighbors, found);
+            ++current_component;
+        }
+    });
+
+    return components;
+}
+
+// Same as `connected_components`, for graphs in compressed sparse row form.
+// The rows are visited directly, without building the adjacency sets.
+at::Tensor connected_components_csr(at::Tensor rowptr, at::Tensor col, int64_t num_nodes) {
+    auto components = at::zeros(num_nodes, col.options());
+    rowptr = rowptr.to(at::kLong);
+
+    AT_DISPATCH_INDEX_TYPES(col.scalar_type(), "connected_components_csr", [&] {
+        std::vector<bool> found(num_nodes, false);
+        std::vector<index_t> stack;
+        auto rowptr_acc = rowptr.accessor<int64_t, 1>();
+        auto col_acc = col.accessor<index_t, 1>(), components_acc = components.accessor<index_t, 1>();
+        index_t current_component = 0;
+
+        for (index_t i = 0; i < num_nodes; i++) {
+            if (found[i])
+                continue;
+
+            found[i] = true;
+            stack.push_back(i);
+
+            while (!stack.empty()) {
+                auto node = stack.back();
+                stack.pop_back();
+                components_acc[node] = current_component;
+
+                for (auto e = rowptr_acc[node]; e < rowptr_acc[node + 1]; e++) {
+                    if (!found[col_acc[e]]) {
+                        found[col_acc[e]] = true;
+                        stack.push_back(col_acc[e]);
+                    }
+                }
+            }
+
+            ++current_component;
+        }
+    });
 
     return components;
 }
 
+#ifndef KPLEX_POOL_LIBRARY
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
-    m.def("connected_components", &connected_components, "Connected Components (CPU)");
+    m.def("connected_components", &connected_components, "Connected Components (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("connected_components_csr", &connected_components_csr, "Connected Components, for CSR Graphs (CPU)",
+          py::call_guard<py::gil_scoped_release>());
 }
+#endif
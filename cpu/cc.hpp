@@ -0,0 +1,11 @@
+#ifndef __CC_HPP__
+#define __CC_HPP__
+
+#include <torch/extension.h>
+
+
+at::Tensor connected_components(at::Tensor row, at::Tensor col, int64_t num_nodes);
+
+at::Tensor connected_components_csr(at::Tensor rowptr, at::Tensor col, int64_t num_nodes);
+
+#endif  //__CC_HPP__
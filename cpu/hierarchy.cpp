@@ -0,0 +1,133 @@
+#include <torch/extension.h>
+#include "kplex.hpp"
+#include "pool_edges.hpp"
+#include "simplify.hpp"
+#include "cc.hpp"
+#include "reorder.hpp"
+
+
+// Promote the nodes that appear in too many k-plexes to singleton clusters.
+// Follows exactly `kplex_pool.utils.hub_promotion`: a node is a hub if the
+// number of k-plexes containing it is greater than the q-quantile of the
+// node covering index.
+std::tuple<at::Tensor, int64_t>
+hub_promotion(at::Tensor cover_index, double q, int64_t num_nodes, int64_t num_clusters) {
+    auto counts = at::bincount(cover_index[0], {}, num_nodes);
+    auto limit = at::quantile(counts.to(at::kDouble), q).item<double>();
+    auto mask = counts.le(limit);
+    auto keep = mask.index_select(0, cover_index[0]).nonzero().view(-1);
+    auto masked_index = cover_index.index_select(1, keep);
+    auto hub_index = mask.logical_not().nonzero().view(-1).to(cover_index.scalar_type());
+    auto out_clusters = num_clusters + hub_index.size(0);
+    auto hub_values = at::arange(num_clusters, out_clusters, cover_index.options());
+    auto out_index = at::cat({masked_index, at::stack({hub_index, hub_values})}, 1);
+
+    return std::make_tuple(out_index, out_clusters);
+}
+
+// Graph simplification, as in `kplex_pool.simplify.simplify`. The edges are
+// grouped by connected component in a single pass and every group is
+// simplified independently, keeping the same output order of the Python
+// version.
+std::tuple<at::Tensor, at::Tensor, at::Tensor>
+simplify_graph(at::Tensor row, at::Tensor col, at::Tensor weight, int64_t num_nodes) {
+    auto components = connected_components(row, col, num_nodes);
+    int64_t num_components = num_nodes > 0 ? components.max().item<int64_t>() + 1 : 0;
+    std::vector<int64_t> min_node(num_components, num_nodes), max_node(num_components, 0);
+    std::vector<std::vector<int64_t>> comp_edges(num_components);
+    std::vector<at::Tensor> out_row, out_col, out_weight;
+
+    AT_DISPATCH_INDEX_TYPES(row.scalar_type(), "simplify_graph", [&] {
+        auto comp_acc = components.accessor<index_t, 1>();
+        auto row_acc = row.accessor<index_t, 1>();
+
+        for (int64_t n = 0; n < num_nodes; ++n) {
+            auto c = comp_acc[n];
+            min_node[c] = std::min(min_node[c], n);
+            max_node[c] = std::max(max_node[c], n);
+        }
+
+        for (int64_t e = 0; e < row.size(0); ++e)
+            comp_edges[comp_acc[row_acc[e]]].push_back(e);
+    });
+
+    for (int64_t c = 0; c < num_components; ++c) {
+        auto edges = at::tensor(comp_edges[c], row.options().dtype(at::kLong));
+        auto r = row.index_select(0, edges).sub_(min_node[c]);
+        auto l = col.index_select(0, edges).sub_(min_node[c]);
+        auto w = weight.index_select(0, edges);
+
+        std::tie(r, l, w) = simplify_cutoff(r, l, w, max_node[c] - min_node[c] + 1, true);
+        out_row.push_back(r.add_(min_node[c]));
+        out_col.push_back(l.add_(min_node[c]));
+        out_weight.push_back(w);
+    }
+
+    if (out_row.empty())
+        return std::make_tuple(row.slice(0, 0, 0), col.slice(0, 0, 0), weight.slice(0, 0, 0));
+
+    return std::make_tuple(at::cat(out_row), at::cat(out_col), at::cat(out_weight));
+}
+
+// Build the whole hierarchy of coarsened graphs of a single graph, keeping the
+// intermediate graphs in native tensors. For every k in `ks`, returns the
+// cover index matrix of the current graph, its number of clusters and the
+// coarsened graph (edge index and weights). If `reorder` is given, the nodes
+// of every graph are relabeled before covering and pooling them, as done by
+// `KPlexCover.process`.
+std::vector<std::tuple<at::Tensor, int64_t, at::Tensor, at::Tensor>>
+build_hierarchy(at::Tensor row, at::Tensor col, at::Tensor weight, std::vector<int64_t> ks, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities,
+            bool skip_covered, bool core_pruning, c10::optional<int64_t> max_size,
+            c10::optional<int64_t> max_expansions, c10::optional<double> time_budget,
+            PoolOp pool_op, c10::optional<double> q, bool simplify, c10::optional<NodeOrder> reorder) {
+    std::vector<std::tuple<at::Tensor, int64_t, at::Tensor, at::Tensor>> layers;
+
+    for (auto k: ks) {
+        at::Tensor perm, rank, cover_row, in_row = row, in_col = col;
+
+        if (reorder.has_value()) {
+            perm = node_order(row, col, num_nodes, reorder.value());
+            rank = at::empty_like(perm).index_put_({perm}, at::arange(num_nodes, perm.options()));
+            in_row = rank.index_select(0, row);
+            in_col = rank.index_select(0, col);
+        }
+
+        auto cover_index = std::get<0>(kplex_cover(in_row, in_col, k, num_nodes, cover_priorities, kplex_priorities, 
+                                                   skip_covered, core_pruning, max_size, max_expansions, 
+                                                   time_budget));
+        int64_t num_clusters = cover_index.size(1) > 0 ? cover_index[1].max().item<int64_t>() + 1 : 0;
+
+        if (reorder.has_value())
+            cover_index = at::stack({perm.index_select(0, cover_index[0]), cover_index[1]});
+
+        if (q.has_value())
+            std::tie(cover_index, num_clusters) = hub_promotion(cover_index, q.value(), num_nodes, num_clusters);
+
+        cover_row = reorder.has_value() ? rank.index_select(0, cover_index[0]) : cover_index[0];
+
+        at::Tensor out_row, out_col, out_weight;
+        std::tie(out_row, out_col, out_weight) = pool_edges(cover_row, cover_index[1], in_row, in_col,
+                                                            weight, pool_op, num_nodes);
+
+        if (simplify)
+            std::tie(out_row, out_col, out_weight) = simplify_graph(out_row, out_col, out_weight, num_clusters);
+
+        layers.push_back(std::make_tuple(cover_index, num_clusters, at::stack({out_row, out_col}), out_weight));
+        row = out_row;
+        col = out_col;
+        weight = out_weight;
+        num_nodes = num_clusters;
+    }
+
+    return layers;
+}
+
+PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
+    m.def("build_hierarchy", &build_hierarchy, "Build Graph Hierarchy (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("hub_promotion", &hub_promotion, "Hub Promotion (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("simplify", &simplify_graph, "Simplify Graph (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+}
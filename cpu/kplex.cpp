@@ -1,27 +1,7 @@
-#include <torch/extension.h>
-
-
-// The numbering follows this convention:
-//  - 0x0-: Ascending order
-//  - 0x1-: Descending order
-//
-// Then:
-//  - 0x-0: Degree order
-//  - 0x-1: Uncovered neighbors order
-//  - 0x-2: Neighbors in k-plex order
-//  - 0x-3: Neighbors in candidate set order
-//  - 0x-4: Random order
-enum class NodePriority : unsigned char { 
-    MIN_DEGREE      = 0x00,
-    MAX_DEGREE      = 0x10, 
-    MIN_UNCOVERED   = 0x01, 
-    MAX_UNCOVERED   = 0x11, 
-    MAX_IN_KPLEX    = 0x02,
-    MIN_IN_KPLEX    = 0x12,
-    MIN_CANDIDATES  = 0x03,
-    MAX_CANDIDATES  = 0x13,
-    RANDOM          = 0x04
-};
+#include "kplex.hpp"
+#include <chrono>
+#include <random>
+
 
 // We need to know whether two NodePriorities use the same information to sort
 // the nodes, hence we distinguish them by their four least significant bits.
@@ -40,13 +20,34 @@ struct PriorityEqual {
     }
 };
 
-// We map each NodePriority to a vector of int64_t values, using Hash/Equals
-// the two previous structs. This allow us not to generate twice the same
-// information.
-using PriorityContainer = std::unordered_map<NodePriority, std::vector<int64_t>, PriorityHash, PriorityEqual>;
+// We map each NodePriority to a vector of values, using Hash/Equals the two
+// previous structs. This allow us not to generate twice the same information.
+// Node indices and priority values share the index type of the input graph
+// (int32 or int64), which is the template parameter of all the following
+// algorithms.
+template<typename index_t>
+using PriorityContainer = std::unordered_map<NodePriority, std::vector<index_t>, PriorityHash, PriorityEqual>;
 
 // Class used to compare two nodes by their priority.
-using Compare = std::function<bool(const int64_t&, const int64_t&)>;
+template<typename index_t>
+using Compare = std::function<bool(const index_t&, const index_t&)>;
+
+// Adjacency sets of the graph.
+template<typename index_t>
+using Neighbors = std::vector<std::unordered_set<index_t>>;
+
+// Bounds on the work done by FindKPlex and KPlexCover. Non-positive sizes
+// mean no bound.
+struct CoverLimits {
+    int64_t max_size;
+    int64_t max_expansions;
+    bool has_deadline;
+    std::chrono::steady_clock::time_point deadline;
+
+    bool expired() const {
+        return has_deadline && std::chrono::steady_clock::now() > deadline;
+    }
+};
 
 // From torch_cluster/cpu/utils.h by @rusty1s
 std::tuple<at::Tensor, at::Tensor> remove_self_loops(at::Tensor row, at::Tensor col) {
@@ -68,30 +69,180 @@ std::tuple<at::Tensor, at::Tensor> remove_self_loops(at::Tensor row, at::Tensor
 // one, can be put in a temporary bucket with highest priority.
 
 
+// Core decomposition of the graph (Batagelj and Zaversnik, 2003), in O(m).
+// Every node in a k-plex of size s has at least s - k neighbors within the
+// k-plex, hence its core number is at least s - k.
+template<typename index_t>
+std::vector<index_t> core_numbers(const Neighbors<index_t>& neighbors) {
+    index_t num_nodes = neighbors.size(), max_degree = 0;
+    std::vector<index_t> degree(num_nodes), pos(num_nodes), vert(num_nodes);
+
+    for (auto i = 0; i < num_nodes; ++i) {
+        degree[i] = neighbors[i].size();
+        max_degree = std::max(max_degree, degree[i]);
+    }
+
+    // Bucket-sort the nodes by degree. `bin[d]` is the starting position of
+    // the nodes with degree d in `vert`.
+    std::vector<index_t> bin(max_degree + 1, 0);
+
+    for (auto i = 0; i < num_nodes; ++i)
+        bin[degree[i]]++;
+
+    for (index_t d = 0, start = 0; d <= max_degree; ++d) {
+        auto count = bin[d];
+        bin[d] = start;
+        start += count;
+    }
+
+    for (auto i = 0; i < num_nodes; ++i) {
+        pos[i] = bin[degree[i]]++;
+        vert[pos[i]] = i;
+    }
+
+    for (auto d = max_degree; d > 0; --d)
+        bin[d] = bin[d - 1];
+
+    bin[0] = 0;
+
+    // Remove the nodes by increasing degree, decreasing the degree of their
+    // neighbors and moving them to the previous bucket.
+    for (auto i = 0; i < num_nodes; ++i) {
+        auto v = vert[i];
+
+        for (auto u: neighbors[v]) {
+            if (degree[u] > degree[v]) {
+                auto du = degree[u], pu = pos[u], pw = bin[du], w = vert[pw];
+
+                if (u != w) {
+                    pos[u] = pw;
+                    vert[pu] = w;
+                    pos[w] = pu;
+                    vert[pw] = u;
+                }
+
+                bin[du]++;
+                degree[u]--;
+            }
+        }
+    }
+
+    return degree;
+}
+
+// Preallocated buffers of FindKPlex, reused by every pivot of a cover. The
+// membership of a node to the candidate set or to the excluded set is marked
+// by stamping the node with the epoch of the current pivot, so that the sets
+// are cleared in O(1) by increasing the epoch. The candidates are kept in a
+// vector, and removed by swapping them with the last one.
+template<typename index_t>
+struct KPlexWorkspace {
+    std::vector<index_t> in_candidates, in_excluded;
+    std::vector<index_t> kplex, candidates, buffer;
+    index_t epoch = 0;
+
+    explicit KPlexWorkspace(index_t num_nodes)
+        : in_candidates(num_nodes, -1), in_excluded(num_nodes, -1) {}
+
+    void reset() {
+        ++epoch;
+        kplex.clear();
+        candidates.clear();
+    }
+
+    bool is_candidate(index_t n) const { return in_candidates[n] == epoch; }
+    bool is_excluded(index_t n) const { return in_excluded[n] == epoch; }
+
+    void exclude(index_t n) { in_excluded[n] = epoch; }
+
+    void add_candidate(index_t n) {
+        in_candidates[n] = epoch;
+        candidates.push_back(n);
+    }
+
+    // Remove the candidate at position `i`. The last candidate takes its
+    // place.
+    void remove_candidate(size_t i) {
+        in_candidates[candidates[i]] = -1;
+        candidates[i] = candidates.back();
+        candidates.pop_back();
+    }
+};
+
+// A cover stored as a flat list of nodes: the i-th k-plex is made of the
+// nodes in [offsets[i], offsets[i + 1]).
+template<typename index_t>
+struct FlatCover {
+    std::vector<index_t> nodes;
+    std::vector<int64_t> offsets = {0};
+
+    size_t size() const { return offsets.size() - 1; }
+
+    void close() { offsets.push_back(nodes.size()); }
+};
+
 // FindKPlex algorithm. Most of the code is needed to perform set operations
 // and to manage the priorities and their update. For a more simplified (and
-// more understendable) version, see the pseudocode in the article.
-std::unordered_set<int64_t> find_kplex(const std::vector<std::unordered_set<int64_t>>& neighbors, int64_t node, int64_t k, 
-            Compare kplex_cmp, PriorityContainer& priorities, const std::function<void(int64_t)>& node_callback) {
-    std::unordered_set<int64_t> excluded({node});
-    std::unordered_set<int64_t> kplex({node});
-    std::vector<int64_t>& missing_links = priorities[NodePriority::MAX_IN_KPLEX];
-    std::unordered_set<int64_t> candidates;
+// more understendable) version, see the pseudocode in the article. If `cores`
+// is not null, the candidates whose core number is too low to be part of a
+// larger k-plex are excluded as soon as possible. The search stops early if
+// the k-plex reaches the maximum size or the deadline expires, and no more
+// than `max_expansions` nodes are admitted to the candidate set. The sets
+// live in the workspace `ws`, and the k-plex is appended to `cover`.
+template<typename index_t>
+void find_kplex(const Neighbors<index_t>& neighbors, index_t node, int64_t k, 
+            const Compare<index_t>& kplex_cmp, PriorityContainer<index_t>& priorities, 
+            const std::function<void(index_t)>& node_callback,
+            const CoverLimits& limits, CoverStats& stats, KPlexWorkspace<index_t>& ws, FlatCover<index_t>& cover, 
+            const std::vector<index_t>* cores = nullptr) {
+    std::vector<index_t>& missing_links = priorities[NodePriority::MAX_IN_KPLEX];
+    std::vector<index_t>* num_candidates = priorities.count(NodePriority::MAX_CANDIDATES) ? 
+                                           &priorities[NodePriority::MAX_CANDIDATES] : nullptr;
+    const auto& n_neighbors = neighbors[node];
+    auto& candidates = ws.candidates;
+    bool capped = false;
+
+    ws.reset();
+    ws.kplex.push_back(node);
+    ws.exclude(node);
     missing_links[node] = 1;
 
-    for (auto n: neighbors[node]) {
+    for (auto n: n_neighbors)
         missing_links[n] = 0;
-        candidates.insert(n);
+
+    // If the neighborhood of the pivot is too large, keep only the neighbors
+    // with the highest priority.
+    if (limits.max_expansions > 0 && (int64_t) n_neighbors.size() > limits.max_expansions) {
+        ws.buffer.assign(n_neighbors.begin(), n_neighbors.end());
+        std::nth_element(ws.buffer.begin(), ws.buffer.begin() + limits.max_expansions, ws.buffer.end(), kplex_cmp);
+
+        for (auto it = ws.buffer.begin(); it != ws.buffer.begin() + limits.max_expansions; ++it)
+            ws.add_candidate(*it);
+
+        capped = true;
+    } else {
+        for (auto n: n_neighbors)
+            ws.add_candidate(n);
     }
 
+    int64_t expansions = candidates.size();
+
     while (!candidates.empty()) {
-        if (priorities.count(NodePriority::MAX_CANDIDATES)) {
+        if (limits.max_size > 0 && (int64_t) ws.kplex.size() >= limits.max_size) {
+            stats["size_cap"]++;
+            break;
+        }
+
+        if (limits.expired())
+            break;
+
+        if (num_candidates) {
             for (auto c: candidates) {
-                priorities[NodePriority::MAX_CANDIDATES][c] = 0;
+                (*num_candidates)[c] = 0;
 
                 for (auto cousin: neighbors[c])
-                    if (candidates.count(cousin) > 0) 
-                        priorities[NodePriority::MAX_CANDIDATES][c]++;
+                    if (ws.is_candidate(cousin)) 
+                        (*num_candidates)[c]++;
             }
         }
 
@@ -99,10 +250,10 @@ std::unordered_set<int64_t> find_kplex(const std::vector<std::unordered_set<int6
         // the efficency of the algorithm.
         auto min = std::min_element(candidates.begin(), candidates.end(), kplex_cmp);
         auto candidate = *min;
-        candidates.erase(min);
-        kplex.insert(candidate);
-        excluded.insert(candidate);
-        auto c_neighbors = neighbors[candidate];
+        ws.remove_candidate(min - candidates.begin());
+        ws.kplex.push_back(candidate);
+        ws.exclude(candidate);
+        const auto& c_neighbors = neighbors[candidate];
 
         node_callback(candidate);
 
@@ -110,17 +261,17 @@ std::unordered_set<int64_t> find_kplex(const std::vector<std::unordered_set<int6
         // neighobor. If not, increase its 'missing_links' counter. If its
         // value reaches k, remove all candidates that are not in its 
         // neighborhood.
-        for (auto n: kplex) {
+        for (auto n: ws.kplex) {
             if (!c_neighbors.count(n)) {
                 missing_links[n] += 1;
 
                 if (missing_links[n] == k) {
-                    for (auto it = candidates.begin(); it != candidates.end();) {
-                        if (!neighbors[n].count(*it)) {
-                            excluded.insert(*it);
-                            it = candidates.erase(it);
+                    for (size_t i = 0; i < candidates.size();) {
+                        if (!neighbors[n].count(candidates[i])) {
+                            ws.exclude(candidates[i]);
+                            ws.remove_candidate(i);
                         } else
-                            ++it;                        
+                            ++i;
                     }
                 }
             }
@@ -128,118 +279,199 @@ std::unordered_set<int64_t> find_kplex(const std::vector<std::unordered_set<int6
 
         // For each candidate, update the 'missing_links' counter. If it is
         // greater than k, remove it.
-        for (auto it = candidates.begin(); it != candidates.end();) {
-            if (!c_neighbors.count(*it) && ++missing_links[*it] >= k) {
-                excluded.insert(*it);
-                it = candidates.erase(it);
+        // Also remove the candidates that cannot be part of a k-plex larger
+        // than the current one.
+        for (size_t i = 0; i < candidates.size();) {
+            auto c = candidates[i];
+
+            if ((!c_neighbors.count(c) && ++missing_links[c] >= k) 
+                    || (cores && (*cores)[c] + k <= (int64_t) ws.kplex.size())) {
+                ws.exclude(c);
+                ws.remove_candidate(i);
             } else
-                ++it;
+                ++i;
         }
 
         // Add the neighbors of the new k-plex element to the candidate set, if
         // they have not been already excluded nor are already candidates.
         for (auto n: c_neighbors) {
-            if (excluded.count(n) + candidates.count(n) == 0) {
-                auto v = (int64_t) kplex.size();
-                auto cousins = neighbors[n];
+            if (!ws.is_excluded(n) && !ws.is_candidate(n)) {
+                if (limits.max_expansions > 0 && expansions >= limits.max_expansions) {
+                    capped = true;
+                    break;
+                }
+
+                auto v = (index_t) ws.kplex.size();
+                ++expansions;
+                const auto& cousins = neighbors[n];
 
-                for (auto c: kplex) 
+                for (auto c: ws.kplex) 
                     v -= cousins.count(c);
 
-                if (v < k) {
+                if (v < k && !(cores && (*cores)[n] + k <= (int64_t) ws.kplex.size())) {
                     missing_links[n] = v;
-                    candidates.insert(n);
+                    ws.add_candidate(n);
                 } else {
-                    excluded.insert(n);
+                    ws.exclude(n);
                 }
             }
         }
     }
 
-    return kplex;
+    if (capped)
+        stats["expansion_cap"]++;
+
+    cover.nodes.insert(cover.nodes.end(), ws.kplex.begin(), ws.kplex.end());
+    cover.close();
 }
 
 // Combine multiple priorities, generating a lexicographic ordering. Ascending
 // and descending ordering are defined by the `less` argument.
-template<typename T> 
-Compare make_comparer(const T& priority, Compare deafault_cmp, bool less = true) {
+template<typename index_t, typename T> 
+Compare<index_t> make_comparer(const T& priority, Compare<index_t> deafault_cmp, bool less = true) {
     if (less)
-        return Compare([=, &priority](const int64_t& lhs, const int64_t& rhs) {
+        return Compare<index_t>([=, &priority](const index_t& lhs, const index_t& rhs) {
             return priority[lhs] < priority[rhs] || (!(priority[lhs] > priority[rhs]) && deafault_cmp(lhs, rhs));
         });
 
-    return Compare([=, &priority](const int64_t& lhs, const int64_t& rhs) {
+    return Compare<index_t>([=, &priority](const index_t& lhs, const index_t& rhs) {
         return priority[lhs] > priority[rhs] || (!(priority[lhs] < priority[rhs]) && deafault_cmp(lhs, rhs));
     });
 }
 
-// Creates the comparer from the list of NodePriority.
-Compare build_comparer(const std::vector<std::unordered_set<int64_t>>& neighbors, 
-        const std::vector<NodePriority>& priority_types, PriorityContainer& priority_values) {
-    Compare cmp([](const int64_t& lhs, const int64_t& rhs){ return lhs < rhs; }); 
-    int64_t num_nodes = neighbors.size();
-
-    for (auto p = priority_types.crbegin(); p != priority_types.crend(); ++p) {
-        if (!priority_values.count(*p)) {
-            priority_values[*p] = std::vector<int64_t>(num_nodes);
-            
-            switch (*p) {
-            case NodePriority::RANDOM:
-                for (auto i = 0; i < num_nodes; ++i)
-                    priority_values[*p][i] = i;
-
-                std::random_shuffle(priority_values[*p].begin(), priority_values[*p].end());
-                break;
-
-            case NodePriority::MAX_DEGREE: 
-            case NodePriority::MIN_DEGREE:            
-            case NodePriority::MAX_UNCOVERED: 
-            case NodePriority::MIN_UNCOVERED: 
-                for (auto i = 0; i < num_nodes; ++i) 
-                    priority_values[*p][i] = (int64_t) neighbors[i].size();
-
-                break;
-            
-            default:
-                break;
-            }
-        }
+// Random engine used for the RANDOM priority. Every thread has its own
+// engine, so that concurrent covers (run without the GIL) do not share any
+// state.
+std::mt19937& random_engine() {
+    thread_local std::mt19937 engine(std::random_device{}());
+
+    return engine;
+}
+
+// Initialize the values of the given priorities, if they have not been
+// already generated.
+template<typename index_t>
+void init_priorities(const Neighbors<index_t>& neighbors, 
+        const std::vector<NodePriority>& priority_types, PriorityContainer<index_t>& priority_values) {
+    index_t num_nodes = neighbors.size();
+
+    for (auto p: priority_types) {
+        if (priority_values.count(p))
+            continue;
+
+        priority_values[p] = std::vector<index_t>(num_nodes);
         
-        cmp = make_comparer(priority_values[*p], cmp, !((unsigned char) *p & 0xF0));
+        switch (p) {
+        case NodePriority::RANDOM:
+            for (auto i = 0; i < num_nodes; ++i)
+                priority_values[p][i] = i;
+
+            std::shuffle(priority_values[p].begin(), priority_values[p].end(), random_engine());
+            break;
+
+        case NodePriority::MAX_DEGREE: 
+        case NodePriority::MIN_DEGREE:            
+        case NodePriority::MAX_UNCOVERED: 
+        case NodePriority::MIN_UNCOVERED: 
+            for (auto i = 0; i < num_nodes; ++i) 
+                priority_values[p][i] = (index_t) neighbors[i].size();
+
+            break;
+
+        case NodePriority::MAX_CORE:
+        case NodePriority::MIN_CORE:
+            priority_values[p] = core_numbers(neighbors);
+            break;
+        
+        default:
+            break;
+        }
     }
+}
+
+// Creates the comparer from the list of NodePriority. The priority values
+// must be already initialized (see `init_priorities`).
+template<typename index_t>
+Compare<index_t> build_comparer(const std::vector<NodePriority>& priority_types, PriorityContainer<index_t>& priority_values) {
+    Compare<index_t> cmp([](const index_t& lhs, const index_t& rhs){ return lhs < rhs; }); 
+
+    for (auto p = priority_types.crbegin(); p != priority_types.crend(); ++p)
+        cmp = make_comparer(priority_values[*p], cmp, !((unsigned char) *p & 0xF0));
 
     return cmp;
 }
 
-// KPlexCover algorithm. Most of the code is needed to perform set operations
-// and to manage the priorities and their update. For a more simplified (and
-// more understendable) version, see the pseudocode in the article.
-at::Tensor kplex_cover(at::Tensor row, at::Tensor col, int64_t k, int64_t num_nodes,
-            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
-            bool skip_covered = false) {
-    std::tie(row, col) = remove_self_loops(row, col);
-    std::vector<std::unordered_set<int64_t>> neighbors(num_nodes);
-    auto row_acc = row.accessor<int64_t, 1>(), col_acc = col.accessor<int64_t, 1>();
-    PriorityContainer priorities;
-    std::vector<bool> covered_nodes(num_nodes, false);
+// Build the adjacency sets of the graph, ignoring its self-loops. If
+// `self_loops` is false, the graph is known to have none.
+template<typename index_t>
+Neighbors<index_t> build_neighbors(at::Tensor row, at::Tensor col, index_t num_nodes, 
+            bool self_loops = true) {
+    if (self_loops)
+        std::tie(row, col) = remove_self_loops(row, col);
 
-    priorities[NodePriority::MAX_IN_KPLEX] = std::vector<int64_t>(num_nodes);
+    Neighbors<index_t> neighbors(num_nodes);
+    auto row_acc = row.accessor<index_t, 1>(), col_acc = col.accessor<index_t, 1>();
 
     for (auto i = 0; i < row.size(0); i++)
         neighbors[row_acc[i]].insert(col_acc[i]);
 
+    return neighbors;
+}
+
+// Build the adjacency sets of a graph in compressed sparse row form. Every set
+// is allocated once, with the size of the row.
+template<typename index_t>
+Neighbors<index_t> build_neighbors_csr(at::Tensor rowptr, at::Tensor col, index_t num_nodes, 
+            bool self_loops = true) {
+    Neighbors<index_t> neighbors(num_nodes);
+    auto rowptr_acc = rowptr.accessor<index_t, 1>(), col_acc = col.accessor<index_t, 1>();
+
+    for (index_t n = 0; n < num_nodes; n++) {
+        neighbors[n].reserve(rowptr_acc[n + 1] - rowptr_acc[n]);
+
+        for (auto e = rowptr_acc[n]; e < rowptr_acc[n + 1]; e++)
+            if (!self_loops || col_acc[e] != n)
+                neighbors[n].insert(col_acc[e]);
+    }
+
+    return neighbors;
+}
+
+// KPlexCover algorithm. Most of the code is needed to perform set operations
+// and to manage the priorities and their update. For a more simplified (and
+// more understendable) version, see the pseudocode in the article. The
+// priorities are taken by value, since they are modified during the
+// execution. When the time budget (in seconds) expires, every node that is
+// still uncovered becomes a singleton. The candidates whose priority changes
+// are moved within the ordered set without reallocating their nodes, so
+// that no allocation is done per pivot (apart from the amortized growth of
+// the cover).
+template<typename index_t>
+FlatCover<index_t> 
+cover_graph(const Neighbors<index_t>& neighbors, int64_t k,
+            const std::vector<NodePriority>& cover_priorities, const std::vector<NodePriority>& kplex_priorities, 
+            PriorityContainer<index_t> priorities, CoverStats& stats, bool skip_covered = false, bool core_pruning = false,
+            int64_t max_size = 0, int64_t max_expansions = 0, double time_budget = 0.) {
+    auto start = std::chrono::steady_clock::now();
+    CoverLimits limits = {max_size, max_expansions, time_budget > 0., 
+                          start + std::chrono::duration_cast<std::chrono::steady_clock::duration>(
+                              std::chrono::duration<double>(std::max(time_budget, 0.)))};
+    index_t num_nodes = neighbors.size();
+    std::vector<bool> covered_nodes(num_nodes, false);
+    const std::vector<index_t>* cores = core_pruning ? &priorities[NodePriority::MIN_CORE] : nullptr;
+
     // Two different comparers: one for KPlexCover, the other for FindKPlex
-    Compare cover_cmp = build_comparer(neighbors, cover_priorities, priorities); 
-    Compare kplex_cmp = build_comparer(neighbors, kplex_priorities, priorities); 
+    Compare<index_t> cover_cmp = build_comparer(cover_priorities, priorities); 
+    Compare<index_t> kplex_cmp = build_comparer(kplex_priorities, priorities); 
 
     // Give highest priority to uncovered nodes.
     if (skip_covered) 
         kplex_cmp = make_comparer(covered_nodes, kplex_cmp);
 
     // Ordered set. This adds an avoidable  O(log n).
-    std::set<int64_t, Compare> candidates(cover_cmp);
-    std::vector<std::unordered_set<int64_t>> cover;
-    int64_t output_dim = 0;
+    std::set<index_t, Compare<index_t>> candidates(cover_cmp);
+    KPlexWorkspace<index_t> ws(num_nodes);
+    FlatCover<index_t> cover;
 
     for (auto i = 0; i < num_nodes; ++i) {
         candidates.insert(i);
@@ -247,13 +479,12 @@ at::Tensor kplex_cover(at::Tensor row, at::Tensor col, int64_t k, int64_t num_no
 
     // Callback used to updata global priorities during the execution of
     // FindKPlex.
-    std::function<void(int64_t)> callback([&](int64_t node) {
+    std::function<void(index_t)> callback([&](index_t node) {
         candidates.erase(node);
 
         if (priorities.count(NodePriority::MIN_UNCOVERED) && !covered_nodes[node]) {
             for (auto cousin: neighbors[node]) {
-                if (candidates.count(cousin) > 0) {
-                    candidates.erase(cousin);
+                if (candidates.erase(cousin)) {
                     priorities[NodePriority::MIN_UNCOVERED][cousin] -= 1;
                     candidates.insert(cousin);
                 }
@@ -263,33 +494,131 @@ at::Tensor kplex_cover(at::Tensor row, at::Tensor col, int64_t k, int64_t num_no
         covered_nodes[node] = true;
     });
 
+    stats = {{"size_cap", 0}, {"expansion_cap", 0}, {"timeout_singletons", 0}};
+
     // Main loop.
     while (!candidates.empty()) {
+        if (limits.expired()) {
+            for (auto node: candidates) {
+                cover.nodes.push_back(node);
+                cover.close();
+            }
+
+            stats["timeout_singletons"] = candidates.size();
+            break;
+        }
+
         auto candidate = *(candidates.begin());
         candidates.erase(candidates.begin());
-        auto kplex = find_kplex(neighbors, candidate, k, kplex_cmp, priorities, callback);
-        output_dim += kplex.size();
-        cover.push_back(kplex);
+        find_kplex(neighbors, candidate, k, kplex_cmp, priorities, callback, limits, stats, ws, cover, cores);
     }
 
-    // Generate cover matrix.
-    auto index = at::zeros({2, output_dim}, row.options());
-    auto index_acc = index.accessor<int64_t, 2>();
-    auto idx = 0;
+    return cover;
+}
+
+// Generate the cover matrix, in sparse coordinate form.
+template<typename index_t>
+at::Tensor to_cover_index(const FlatCover<index_t>& cover, at::TensorOptions options) {
+    auto index = at::zeros({2, (int64_t) cover.nodes.size()}, options);
+    auto index_acc = index.accessor<index_t, 2>();
 
     for (size_t cover_id = 0; cover_id < cover.size(); ++cover_id) {
-        for (auto node: cover[cover_id]) {
-            index_acc[0][idx] = node;
+        for (auto idx = cover.offsets[cover_id]; idx < cover.offsets[cover_id + 1]; ++idx) {
+            index_acc[0][idx] = cover.nodes[idx];
             index_acc[1][idx] = cover_id;
-            ++idx;
         }
     }
 
     return index;
 }
 
+// Compute the k-plex cover of the graph for every given k. The adjacency sets
+// and the static priorities (core numbers included) are built only once and
+// shared by every cover. Every cover is returned along with the number of
+// times each work bound has been hit (the time budget applies to each cover).
+template<typename index_t>
+std::vector<std::tuple<at::Tensor, CoverStats>> 
+cover_neighbors(const Neighbors<index_t>& neighbors, const std::vector<int64_t>& ks, 
+            const std::vector<NodePriority>& cover_priorities, const std::vector<NodePriority>& kplex_priorities, 
+            bool skip_covered, bool core_pruning, c10::optional<int64_t> max_size, 
+            c10::optional<int64_t> max_expansions, c10::optional<double> time_budget, at::TensorOptions options) {
+    index_t num_nodes = neighbors.size();
+    PriorityContainer<index_t> priorities;
+    std::vector<std::tuple<at::Tensor, CoverStats>> out;
+
+    priorities[NodePriority::MAX_IN_KPLEX] = std::vector<index_t>(num_nodes);
+    init_priorities(neighbors, cover_priorities, priorities);
+    init_priorities(neighbors, kplex_priorities, priorities);
+
+    if (core_pruning)
+        init_priorities(neighbors, {NodePriority::MIN_CORE}, priorities);
+
+    for (auto k: ks) {
+        CoverStats stats;
+        auto cover = cover_graph(neighbors, k, cover_priorities, kplex_priorities, priorities, stats,
+                                 skip_covered, core_pruning, max_size.value_or(0), 
+                                 max_expansions.value_or(0), time_budget.value_or(0.));
+        out.push_back(std::make_tuple(to_cover_index(cover, options), stats));
+    }
+
+    return out;
+}
+
+// Compute the k-plex covers of a graph given in sparse coordinate form. The
+// native structures use the index type of the input (int32 or int64).
+std::vector<std::tuple<at::Tensor, CoverStats>> 
+kplex_cover_multi(at::Tensor row, at::Tensor col, std::vector<int64_t> ks, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
+            bool skip_covered, bool core_pruning, c10::optional<int64_t> max_size, 
+            c10::optional<int64_t> max_expansions, c10::optional<double> time_budget, bool self_loops) {
+    std::vector<std::tuple<at::Tensor, CoverStats>> out;
+
+    AT_DISPATCH_INDEX_TYPES(row.scalar_type(), "kplex_cover_multi", [&] {
+        out = cover_neighbors(build_neighbors<index_t>(row, col, num_nodes, self_loops), ks, cover_priorities, 
+                              kplex_priorities, skip_covered, core_pruning, max_size, max_expansions, 
+                              time_budget, row.options());
+    });
+
+    return out;
+}
+
+// Same as `kplex_cover_multi`, for graphs in compressed sparse row form.
+std::vector<std::tuple<at::Tensor, CoverStats>> 
+kplex_cover_csr(at::Tensor rowptr, at::Tensor col, std::vector<int64_t> ks, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
+            bool skip_covered, bool core_pruning, c10::optional<int64_t> max_size, 
+            c10::optional<int64_t> max_expansions, c10::optional<double> time_budget, bool self_loops) {
+    std::vector<std::tuple<at::Tensor, CoverStats>> out;
+
+    AT_DISPATCH_INDEX_TYPES(col.scalar_type(), "kplex_cover_csr", [&] {
+        out = cover_neighbors(build_neighbors_csr<index_t>(rowptr.to(col.scalar_type()), col, num_nodes, self_loops), 
+                              ks, cover_priorities, kplex_priorities, skip_covered, core_pruning, max_size, 
+                              max_expansions, time_budget, col.options());
+    });
+
+    return out;
+}
+
+std::tuple<at::Tensor, CoverStats> 
+kplex_cover(at::Tensor row, at::Tensor col, int64_t k, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
+            bool skip_covered, bool core_pruning, c10::optional<int64_t> max_size, 
+            c10::optional<int64_t> max_expansions, c10::optional<double> time_budget) {
+    return kplex_cover_multi(row, col, {k}, num_nodes, cover_priorities, kplex_priorities, 
+                             skip_covered, core_pruning, max_size, max_expansions, time_budget)[0];
+}
+
+template std::vector<int32_t> core_numbers(const Neighbors<int32_t>& neighbors);
+template std::vector<int64_t> core_numbers(const Neighbors<int64_t>& neighbors);
+
+#ifndef KPLEX_POOL_LIBRARY
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
-    m.def("kplex_cover", &kplex_cover, "K-plex Cover (CPU)");
+    m.def("kplex_cover", &kplex_cover, "K-plex Cover (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("kplex_cover_multi", &kplex_cover_multi, "K-plex Cover, for Multiple Values of K (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("kplex_cover_csr", &kplex_cover_csr, "K-plex Cover, for Multiple Values of K and CSR Graphs (CPU)",
+          py::call_guard<py::gil_scoped_release>());
 
     py::enum_<NodePriority>(m, "NodePriority")
         .value("random", NodePriority::RANDOM)
@@ -301,5 +630,8 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
         .value("max_in_kplex", NodePriority::MAX_IN_KPLEX)
         .value("min_candidates", NodePriority::MIN_CANDIDATES)
         .value("max_candidates", NodePriority::MAX_CANDIDATES)
+        .value("min_core", NodePriority::MIN_CORE)
+        .value("max_core", NodePriority::MAX_CORE)
         .export_values();
 }
+#endif
@@ -0,0 +1,67 @@
+#ifndef __KPLEX_HPP__
+#define __KPLEX_HPP__
+
+#include <torch/extension.h>
+#include <map>
+#include <string>
+
+
+// The numbering follows this convention:
+//  - 0x0-: Ascending order
+//  - 0x1-: Descending order
+//
+// Then:
+//  - 0x-0: Degree order
+//  - 0x-1: Uncovered neighbors order
+//  - 0x-2: Neighbors in k-plex order
+//  - 0x-3: Neighbors in candidate set order
+//  - 0x-4: Random order
+//  - 0x-5: Core number order
+enum class NodePriority : unsigned char { 
+    MIN_DEGREE      = 0x00,
+    MAX_DEGREE      = 0x10, 
+    MIN_UNCOVERED   = 0x01, 
+    MAX_UNCOVERED   = 0x11, 
+    MAX_IN_KPLEX    = 0x02,
+    MIN_IN_KPLEX    = 0x12,
+    MIN_CANDIDATES  = 0x03,
+    MAX_CANDIDATES  = 0x13,
+    RANDOM          = 0x04,
+    MIN_CORE        = 0x05,
+    MAX_CORE        = 0x15
+};
+
+// Number of times each work bound has been hit during the computation of a
+// cover (see `kplex_cover`).
+using CoverStats = std::map<std::string, int64_t>;
+
+std::tuple<at::Tensor, CoverStats> 
+kplex_cover(at::Tensor row, at::Tensor col, int64_t k, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
+            bool skip_covered = false, bool core_pruning = false, 
+            c10::optional<int64_t> max_size = c10::nullopt, 
+            c10::optional<int64_t> max_expansions = c10::nullopt, 
+            c10::optional<double> time_budget = c10::nullopt);
+
+std::vector<std::tuple<at::Tensor, CoverStats>> 
+kplex_cover_multi(at::Tensor row, at::Tensor col, std::vector<int64_t> ks, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
+            bool skip_covered = false, bool core_pruning = false, 
+            c10::optional<int64_t> max_size = c10::nullopt, 
+            c10::optional<int64_t> max_expansions = c10::nullopt, 
+            c10::optional<double> time_budget = c10::nullopt, 
+            bool self_loops = true);
+
+std::vector<std::tuple<at::Tensor, CoverStats>> 
+kplex_cover_csr(at::Tensor rowptr, at::Tensor col, std::vector<int64_t> ks, int64_t num_nodes,
+            std::vector<NodePriority> cover_priorities, std::vector<NodePriority> kplex_priorities, 
+            bool skip_covered = false, bool core_pruning = false, 
+            c10::optional<int64_t> max_size = c10::nullopt, 
+            c10::optional<int64_t> max_expansions = c10::nullopt, 
+            c10::optional<double> time_budget = c10::nullopt, 
+            bool self_loops = true);
+
+template<typename index_t>
+std::vector<index_t> core_numbers(const std::vector<std::unordered_set<index_t>>& neighbors);
+
+#endif  //__KPLEX_HPP__
@@ -0,0 +1,165 @@
+#include <torch/library.h>
+#include "kplex.hpp"
+#include "pool_edges.hpp"
+
+
+// Custom operators in the `kplex_pool` namespace (`torch.ops.kplex_pool`).
+// Unlike the pybind11 modules, they can be called from TorchScript. The
+// priorities and the aggregation functions are given by name, as in
+// `KPlexCover` and `cover_pool_edge`.
+
+std::vector<NodePriority> to_priorities(const c10::optional<std::vector<std::string>>& names,
+                                        const std::vector<NodePriority>& defaults) {
+    static const std::unordered_map<std::string, NodePriority> priorities = {
+        {"random", NodePriority::RANDOM},
+        {"min_degree", NodePriority::MIN_DEGREE},
+        {"max_degree", NodePriority::MAX_DEGREE},
+        {"min_uncovered", NodePriority::MIN_UNCOVERED},
+        {"max_uncovered", NodePriority::MAX_UNCOVERED},
+        {"min_in_kplex", NodePriority::MIN_IN_KPLEX},
+        {"max_in_kplex", NodePriority::MAX_IN_KPLEX},
+        {"min_candidates", NodePriority::MIN_CANDIDATES},
+        {"max_candidates", NodePriority::MAX_CANDIDATES},
+        {"min_core", NodePriority::MIN_CORE},
+        {"max_core", NodePriority::MAX_CORE}
+    };
+
+    if (!names.has_value())
+        return defaults;
+
+    std::vector<NodePriority> out;
+
+    for (const auto& name: names.value()) {
+        auto it = priorities.find(name);
+        TORCH_CHECK(it != priorities.end(), "Not a valid priority: ", name);
+        out.push_back(it->second);
+    }
+
+    return out;
+}
+
+PoolOp to_pool_op(const std::string& name) {
+    static const std::unordered_map<std::string, PoolOp> ops = {
+        {"max", PoolOp::MAX},
+        {"min", PoolOp::MIN},
+        {"mean", PoolOp::MEAN},
+        {"add", PoolOp::ADD},
+        {"mul", PoolOp::MUL}
+    };
+
+    auto it = ops.find(name);
+    TORCH_CHECK(it != ops.end(), "Not a valid operation: ", name);
+
+    return it->second;
+}
+
+// Same as `KPlexCover.__call__`, for a single graph. Returns only the cover
+// index matrix.
+at::Tensor kplex_cover_op(const at::Tensor& edge_index, int64_t k, int64_t num_nodes,
+            c10::optional<std::vector<std::string>> cover_priority,
+            c10::optional<std::vector<std::string>> kplex_priority, bool skip_covered, bool core_pruning) {
+    auto cover_priorities = to_priorities(cover_priority, {NodePriority::MIN_DEGREE, NodePriority::MIN_UNCOVERED});
+    auto kplex_priorities = to_priorities(kplex_priority, {NodePriority::MAX_IN_KPLEX, NodePriority::MAX_CANDIDATES,
+                                                           NodePriority::MAX_UNCOVERED});
+    auto index = edge_index.cpu();
+    auto cover_index = std::get<0>(kplex_cover(index[0], index[1], k, num_nodes, cover_priorities, kplex_priorities,
+                                               skip_covered, core_pruning));
+
+    return cover_index.to(edge_index.device());
+}
+
+// Same as `cover_pool_edge`.
+std::tuple<at::Tensor, at::Tensor>
+cover_pool_edge_op(const at::Tensor& cover_index, const at::Tensor& edge_index, const at::Tensor& edge_attr,
+            int64_t num_nodes, std::string pool) {
+    auto index = cover_index.cpu(), edges = edge_index.cpu();
+    at::Tensor out_row, out_col, out_weight;
+
+    std::tie(out_row, out_col, out_weight) = pool_edges(index[0], index[1], edges[0], edges[1], edge_attr.cpu(),
+                                                        to_pool_op(pool), num_nodes);
+
+    return std::make_tuple(at::stack({out_row, out_col}).to(edge_index.device()),
+                           out_weight.to(edge_attr.device()));
+}
+
+// Same as `cover_pool_node`. It is written in terms of differentiable ATen
+// operators, hence it supports autograd and any device.
+at::Tensor cover_pool_node_op(const at::Tensor& cover_index, const at::Tensor& x,
+            c10::optional<int64_t> num_clusters, std::string pool, bool dense,
+            const c10::optional<at::Tensor>& cover_mask) {
+    TORCH_CHECK(pool == "add" || pool == "mean" || pool == "max" || pool == "min",
+                "Not a valid operation: ", pool);
+
+    if (dense) {
+        auto out = x.dim() == 2 ? x.unsqueeze(0) : x;
+        auto s = cover_index.dim() == 2 ? cover_index.unsqueeze(0) : cover_index;
+        auto batch_size = s.size(0), clusters = s.size(2);
+
+        if (pool == "add" || pool == "mean") {
+            out = at::bmm(s.transpose(1, 2), out);
+
+            if (pool == "mean")
+                out = out / s.sum(1).unsqueeze(-1).clamp_min(1);
+        } else {
+            auto values = out.unsqueeze(2).repeat({1, 1, clusters, 1}) * s.unsqueeze(-1);
+            out = pool == "max" ? std::get<0>(values.max(1)) : std::get<0>(values.min(1));
+        }
+
+        if (cover_mask.has_value())
+            out = out * cover_mask.value().view({batch_size, clusters, 1}).to(x.scalar_type());
+
+        return out;
+    }
+
+    auto index = cover_index[1].to(at::kLong);
+    auto size = x.sizes().vec();
+    size[0] = num_clusters.has_value() ? num_clusters.value() : index.max().item<int64_t>() + 1;
+
+    auto xs = x.index_select(0, cover_index[0]);
+    auto out = at::zeros(size, x.options());
+
+    if (pool == "add" || pool == "mean") {
+        out = out.index_add(0, index, xs);
+
+        if (pool == "mean") {
+            auto counts = at::bincount(index, {}, size[0]).clamp_min(1).to(x.scalar_type());
+            std::vector<int64_t> shape(x.dim(), 1);
+            shape[0] = size[0];
+            out = out / counts.view(shape);
+        }
+
+        return out;
+    }
+
+    // Reduce the contiguous rows of every cluster, after sorting them by
+    // cluster (empty clusters are left to zero).
+    auto perm = std::get<1>(index.sort());
+    auto sorted = xs.index_select(0, perm);
+    auto counts = at::bincount(index, {}, size[0]).cpu();
+    auto counts_acc = counts.accessor<int64_t, 1>();
+    int64_t start = 0;
+
+    for (int64_t c = 0; c < size[0]; ++c) {
+        auto count = counts_acc[c];
+
+        if (count > 0) {
+            auto rows = sorted.narrow(0, start, count);
+            out.select(0, c).copy_(pool == "max" ? std::get<0>(rows.max(0)) : std::get<0>(rows.min(0)));
+            start += count;
+        }
+    }
+
+    return out;
+}
+
+TORCH_LIBRARY(kplex_pool, m) {
+    m.def("kplex_cover(Tensor edge_index, int k, int num_nodes, str[]? cover_priority=None, "
+          "str[]? kplex_priority=None, bool skip_covered=False, bool core_pruning=False) -> Tensor",
+          &kplex_cover_op);
+    m.def("cover_pool_edge(Tensor cover_index, Tensor edge_index, Tensor edge_attr, int num_nodes, "
+          "str pool=\"add\") -> (Tensor, Tensor)", &cover_pool_edge_op);
+    m.def("cover_pool_node(Tensor cover_index, Tensor x, int? num_clusters=None, str pool=\"add\", "
+          "bool dense=False, Tensor? cover_mask=None) -> Tensor", &cover_pool_node_op);
+}
+
+PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {}
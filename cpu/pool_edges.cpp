@@ -1,32 +1,32 @@
-#include <torch/extension.h>
+#include "pool_edges.hpp"
 
 
-enum class PoolOp {MAX, MIN, MEAN, ADD, MUL};
-
 // Aggregate all the edges from one k-plex to another. This is done by
 // iterating all the edges and, instead of creating a copy for each k-plex
 // pair on the endvertices of each edge, exploits the order-invariance of
 // the aggregation functions and keeps only the partial aggregation inside
-// an unordered_map, having as index a pair of k-plex indices. 
+// an unordered_map, having as index a pair of k-plex indices. The edges are
+// enumerated by `for_each_edge`, which calls its argument on the source,
+// target and position of every edge. The output indices have the same type
+// of the cover assignment (int32 or int64).
+template<typename index_t, typename EdgeVisitor>
 std::tuple<at::Tensor, at::Tensor, at::Tensor> 
-pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tensor col, 
-        at::Tensor weight, PoolOp pool_op, int64_t num_nodes) {
-    auto row_acc = row.accessor<int64_t, 1>();
-    auto col_acc = col.accessor<int64_t, 1>();
-    auto idx_row_acc = index_row.accessor<int64_t, 1>();
-    auto idx_col_acc = index_col.accessor<int64_t, 1>();
+pool_edges_impl(at::Tensor index_row, at::Tensor index_col, at::TensorOptions options, 
+        at::Tensor weight, PoolOp pool_op, int64_t num_nodes, EdgeVisitor for_each_edge) {
+    auto idx_row_acc = index_row.accessor<index_t, 1>();
+    auto idx_col_acc = index_col.accessor<index_t, 1>();
     at::Tensor out_row, out_col, out_weight;
 
-    std::unordered_map<int64_t, std::unordered_set<int64_t>> node_clusters;
+    std::unordered_map<index_t, std::unordered_set<index_t>> node_clusters;
 
     for (auto i = 0; i < index_row.size(0); i++) {
         if (!node_clusters.count(idx_row_acc[i]))
-            node_clusters[idx_row_acc[i]] = std::unordered_set<int64_t>({idx_col_acc[i]});
+            node_clusters[idx_row_acc[i]] = std::unordered_set<index_t>({idx_col_acc[i]});
         else 
             node_clusters[idx_row_acc[i]].insert(idx_col_acc[i]);
     }
 
-    auto edge_hash = [=](const std::pair<int64_t, int64_t>& p) {
+    auto edge_hash = [=](const std::pair<index_t, index_t>& p) {
         auto l = p.first, r = p.second;
 
         return (size_t) l*num_nodes + r;
@@ -34,8 +34,8 @@ pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tenso
 
     AT_DISPATCH_ALL_TYPES(weight.type(), "pool_edges", [&] {
         auto weight_acc = weight.accessor<scalar_t, 1>();
-        std::unordered_map<std::pair<int64_t, int64_t>, scalar_t, decltype(edge_hash)> out_edges(0, edge_hash);
-        std::unordered_map<std::pair<int64_t, int64_t>, scalar_t, decltype(edge_hash)> out_edge_count(0, edge_hash);
+        std::unordered_map<std::pair<index_t, index_t>, scalar_t, decltype(edge_hash)> out_edges(0, edge_hash);
+        std::unordered_map<std::pair<index_t, index_t>, scalar_t, decltype(edge_hash)> out_edge_count(0, edge_hash);
         std::function<scalar_t(scalar_t, scalar_t)> pool_fun;
 
         switch (pool_op) {
@@ -57,11 +57,12 @@ pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tenso
                 break;
         }
 
-        for (auto i = 0; i < row.size(0); i++) {
-            if (row_acc[i] == col_acc[i])
-                continue;
+        for_each_edge([&](index_t source, index_t target, int64_t i) {
+            if (source == target)
+                return;
 
-            auto c_from = node_clusters[row_acc[i]], c_to = node_clusters[col_acc[i]];
+            const auto& c_from = node_clusters[source];
+            const auto& c_to = node_clusters[target];
 
             for (auto l_node: c_from) {
                 for (auto r_node: c_to) {
@@ -81,13 +82,13 @@ pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tenso
                     }
                 }
             }
-        }
+        });
 
         auto size = out_edges.size();
-        out_row = at::zeros(size, row.options());
-        auto out_row_acc = out_row.accessor<int64_t, 1>();
-        out_col = at::zeros(size, col.options());
-        auto out_col_acc = out_col.accessor<int64_t, 1>();
+        out_row = at::zeros(size, options);
+        auto out_row_acc = out_row.accessor<index_t, 1>();
+        out_col = at::zeros(size, options);
+        auto out_col_acc = out_col.accessor<index_t, 1>();
         out_weight = at::zeros(size, weight.options());
         auto out_weight_acc = out_weight.accessor<scalar_t, 1>();
         auto count = 0;
@@ -113,8 +114,57 @@ pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tenso
     return std::make_tuple(out_row, out_col, out_weight);
 }
 
+std::tuple<at::Tensor, at::Tensor, at::Tensor> 
+pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tensor col, 
+        at::Tensor weight, PoolOp pool_op, int64_t num_nodes) {
+    std::tuple<at::Tensor, at::Tensor, at::Tensor> out;
+    index_row = index_row.to(row.scalar_type());
+    index_col = index_col.to(row.scalar_type());
+
+    AT_DISPATCH_INDEX_TYPES(row.scalar_type(), "pool_edges", [&] {
+        auto row_acc = row.accessor<index_t, 1>();
+        auto col_acc = col.accessor<index_t, 1>();
+
+        out = pool_edges_impl<index_t>(index_row, index_col, row.options(), weight, pool_op, num_nodes, 
+                                       [&](auto visit) {
+            for (int64_t i = 0; i < row.size(0); i++)
+                visit(row_acc[i], col_acc[i], i);
+        });
+    });
+
+    return out;
+}
+
+// Same as `pool_edges`, for graphs in compressed sparse row form.
+std::tuple<at::Tensor, at::Tensor, at::Tensor> 
+pool_edges_csr(at::Tensor index_row, at::Tensor index_col, at::Tensor rowptr, at::Tensor col, 
+        at::Tensor weight, PoolOp pool_op, int64_t num_nodes) {
+    std::tuple<at::Tensor, at::Tensor, at::Tensor> out;
+    index_row = index_row.to(col.scalar_type());
+    index_col = index_col.to(col.scalar_type());
+    rowptr = rowptr.to(at::kLong);
+
+    AT_DISPATCH_INDEX_TYPES(col.scalar_type(), "pool_edges_csr", [&] {
+        auto rowptr_acc = rowptr.accessor<int64_t, 1>();
+        auto col_acc = col.accessor<index_t, 1>();
+
+        out = pool_edges_impl<index_t>(index_row, index_col, col.options(), weight, pool_op, num_nodes, 
+                                       [&](auto visit) {
+            for (index_t n = 0; n < rowptr.size(0) - 1; n++)
+                for (auto e = rowptr_acc[n]; e < rowptr_acc[n + 1]; e++)
+                    visit(n, col_acc[e], e);
+        });
+    });
+
+    return out;
+}
+
+#ifndef KPLEX_POOL_LIBRARY
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
-    m.def("pool_edges", &pool_edges, "Pool Edges (CPU)");
+    m.def("pool_edges", &pool_edges, "Pool Edges (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+    m.def("pool_edges_csr", &pool_edges_csr, "Pool Edges, for CSR Graphs (CPU)",
+          py::call_guard<py::gil_scoped_release>());
     
     py::enum_<PoolOp>(m, "PoolOp")
         .value("max", PoolOp::MAX)    
@@ -124,3 +174,4 @@ PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
         .value("mul", PoolOp::MUL)  
         .export_values();
 }
+#endif
@@ -0,0 +1,17 @@
+#ifndef __POOL_EDGES_HPP__
+#define __POOL_EDGES_HPP__
+
+#include <torch/extension.h>
+
+
+enum class PoolOp {MAX, MIN, MEAN, ADD, MUL};
+
+std::tuple<at::Tensor, at::Tensor, at::Tensor> 
+pool_edges(at::Tensor index_row, at::Tensor index_col, at::Tensor row, at::Tensor col, 
+        at::Tensor weight, PoolOp pool_op, int64_t num_nodes);
+
+std::tuple<at::Tensor, at::Tensor, at::Tensor> 
+pool_edges_csr(at::Tensor index_row, at::Tensor index_col, at::Tensor rowptr, at::Tensor col, 
+        at::Tensor weight, PoolOp pool_op, int64_t num_nodes);
+
+#endif  //__POOL_EDGES_HPP__
@@ -0,0 +1,97 @@
+#include "reorder.hpp"
+#include <queue>
+
+
+// Breadth-first visit of every component of the graph, starting from the
+// nodes in the given order. Neighbors are visited in adjacency order.
+void bfs(const std::vector<std::vector<int64_t>>& neighbors, const std::vector<int64_t>& roots, 
+         std::vector<int64_t>& order) {
+    std::vector<bool> found(neighbors.size(), false);
+    std::queue<int64_t> queue;
+
+    for (auto root: roots) {
+        if (found[root])
+            continue;
+
+        found[root] = true;
+        queue.push(root);
+
+        while (!queue.empty()) {
+            auto node = queue.front();
+            queue.pop();
+            order.push_back(node);
+
+            for (auto n: neighbors[node]) {
+                if (!found[n]) {
+                    found[n] = true;
+                    queue.push(n);
+                }
+            }
+        }
+    }
+}
+
+// Compute a permutation of the nodes that improves the locality of the
+// accesses to the node-indexed arrays: nodes sorted by decreasing degree
+// (DEGREE), Reverse Cuthill-McKee (RCM), or breadth-first order (BFS). The
+// i-th value of the output is the (old) index of the i-th node in the new
+// order.
+at::Tensor node_order(at::Tensor row, at::Tensor col, int64_t num_nodes, NodeOrder method) {
+    std::vector<std::vector<int64_t>> neighbors(num_nodes);
+    std::vector<int64_t> nodes(num_nodes), order;
+
+    AT_DISPATCH_INDEX_TYPES(row.scalar_type(), "node_order", [&] {
+        auto row_acc = row.accessor<index_t, 1>(), col_acc = col.accessor<index_t, 1>();
+
+        for (auto i = 0; i < row.size(0); i++)
+            if (row_acc[i] != col_acc[i])
+                neighbors[row_acc[i]].push_back(col_acc[i]);
+    });
+
+    for (auto i = 0; i < num_nodes; i++)
+        nodes[i] = i;
+
+    auto by_degree = [&](const int64_t& lhs, const int64_t& rhs) {
+        return neighbors[lhs].size() < neighbors[rhs].size();
+    };
+
+    switch (method) {
+        case NodeOrder::DEGREE:
+            std::stable_sort(nodes.begin(), nodes.end(), [&](const int64_t& lhs, const int64_t& rhs) {
+                return by_degree(rhs, lhs);
+            });
+            order = nodes;
+            break;
+
+        case NodeOrder::RCM:
+            std::stable_sort(nodes.begin(), nodes.end(), by_degree);
+
+            for (auto& n_neighbors: neighbors)
+                std::stable_sort(n_neighbors.begin(), n_neighbors.end(), by_degree);
+
+            order.reserve(num_nodes);
+            bfs(neighbors, nodes, order);
+            std::reverse(order.begin(), order.end());
+            break;
+
+        case NodeOrder::BFS:
+            order.reserve(num_nodes);
+            bfs(neighbors, nodes, order);
+            break;
+    }
+
+    return at::tensor(order, row.options());
+}
+
+#ifndef KPLEX_POOL_LIBRARY
+PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
+    m.def("node_order", &node_order, "Node Order (CPU)",
+          py::call_guard<py::gil_scoped_release>());
+
+    py::enum_<NodeOrder>(m, "NodeOrder")
+        .value("degree", NodeOrder::DEGREE)
+        .value("rcm", NodeOrder::RCM)
+        .value("bfs", NodeOrder::BFS)
+        .export_values();
+}
+#endif
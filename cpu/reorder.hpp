@@ -0,0 +1,11 @@
+#ifndef __REORDER_HPP__
+#define __REORDER_HPP__
+
+#include <torch/extension.h>
+
+
+enum class NodeOrder { DEGREE, RCM, BFS };
+
+at::Tensor node_order(at::Tensor row, at::Tensor col, int64_t num_nodes, NodeOrder method);
+
+#endif  //__REORDER_HPP__
@@ -1,4 +1,4 @@
-#include <torch/extension.h>
+#include "simplify.hpp"
 #include "disjoint_sets.hpp"
 
 
@@ -16,28 +16,34 @@ sort_by_weight(at::Tensor row, at::Tensor col, at::Tensor weight, bool descendin
 // the graph connectivity by using a disjoint-set (or union-find) data
 // structure (a-la Kruskal).
 std::tuple<at::Tensor, at::Tensor, at::Tensor> 
-simplify_cutoff(at::Tensor row, at::Tensor col, at::Tensor weight, int64_t num_nodes, bool max = true) {
+simplify_cutoff(at::Tensor row, at::Tensor col, at::Tensor weight, int64_t num_nodes, bool max) {
     std::tie(row, col, weight) = sort_by_weight(row, col, weight, max);
-    auto row_acc = row.accessor<int64_t, 1>();
-    auto col_acc = col.accessor<int64_t, 1>();
     DisjointSets disjoint_sets(num_nodes);
     int64_t i = 0, max_size = 1;
 
-    AT_DISPATCH_ALL_TYPES(weight.type(), "simplify_cutoff", [&] {
-        auto weight_acc = weight.accessor<scalar_t, 1>();
-
-        // Add edges to the graph from most important to least important until the graph becomes
-        // connected. Continue adding edges if last weight is the same as the next node.
-        for (i = 0; i < weight_acc.size(0) && (max_size < num_nodes 
-                    || (i > 0 && weight_acc[i] == weight_acc[i - 1])); ++i) {
-            auto size = disjoint_sets.merge(row_acc[i], col_acc[i]);
-            max_size = std::max(size, max_size);
-        }
+    AT_DISPATCH_INDEX_TYPES(row.scalar_type(), "simplify_cutoff", [&] {
+        auto row_acc = row.accessor<index_t, 1>();
+        auto col_acc = col.accessor<index_t, 1>();
+
+        AT_DISPATCH_ALL_TYPES(weight.scalar_type(), "simplify_cutoff", [&] {
+            auto weight_acc = weight.accessor<scalar_t, 1>();
+
+            // Add edges to the graph from most important to least important until the graph becomes
+            // connected. Continue adding edges if last weight is the same as the next node.
+            for (i = 0; i < weight_acc.size(0) && (max_size < num_nodes 
+                        || (i > 0 && weight_acc[i] == weight_acc[i - 1])); ++i) {
+                auto size = disjoint_sets.merge(row_acc[i], col_acc[i]);
+                max_size = std::max(size, max_size);
+            }
+        });
     });
 
     return std::make_tuple(row.slice(0, 0, i), col.slice(0, 0, i), weight.slice(0, 0, i));
 }
 
+#ifndef KPLEX_POOL_LIBRARY
 PYBIND11_MODULE(TORCH_EXTENSION_NAME, m) {
-    m.def("simplify_cutoff", &simplify_cutoff, "Simplify Graph: Remove Least Important Edges (CPU)");
+    m.def("simplify_cutoff", &simplify_cutoff, "Simplify Graph: Remove Least Important Edges (CPU)",
+          py::call_guard<py::gil_scoped_release>());
 }
+#endif
@@ -0,0 +1,10 @@
+#ifndef __SIMPLIFY_HPP__
+#define __SIMPLIFY_HPP__
+
+#include <torch/extension.h>
+
+
+std::tuple<at::Tensor, at::Tensor, at::Tensor> 
+simplify_cutoff(at::Tensor row, at::Tensor col, at::Tensor weight, int64_t num_nodes, bool max = true);
+
+#endif  //__SIMPLIFY_HPP__
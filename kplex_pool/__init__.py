@@ -1,16 +1,21 @@
-from .kplex import KPlexCover, CliqueCover
+from .kplex import KPlexCover, CliqueCover, HierarchyTransform, LazyHierarchy
+from .dynamic import DynamicCover
 from .pool import cover_pool_node, cover_pool_edge
 from .cc import connected_components
 from .simplify import simplify
-from . import data, utils
+from . import data, utils, ops
 
 __all__ = [
     'KPlexCover',
     'CliqueCover',
+    'HierarchyTransform',
+    'LazyHierarchy',
+    'DynamicCover',
     'cover_pool_node',
     'cover_pool_edge',
     'simplify',
     'connected_components',
     'data',
-    'utils'
+    'utils',
+    'ops'
 ]
@@ -0,0 +1,93 @@
+import torch
+from torch_sparse import SparseTensor
+
+
+def is_edge_index(adj):
+    """Check whether a given adjacency is an edge coordinate matrix.
+
+    Args:
+        adj (LongTensor, SparseTensor or tuple): A graph adjacency.
+
+    Returns:
+        bool: `True` if `adj` is in sparse COO matrix form.
+    """
+    return torch.is_tensor(adj)
+
+
+def num_nodes_of(adj, num_nodes=None):
+    """Return the number of nodes of a given graph adjacency.
+
+    Args:
+        adj (LongTensor, SparseTensor or tuple): Edge coordinate matrix,
+            sparse adjacency matrix or CSR pair `(rowptr, col)`.
+        num_nodes (int, optional): Number of nodes. If not `None`, it is
+            returned as is. Defaults to `None`.
+
+    Returns:
+        int: The number of nodes.
+    """
+    if num_nodes is not None:
+        return int(num_nodes)
+
+    if isinstance(adj, SparseTensor):
+        return adj.size(0)
+
+    if not is_edge_index(adj):
+        return adj[0].numel() - 1
+
+    return adj.max().item() + 1
+
+
+def to_csr(adj, num_nodes=None, coalesced=False):
+    """Return the compressed sparse row form of a given graph adjacency, if
+    it can be obtained without sorting the edges.
+
+    Args:
+        adj (LongTensor, SparseTensor or tuple): Edge coordinate matrix,
+            sparse adjacency matrix or CSR pair `(rowptr, col)`.
+        num_nodes (int, optional): Number of nodes. Defaults to `None`.
+        coalesced (bool, optional): The edge coordinate matrix is already
+            sorted by row. Defaults to `False`.
+
+    Returns:
+        (LongTensor, LongTensor) or None: The CSR pair `(rowptr, col)`, or
+            `None` if `adj` is an unsorted edge coordinate matrix.
+    """
+    if isinstance(adj, SparseTensor):
+        rowptr, col, _ = adj.csr()
+
+        return rowptr, col
+
+    if not is_edge_index(adj):
+        return tuple(adj)
+
+    if not coalesced:
+        return None
+
+    deg = adj[0].bincount(minlength=num_nodes_of(adj, num_nodes))
+
+    return torch.cat([deg.new_zeros(1), deg.cumsum(0)]), adj[1]
+
+
+def to_edge_index(adj):
+    """Return the edge coordinate matrix of a given graph adjacency.
+
+    Args:
+        adj (LongTensor, SparseTensor or tuple): Edge coordinate matrix,
+            sparse adjacency matrix or CSR pair `(rowptr, col)`.
+
+    Returns:
+        LongTensor: The edge coordinate matrix.
+    """
+    if isinstance(adj, SparseTensor):
+        row, col, _ = adj.coo()
+
+        return torch.stack([row, col])
+
+    if not is_edge_index(adj):
+        rowptr, col = adj
+        row = torch.arange(rowptr.numel() - 1, device=col.device)
+
+        return torch.stack([row.repeat_interleave(rowptr[1:] - rowptr[:-1]), col])
+
+    return adj
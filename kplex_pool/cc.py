@@ -1,19 +1,30 @@
 import torch
 import torch_sparse
 from kplex_pool import kplex_cpu, cc_cpu
+from kplex_pool.adjacency import num_nodes_of, to_csr
 
-def connected_components(edge_index, num_nodes=None):
+def connected_components(edge_index, num_nodes=None, coalesced=False):
     """Find the connected components of a given graph.
     
     Args:
-        edge_index (LongTensor): Edge coordinate matrix.
+        edge_index (LongTensor, SparseTensor or tuple): Edge coordinate 
+            matrix, sparse adjacency matrix or CSR pair `(rowptr, col)`.
         num_nodes (int, optional): Number of nodes. Defaults to None.
+        coalesced (bool, optional): The edge coordinate matrix is already
+            sorted by row, so that the rows can be visited directly. 
+            Defaults to `False`.
     
     Returns:
         LongTensor: Vector assigning each node to its component index.
     """
-    if num_nodes is None:
-        num_nodes = edge_index.max().item() + 1
+    num_nodes = num_nodes_of(edge_index, num_nodes)
+    csr = to_csr(edge_index, num_nodes, coalesced)
+
+    if csr is not None:
+        rowptr, col = csr
+        out = cc_cpu.connected_components_csr(rowptr.cpu(), col.cpu(), rowptr.numel() - 1)
+
+        return out.to(col.device)
 
     device = edge_index.device
     row, col = edge_index.cpu()
@@ -1,7 +1,9 @@
+import copy
 import numpy as np
 from os import path
 
 import torch
+from torch.utils.data import DataLoader, Sampler
 from torch.utils.data.dataloader import default_collate
 
 from torch_geometric.data import Data, Batch, InMemoryDataset, Dataset, download_url
@@ -19,18 +21,22 @@ class Cover(Data):
             cover. Defaults to None.
         num_clusters (int, optional): Number of k-plexes in the cover matrix. 
             Defaults to None.
+
+    Unlike `Data`, both `cover_index` and `edge_index` can also be stored as
+    int32 tensors.
     """
-    def __init__(self, cover_index=None, num_clusters=None, **kwargs):
+    def __init__(self, cover_index=None, num_clusters=None, edge_index=None, **kwargs):
         self.cover_index = cover_index
 
         if num_clusters is not None:
             self.__num_clusters__ = num_clusters
 
         super(Cover, self).__init__(**kwargs)
+        self.edge_index = edge_index
 
     def __inc__(self, key, value):
         if key == 'cover_index':
-            return torch.tensor([[self.num_nodes], [self.num_clusters]])
+            return torch.tensor([[self.num_nodes], [self.num_clusters]], dtype=value.dtype)
 
         return super(Cover, self).__inc__(key, value)
 
@@ -61,15 +67,119 @@ class Cover(Data):
         self.__num_nodes__ = num_nodes
 
 
+class HierarchyData(Data):
+    """A graph carrying its whole hierarchy of covers and coarsened graphs,
+    flattened in a single Data object so that it can be stored in the
+    processed files of an `InMemoryDataset` (see
+    `kplex.HierarchyTransform`). The l-th layer of the hierarchy is stored
+    in the `"cover_index_<l>"` and `"num_clusters_<l>"` keys, and the
+    coarsened graph it produces in `"edge_index_<l + 1>"` and
+    `"edge_attr_<l + 1>"`. Use `unpack_hierarchy` to recover the list of
+    datasets returned by `KPlexCover.get_representations`.
+    """
+    @property
+    def num_layers(self):
+        return len([key for key in self.keys if key.startswith('cover_index_')])
+
+    def level_nodes(self, level):
+        """Return the number of nodes of the graph at a given level of the
+        hierarchy (the input graph is at level 0)."""
+        if level == 0:
+            return self.num_nodes
+
+        return int(self['num_clusters_%d' % (level - 1)])
+
+    def __inc__(self, key, value):
+        if key.startswith('cover_index_'):
+            level = int(key[len('cover_index_'):])
+
+            return torch.tensor([[self.level_nodes(level)], [self.level_nodes(level + 1)]], dtype=value.dtype)
+
+        if key.startswith('edge_index_'):
+            return self.level_nodes(int(key[len('edge_index_'):]))
+
+        return super(HierarchyData, self).__inc__(key, value)
+
+
+def unpack_hierarchy(dataset):
+    """Split a dataset of `HierarchyData` graphs in the hierarchy of datasets
+    it stores.
+
+    Args:
+        dataset (torch_geometric.Dataset): A dataset of `HierarchyData`.
+
+    Returns:
+        list: A list of `CustomDataset`s, as returned by
+            `KPlexCover.get_representations`.
+    """
+    num_layers = dataset[0].num_layers
+    layers = [[] for _ in range(num_layers + 1)]
+    level_keys = {'%s_%d' % (key, l) for key in ['cover_index', 'num_clusters', 'edge_index', 'edge_attr']
+                  for l in range(num_layers + 1)}
+
+    for data in dataset:
+        keys = {key: item for key, item in data if key not in level_keys}
+        keys['num_nodes'] = data.num_nodes
+
+        for l, layer in enumerate(layers[:-1]):
+            clusters = data.level_nodes(l + 1)
+            layer.append(Cover(cover_index=data['cover_index_%d' % l], num_clusters=clusters, **keys))
+            keys = {
+                'edge_index': data['edge_index_%d' % (l + 1)],
+                'edge_attr': data['edge_attr_%d' % (l + 1)],
+                'num_nodes': clusters
+            }
+
+        layers[-1].append(Cover(**keys))
+
+    return [CustomDataset(data_list) for data_list in layers]
+
+
 class CustomDataset(InMemoryDataset):
-    """Create a dataset from a `torch_geometric.Data` list.
+    """Create a dataset from a `torch_geometric.Data` list. The number of
+    nodes and clusters of every graph is stored in a metadata array, and
+    restored in the graphs returned by the dataset, so that their
+    `num_nodes` and `num_clusters` never have to be inferred from their
+    index tensors.
     
     Args:
         data_list (list): List of graphs.
+
+    Attributes:
+        metadata (LongTensor): A matrix with the number of nodes and clusters
+            (or -1, if the graph has no `"cover_index"`) of every graph.
     """
     def __init__(self, data_list):
         super(CustomDataset, self).__init__("")
         self.data, self.slices = self.collate(data_list)
+        self.metadata = torch.tensor([[data.num_nodes, data.num_clusters if 'cover_index' in data else -1] 
+                                      for data in data_list], dtype=torch.long).view(-1, 2)
+
+    def get(self, idx):
+        data = super(CustomDataset, self).get(idx)
+        nodes, clusters = self.metadata[idx].tolist()
+        data.num_nodes = nodes
+
+        if clusters >= 0:
+            data.__num_clusters__ = clusters
+
+        return data
+
+    def _metadata(self, column):
+        if self.__indices__ is None:
+            return self.metadata[:, column]
+
+        return self.metadata[torch.tensor(list(self.__indices__), dtype=torch.long), column]
+
+    @property
+    def graph_nodes(self):
+        """LongTensor: Number of nodes of every graph."""
+        return self._metadata(0)
+
+    @property
+    def graph_clusters(self):
+        """LongTensor: Number of clusters of the cover of every graph."""
+        return self._metadata(1)
     
     def _download(self):
         pass
@@ -78,66 +188,276 @@ class CustomDataset(InMemoryDataset):
         pass
 
 
+def _pack_bits(x):
+    # Pack a 0/1 tensor in uint8 bytes along its last dimension.
+    pad = -x.size(-1) % 8
+    bits = torch.cat([x, x.new_zeros(x.size()[:-1] + (pad,))], dim=-1).to(torch.uint8)
+    bits = bits.view(x.size()[:-1] + (-1, 8))
+    shifts = torch.arange(8, dtype=torch.uint8)
+
+    return (bits << shifts).sum(-1, dtype=torch.uint8)
+
+
+def _unpack_bits(x, size, dtype=torch.float):
+    # Inverse of `_pack_bits`, keeping the first `size` elements.
+    shifts = torch.arange(8, dtype=torch.uint8, device=x.device)
+    bits = (x.unsqueeze(-1) >> shifts) & 1
+
+    return bits.view(x.size()[:-1] + (-1,))[..., :size].to(dtype)
+
+
+def _as_index(idx, length):
+    # Convert any index to a LongTensor, flagging single-graph requests.
+    if isinstance(idx, int) or torch.is_tensor(idx) and idx.dim() == 0:
+        return torch.tensor([int(idx)]), True
+
+    if isinstance(idx, slice):
+        return torch.arange(length)[idx], False
+
+    idx = torch.as_tensor(idx)
+
+    if idx.dtype == torch.bool:
+        return idx.nonzero().view(-1), False
+
+    return idx.long(), False
+
+
+def _graph_counts(dataset):
+    # Number of nodes and clusters (or None, if there is no cover) of every
+    # graph, read from the metadata of `CustomDataset`s if available.
+    if isinstance(dataset, CustomDataset):
+        clusters = dataset.graph_clusters
+
+        return dataset.graph_nodes, None if len(clusters) == 0 or clusters[0] < 0 else clusters
+
+    nodes = torch.tensor([data.num_nodes for data in dataset], dtype=torch.long)
+
+    if 'cover_index' not in dataset[0]:
+        return nodes, None
+
+    return nodes, torch.tensor([data.num_clusters for data in dataset], dtype=torch.long)
+
+
+def _ranges(start, sizes):
+    # Concatenation of the ranges [start[i], start[i] + sizes[i]).
+    offsets = sizes.cumsum(0) - sizes
+
+    return torch.repeat_interleave(start - offsets, sizes) + torch.arange(int(sizes.sum()))
+
+
+class CollatedDataset(Dataset):
+    """Sparse graph dataset assembling its batches directly from the
+    concatenated tensors of an `InMemoryDataset`, with no per-graph `Data`
+    objects. Node (and cluster) offsets are precomputed, and every key of a
+    batch is obtained with a single gather (plus the increments of the index
+    keys, as in `Batch.from_data_list`).
+
+    Args:
+        dataset (torch_geometric.Dataset): A graph dataset (usually a
+            `CustomDataset`).
+
+    Attributes:
+        graph_nodes (LongTensor): Number of nodes of every graph.
+        graph_clusters (LongTensor): Number of clusters of the cover of every
+            graph, if the graphs have a `"cover_index"`.
+    """
+    def __init__(self, dataset):
+        super(CollatedDataset, self).__init__("")
+
+        if isinstance(dataset, InMemoryDataset) and dataset.__indices__ is None:
+            self.data, self.slices = dataset.data, dataset.slices
+        else:
+            self.data, self.slices = InMemoryDataset.collate(list(dataset))
+
+        sample = dataset[0]
+        self.graph_nodes, self.graph_clusters = _graph_counts(dataset)
+        self.cat_dims = {}
+        self.node_keys = set()
+
+        for key, item in sample:
+            self.cat_dims[key] = sample.__cat_dim__(key, item)
+
+            if key != 'cover_index' and torch.is_tensor(item) and sample.__inc__(key, item) != 0:
+                self.node_keys.add(key)
+
+    def len(self):
+        return self.graph_nodes.size(0)
+
+    def get(self, idx):
+        idx, _ = _as_index(idx, self.len())
+        nodes = self.graph_nodes[idx]
+        graphs = torch.arange(idx.size(0))
+        node_offset = nodes.cumsum(0) - nodes
+        out = Batch()
+
+        for key, item in self.data:
+            if key not in self.cat_dims:
+                continue
+
+            start, end = self.slices[key][idx], self.slices[key][idx + 1]
+            value = item.index_select(self.cat_dims[key], _ranges(start, end - start))
+            owner = torch.repeat_interleave(graphs, end - start)
+
+            if key in self.node_keys:
+                value = value + node_offset[owner].to(value.dtype)
+            elif key == 'cover_index':
+                clusters = self.graph_clusters[idx]
+                offset = torch.stack([node_offset, clusters.cumsum(0) - clusters])
+                value = value + offset[:, owner].to(value.dtype)
+
+            out[key] = value
+
+        out.batch = torch.repeat_interleave(graphs, nodes)
+        out.ptr = torch.cat([nodes.new_zeros(1), nodes.cumsum(0)])
+        out.__num_graphs__ = idx.size(0)
+
+        return out
+
+    def index_select(self, idx):
+        return self.get(idx)
+
+    def _download(self):
+        pass
+
+    def _process(self):
+        pass
+
+
 class DenseDataset(Dataset):
-    """Dense Graphs Dataset.
+    """Dense Graphs Dataset. The dense cover assignment matrices are stored
+    bit-packed, and expanded to float only for the requested graphs.
     
     Args:
         data_list (list): list of graphs.
+        lazy (bool, optional): If `True`, keep the graphs in sparse form and
+            densify only the requested ones, padding them to the maximum
+            number of nodes (and clusters) of the request instead of the
+            whole dataset. Defaults to `False`.
+        reuse_buffers (bool, optional): If `True`, gather the requested
+            graphs into output buffers that are reused by the following
+            requests (hence, a batch is overwritten by the next one). Ignored
+            if `lazy` is `True`. Defaults to `False`.
+
+    Attributes:
+        graph_nodes (LongTensor): Number of nodes of every graph.
+        graph_clusters (LongTensor): Number of clusters of the cover of every
+            graph, if the graphs have a `"cover_index"`.
     """
-    def __init__(self, data_list):
+    def __init__(self, data_list, lazy=False, reuse_buffers=False):
         super(DenseDataset, self).__init__("")
 
-        self.data = Batch()
-        self.max_nodes = max([data.num_nodes for data in data_list])
-        to_dense = ToDense(self.max_nodes)
-        dense_list = [to_dense(data) for data in data_list]
+        self.lazy = lazy
+        self.reuse_buffers = reuse_buffers
+        self._buffers = {}
+        self.graph_nodes, self.graph_clusters = _graph_counts(data_list)
+        self.max_nodes = self.graph_nodes.max().item()
+
+        if self.graph_clusters is not None:
+            self.max_clusters = self.graph_clusters.max().item()
+
+        # Dense conversion needs int64 indices, covers may be stored as int32.
+        data_list = [self._long_indices(data) for data in data_list]
+
+        if lazy:
+            self.data_list = data_list
+            self.data = None
+        else:
+            self.data = self._densify(data_list, packed=True)
+
+    @staticmethod
+    def _long_indices(data):
+        data = copy.copy(data)
+
+        for key in ['edge_index', 'cover_index']:
+            if key in data:
+                data[key] = data[key].long()
+
+        return data
+
+    @staticmethod
+    def _densify(data_list, packed=False):
+        # If `packed`, store the cover assignments as bits, with no cover
+        # masks (they are rebuilt from the number of clusters).
+        out = Batch()
+        max_nodes = max([data.num_nodes for data in data_list])
+        to_dense = ToDense(max_nodes)
+        dense_list = [to_dense(copy.copy(data)) for data in data_list]
 
         if 'cover_index' in data_list[0]:
-            self.max_clusters = max([data.num_clusters for data in data_list])    
+            max_clusters = max([data.num_clusters for data in data_list])    
 
             for data in dense_list:
-                data.cover_mask = torch.zeros(self.max_clusters, dtype=torch.uint8)
-                data.cover_mask[:data.num_clusters] = 1  
-                data.cover_index = torch.sparse_coo_tensor(
+                cover_index = torch.sparse_coo_tensor(
                         indices=data.cover_index,
                         values=torch.ones_like(data.cover_index[0]), 
-                        size=torch.Size([self.max_nodes, self.max_clusters]),
-                        dtype=torch.float
+                        size=torch.Size([max_nodes, max_clusters]),
+                        dtype=torch.uint8 if packed else torch.float
                     ).to_dense()
 
+                if packed:
+                    data.cover_index = _pack_bits(cover_index)
+                else:
+                    data.cover_mask = torch.zeros(max_clusters, dtype=torch.uint8)
+                    data.cover_mask[:data.num_clusters] = 1  
+                    data.cover_index = cover_index
+
         for key in dense_list[0].keys:
-            self.data[key] = default_collate([d[key] for d in dense_list])
+            out[key] = default_collate([d[key] for d in dense_list])
 
-    def len(self):
-        if self.data.x is not None:
-            return self.data.x.size(0)
+        return out
+
+    def _gather(self, key, source, idx):
+        # Select the rows `idx` of `source`, in a reusable buffer if enabled.
+        if not self.reuse_buffers:
+            return source.index_select(0, idx)
 
-        if 'adj' in self.data:
-            return self.data.adj.size(0)
+        size = (idx.numel(),) + source.size()[1:]
+        numel = int(np.prod(size))
+        buffer = self._buffers.get(key)
 
-        return 0
+        if buffer is None or buffer.numel() < numel or buffer.dtype != source.dtype:
+            buffer = self._buffers[key] = source.new_empty(numel)
+
+        return torch.index_select(source, 0, idx, out=buffer[:numel].view(size))
+
+    def len(self):
+        return self.graph_nodes.size(0)
 
     def get(self, idx):
-        mask = self.data.mask[idx]
-        max_nodes = mask.type(torch.uint8).argmax(-1).max().item() + 1
+        idx, single = _as_index(idx, self.len())
+        out = self._get_lazy(idx) if self.lazy else self._get_eager(idx)
+
+        if single:
+            for key, item in out:
+                out[key] = item[0]
+
+        return out
+
+    def _get_eager(self, idx):
+        max_nodes = self.graph_nodes[idx].max().item()
         out = Batch()
 
         for key, item in self.data('x', 'pos', 'mask'):
-            out[key] = item[idx, :max_nodes]
+            out[key] = self._gather(key, item[:, :max_nodes], idx)
 
-        out.adj = self.data.adj[idx, :max_nodes, :max_nodes]
+        out.adj = self._gather('adj', self.data.adj[:, :max_nodes, :max_nodes], idx)
         
         if 'y' in self.data:
-            out.y = self.data.y[idx]
+            out.y = self._gather('y', self.data.y, idx)
         
         if 'cover_index' in self.data:
-            cover_mask = self.data.cover_mask[idx]
-            max_clusters = cover_mask.type(torch.uint8).argmax(-1).max().item() + 1
-            out.cover_index = self.data.cover_index[idx, :max_nodes, :max_clusters]
-            out.cover_mask = cover_mask[:, :max_clusters]
+            clusters = self.graph_clusters[idx]
+            max_clusters = clusters.max().item()
+            cover_index = self._gather('cover_index', 
+                                       self.data.cover_index[:, :max_nodes, :(max_clusters + 7) // 8], idx)
+            out.cover_index = _unpack_bits(cover_index, max_clusters)
+            out.cover_mask = (torch.arange(max_clusters) < clusters.unsqueeze(-1)).to(torch.uint8)
 
         return out
 
+    def _get_lazy(self, idx):
+        return self._densify([self.data_list[i] for i in idx.tolist()])
+
     def index_select(self, idx):
         return self.get(idx)
 
@@ -148,6 +468,174 @@ class DenseDataset(Dataset):
         pass
 
 
+def long_indices(dataset):
+    """Upcast the `"edge_index"` and `"cover_index"` keys of a dataset (e.g.,
+    a `CustomDataset` built with int32 indices) to int64, as required by
+    scatter operations and graph convolutions. The concatenated tensors of
+    an `InMemoryDataset` are upcast at once.
+
+    Args:
+        dataset (torch_geometric.Dataset): A graph dataset.
+
+    Returns:
+        torch_geometric.Dataset: A shallow copy of the dataset with int64
+            indices, or the same dataset if they already are.
+    """
+    keys = ['edge_index', 'cover_index']
+
+    if not isinstance(dataset, InMemoryDataset):
+        return [DenseDataset._long_indices(data) for data in dataset]
+
+    if all(dataset.data[key] is None or dataset.data[key].dtype == torch.long for key in keys):
+        return dataset
+
+    out = copy.copy(dataset)
+    out.data = copy.copy(dataset.data)
+
+    for key in keys:
+        if out.data[key] is not None:
+            out.data[key] = out.data[key].long()
+
+    return out
+
+
+def share_memory(dataset):
+    """Move the tensors of a dataset (a `CustomDataset`, `CollatedDataset`,
+    `DenseDataset` or a list of graphs) to shared memory, in-place, so that
+    they are not copied by the worker processes of a `DataLoader`.
+
+    Args:
+        dataset (torch_geometric.Dataset): A graph dataset.
+
+    Returns:
+        torch_geometric.Dataset: The same dataset.
+    """
+    if isinstance(dataset, (list, tuple)):
+        for data in dataset:
+            for _, item in data:
+                if torch.is_tensor(item):
+                    item.share_memory_()
+
+        return dataset
+
+    if isinstance(dataset, DenseDataset) and dataset.lazy:
+        share_memory(dataset.data_list)
+
+    tensors = [] if dataset.data is None else [item for _, item in dataset.data if torch.is_tensor(item)]
+    tensors += list((getattr(dataset, 'slices', None) or {}).values())
+    tensors += [dataset.__dict__[name] for name in ['metadata', 'graph_nodes', 'graph_clusters']
+                if torch.is_tensor(dataset.__dict__.get(name))]
+
+    for item in tensors:
+        item.share_memory_()
+
+    return dataset
+
+
+def graph_sizes(dataset):
+    """Return the number of nodes of every graph in a dataset.
+
+    Args:
+        dataset (torch_geometric.Dataset): A graph dataset (possibly a
+            `DenseDataset`).
+
+    Returns:
+        LongTensor: The number of nodes of every graph.
+    """
+    if isinstance(dataset, (CustomDataset, CollatedDataset, DenseDataset)):
+        return dataset.graph_nodes
+
+    return torch.tensor([data.num_nodes for data in dataset], dtype=torch.long)
+
+
+class BucketBatchSampler(Sampler):
+    """Batch sampler grouping together graphs of similar size, to reduce the
+    padding of dense batches. The indices are sorted by size (breaking ties
+    at random) and split in consecutive batches, which are then yielded in
+    random order.
+
+    Args:
+        sizes (LongTensor): The size of every sample, either as a vector or as
+            a matrix with one column per size (e.g., the number of nodes at
+            different levels of the hierarchy), compared lexicographically.
+        batch_size (int): Number of samples per batch.
+        shuffle (bool, optional): Randomize the order of the batches and the
+            samples with equal size. Defaults to `True`.
+        drop_last (bool, optional): Drop the last batch, if smaller than
+            `batch_size`. Defaults to `False`.
+        bucket_size (int, optional): If given, sort only within random groups
+            of `bucket_size` batches, trading padding for randomness.
+            Defaults to `None` (sort the whole dataset).
+    """
+    def __init__(self, sizes, batch_size, shuffle=True, drop_last=False, bucket_size=None):
+        self.sizes = sizes.view(sizes.size(0), -1)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.bucket_size = bucket_size
+
+    def _sort(self, index):
+        for col in reversed(range(self.sizes.size(1))):
+            # Stable, so that the order of the previous columns is kept.
+            order = np.argsort(self.sizes[index, col].numpy(), kind='stable')
+            index = index[torch.from_numpy(order)]
+
+        return index
+
+    def __iter__(self):
+        num_samples = self.sizes.size(0)
+        index = torch.randperm(num_samples) if self.shuffle else torch.arange(num_samples)
+        step = num_samples if self.bucket_size is None else self.bucket_size*self.batch_size
+        index = torch.cat([self._sort(bucket) for bucket in index.split(step)])
+        batches = list(index.split(self.batch_size))
+
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches)).tolist()]
+
+        return iter([batch.tolist() for batch in batches])
+
+    def __len__(self):
+        if self.drop_last:
+            return self.sizes.size(0) // self.batch_size
+
+        return (self.sizes.size(0) + self.batch_size - 1) // self.batch_size
+
+
+class BucketLoader(DataLoader):
+    """`DataLoader` sampling its batches with a `BucketBatchSampler`. Can be
+    used as `iterator_train` of a skorch model, whose samples are the indices
+    of the graphs in the dataset.
+
+    Args:
+        dataset (torch.utils.data.Dataset): Dataset of samples.
+        sizes (LongTensor): The sizes of the graphs (see
+            `BucketBatchSampler`), indexed by graph.
+        batch_size (int, optional): Number of samples per batch. Defaults to
+            `1`.
+        shuffle (bool, optional): See `BucketBatchSampler`. Defaults to
+            `False`.
+        drop_last (bool, optional): See `BucketBatchSampler`. Defaults to
+            `False`.
+        bucket_size (int, optional): See `BucketBatchSampler`. Defaults to
+            `None`.
+        graph_index (callable, optional): Function mapping a sample of the
+            dataset to the index of its graph. Defaults to `None` (the first
+            element of the sample, as in skorch datasets).
+    """
+    def __init__(self, dataset, sizes, batch_size=1, shuffle=False, drop_last=False, 
+                 bucket_size=None, graph_index=None, **kwargs):
+        if graph_index is None:
+            graph_index = lambda sample: int(np.asarray(sample[0]).item())
+
+        index = torch.tensor([graph_index(dataset[i]) for i in range(len(dataset))], dtype=torch.long)
+        sampler = BucketBatchSampler(sizes[index], batch_size, shuffle, drop_last, bucket_size)
+
+        super(BucketLoader, self).__init__(dataset, batch_sampler=sampler, **kwargs)
+
+
 class NDPDataset(InMemoryDataset):
     """The synthetic dataset from `"Hierarchical Representation Learning in 
     Graph Neural Networks with Node Decimation Pooling"
@@ -0,0 +1,83 @@
+import torch
+import networkx as nx
+from networkx.algorithms.graph_hashing import weisfeiler_lehman_graph_hash
+from networkx.algorithms.isomorphism import DiGraphMatcher
+
+from kplex_pool.memo import LRUMemo
+
+
+def _to_networkx(data):
+    G = nx.DiGraph()
+    G.add_nodes_from(range(data.num_nodes))
+    weights = [None]*data.edge_index.size(1) if data.edge_attr is None else data.edge_attr.tolist()
+
+    for (u, v), w in zip(data.edge_index.t().tolist(), weights):
+        G.add_edge(u, v, weight=str(w))
+
+    return G
+
+
+def graph_groups(dataset, method='exact'):
+    """Group together the graphs of a dataset that would have the same
+    hierarchy. With `"exact"`, the graphs in a group have the same number of
+    nodes, edge index and edge weights. With `"wl"`, the graphs are first
+    grouped by their Weisfeiler-Lehman hash (of both topology and edge
+    weights), and then every candidate is verified to be isomorphic to the
+    representative of the group.
+
+    Args:
+        dataset (torch_geometric.Dataset): A graph dataset.
+        method (str, optional): Grouping method (`"exact"` or `"wl"`).
+            Defaults to `"exact"`.
+
+    Raises:
+        ValueError: If provided an undefined grouping method.
+
+    Returns:
+        list: A list of pairs `(rep, perm)`, one for each graph. `rep` is the
+            index of the representative of the group of the graph (the first
+            one in the dataset), and `perm` maps the i-th node of the
+            representative to the node `perm[i]` of the graph (or is `None`
+            if the two graphs are identical).
+    """
+    if method not in {'exact', 'wl'}:
+        raise ValueError('Not a valid deduplication method: %s' % method)
+
+    groups = {}
+    out = []
+
+    for idx, data in enumerate(dataset):
+        if method == 'exact':
+            key = LRUMemo.key(data.num_nodes, data.edge_index, data.edge_attr)
+            out.append((groups.setdefault(key, idx), None))
+            continue
+
+        G = _to_networkx(data)
+        candidates = groups.setdefault(weisfeiler_lehman_graph_hash(G, edge_attr='weight'), [])
+
+        for rep, R in candidates:
+            matcher = DiGraphMatcher(R, G, edge_match=lambda a, b: a['weight'] == b['weight'])
+
+            if matcher.is_isomorphic():
+                perm = torch.tensor([matcher.mapping[n] for n in range(R.number_of_nodes())], dtype=torch.long)
+                out.append((rep, perm))
+                break
+        else:
+            candidates.append((idx, G))
+            out.append((idx, None))
+
+    return out
+
+
+def group_stats(groups):
+    """Compute the deduplication statistics of a list of groups, as returned
+    by `graph_groups`.
+
+    Returns:
+        dict: The number of graphs (`"graphs"`), of groups (`"groups"`), and
+            of graphs whose hierarchy is shared with a previous one
+            (`"duplicates"`).
+    """
+    num_groups = len({rep for rep, _ in groups})
+
+    return {'graphs': len(groups), 'groups': num_groups, 'duplicates': len(groups) - num_groups}
@@ -0,0 +1,266 @@
+import torch
+import operator
+from functools import reduce
+
+from kplex_pool.pool import cover_pool_edge
+
+
+POOL_FUNCTIONS = {
+    'add': sum,
+    'mul': lambda ws: reduce(operator.mul, ws),
+    'max': max,
+    'min': min,
+    'mean': lambda ws: sum(ws)/len(ws)
+}
+
+
+class DynamicCover:
+    """Maintain the k-plex cover (and the coarsened graph) of a graph that
+    receives small batches of edge insertions and deletions. Instead of
+    recomputing everything from scratch, at every update only the k-plexes
+    affected by the changed edges are repaired, and only the coarsened edges
+    incident to them are aggregated again.
+
+    A deleted edge can only invalidate the k-plexes containing both its
+    endvertices: the invalid ones are removed and their nodes are covered
+    again. An inserted edge between two nodes that do not share a k-plex can
+    make larger k-plexes possible, so the nodes of the k-plexes containing
+    its endvertices are covered again. Every k-plex has a stable identifier,
+    which does not change until the k-plex is removed.
+
+    Args:
+        kplex_cover (KPlexCover): The cover algorithm.
+        k (int): Number of maximum missing links per node.
+        edge_index (LongTensor): Edge coordinates (sparse COO matrix form) of
+            the initial graph. Undirected graphs must contain both
+            directions of every edge, and so must the updates.
+        edge_attr (FloatTensor, optional): Weights of the edges. If `None`,
+            defaults to a vector of ones. Defaults to `None`.
+        num_nodes (int, optional): Number of nodes. Defaults to `None`.
+        edge_pool_op (str, optional): Edge-weights aggregation funciton
+            (`"add"`, `"mul"`,` "max"`, `"min"`, or `"mean"`). Defaults to
+            `"add"`.
+
+    Raises:
+        ValueError: If provided an undefined aggregation function.
+    """
+
+    def __init__(self, kplex_cover, k, edge_index, edge_attr=None, num_nodes=None, edge_pool_op='add'):
+        if edge_pool_op not in POOL_FUNCTIONS:
+            raise ValueError('Not a valid operation: %s' % edge_pool_op)
+
+        if num_nodes is None:
+            num_nodes = edge_index.max().item() + 1
+
+        if edge_attr is None:
+            edge_attr = torch.ones(edge_index.size(1), dtype=torch.float, device=edge_index.device)
+
+        self.kplex_cover = kplex_cover
+        self.k = k
+        self.num_nodes = int(num_nodes)
+        self.edge_pool_op = edge_pool_op
+        self.device = edge_index.device
+        self.dtype = edge_attr.dtype
+        self.out_edges = [{} for _ in range(self.num_nodes)]
+        self.in_edges = [{} for _ in range(self.num_nodes)]
+
+        for u, v, w in zip(edge_index[0].tolist(), edge_index[1].tolist(), edge_attr.tolist()):
+            self.out_edges[u][v] = w
+            self.in_edges[v][u] = w
+
+        cover_index, clusters, _ = kplex_cover(k, edge_index, self.num_nodes)
+        pooled_index, pooled_attr = cover_pool_edge(cover_index, edge_index, edge_attr, self.num_nodes,
+                                                    clusters, pool=edge_pool_op)
+
+        self.clusters = {c: set() for c in range(clusters)}
+        self.node_clusters = [set() for _ in range(self.num_nodes)]
+        self.pooled_edges = {}
+        self.cluster_pairs = {c: set() for c in range(clusters)}
+        self._next_id = clusters
+
+        for n, c in zip(*cover_index.tolist()):
+            self.clusters[c].add(n)
+            self.node_clusters[n].add(c)
+
+        for a, b, w in zip(pooled_index[0].tolist(), pooled_index[1].tolist(), pooled_attr.tolist()):
+            self._set_pair(a, b, w)
+
+    @property
+    def cluster_ids(self):
+        """list: The stable identifiers of the current k-plexes. The k-plex
+        at position `i` of this list is the cluster `i` in the tensors
+        returned by `get_cover` and `get_pooled_edges`."""
+        return sorted(self.clusters)
+
+    def get_graph(self):
+        """Return the current graph.
+
+        Returns:
+            (LongTensor, FloatTensor): The edge index and the weights of the
+                current graph.
+        """
+        edges = [(u, v, w) for u, nbrs in enumerate(self.out_edges) for v, w in nbrs.items()]
+
+        return self._to_tensors(edges)
+
+    def get_cover(self):
+        """Return the current cover, with the k-plexes sorted by stable
+        identifier.
+
+        Returns:
+            (LongTensor, int, LongTensor): The cover index matrix, the number
+                of k-plexes and a batch vector (as in `KPlexCover.__call__`).
+        """
+        ids = self.cluster_ids
+        index = [(n, c) for c, cid in enumerate(ids) for n in sorted(self.clusters[cid])]
+        cover_index = torch.tensor(index, dtype=torch.long, device=self.device).view(-1, 2).t()
+
+        return cover_index, len(ids), cover_index.new_zeros(len(ids))
+
+    def get_pooled_edges(self):
+        """Return the current coarsened graph, numbering the k-plexes as in
+        `get_cover`.
+
+        Returns:
+            (LongTensor, FloatTensor): The edge index and the weights of the
+                coarsened graph (as in `cover_pool_edge`).
+        """
+        position = {cid: c for c, cid in enumerate(self.cluster_ids)}
+        edges = [(position[a], position[b], w) for (a, b), w in self.pooled_edges.items()]
+
+        return self._to_tensors(edges)
+
+    def update(self, insert_index=None, insert_attr=None, delete_index=None):
+        """Apply a batch of edge changes, repairing the affected k-plexes and
+        the coarsened edges incident to them. Deletions are applied before
+        insertions.
+
+        Args:
+            insert_index (LongTensor, optional): Edges to insert. The weight
+                of an already existing edge is replaced. Defaults to `None`.
+            insert_attr (FloatTensor, optional): Weights of the inserted
+                edges. If `None`, defaults to a vector of ones. Defaults to
+                `None`.
+            delete_index (LongTensor, optional): Edges to delete. Missing
+                edges are ignored. Defaults to `None`.
+
+        Raises:
+            ValueError: If an edge has an endvertex that is not in the graph.
+
+        Returns:
+            (list, list): The stable identifiers of the removed k-plexes and
+                of the added ones.
+        """
+        deleted = [] if delete_index is None else list(zip(*delete_index.tolist()))
+        inserted = [] if insert_index is None else list(zip(*insert_index.tolist()))
+
+        if insert_attr is None:
+            insert_attr = [1.]*len(inserted)
+        else:
+            insert_attr = insert_attr.tolist()
+
+        for u, v in deleted + inserted:
+            if not (0 <= u < self.num_nodes and 0 <= v < self.num_nodes):
+                raise ValueError('Not a valid edge: (%d, %d)' % (u, v))
+
+        affected = set()
+
+        for u, v in deleted:
+            if self.out_edges[u].pop(v, None) is None:
+                continue
+
+            del self.in_edges[v][u]
+
+            for c in self.node_clusters[u] & self.node_clusters[v]:
+                if c not in affected and not self._is_kplex(self.clusters[c]):
+                    affected.add(c)
+
+        for (u, v), w in zip(inserted, insert_attr):
+            if v not in self.out_edges[u] and u != v and not self.node_clusters[u] & self.node_clusters[v]:
+                affected |= self.node_clusters[u] | self.node_clusters[v]
+
+            self.out_edges[u][v] = w
+            self.in_edges[v][u] = w
+
+        added = self._recover(affected)
+        dirty = set()
+
+        for c in added:
+            for u in self.clusters[c]:
+                for v in self.out_edges[u]:
+                    dirty.update((c, b) for b in self.node_clusters[v])
+
+                for v in self.in_edges[u]:
+                    dirty.update((b, c) for b in self.node_clusters[v])
+
+        for u, v in deleted + inserted:
+            dirty.update((a, b) for a in self.node_clusters[u] for b in self.node_clusters[v])
+
+        for a, b in dirty:
+            if a != b:
+                self._set_pair(a, b, self._pool_pair(a, b))
+
+        return sorted(affected), added
+
+    def _is_kplex(self, nodes):
+        size = len(nodes)
+
+        return all(size - len(nodes.intersection(self.out_edges[n])) + int(n in self.out_edges[n]) <= self.k
+                   for n in nodes)
+
+    def _recover(self, removed):
+        nodes = set()
+
+        for c in removed:
+            nodes |= self.clusters.pop(c)
+
+            for pair in self.cluster_pairs.pop(c):
+                self._set_pair(*pair, None)
+
+        for n in nodes:
+            self.node_clusters[n] -= removed
+
+        if not nodes:
+            return []
+
+        nodes = sorted(nodes)
+        local = {n: i for i, n in enumerate(nodes)}
+        edges = [(local[u], local[v]) for u in nodes for v in self.out_edges[u] if v in local]
+        edge_index = torch.tensor(edges, dtype=torch.long).view(-1, 2).t()
+        cover_index, clusters, _ = self.kplex_cover(self.k, edge_index, len(nodes))
+        added = list(range(self._next_id, self._next_id + clusters))
+        self._next_id += clusters
+
+        for c in added:
+            self.clusters[c] = set()
+            self.cluster_pairs[c] = set()
+
+        for n, c in zip(*cover_index.tolist()):
+            self.clusters[added[c]].add(nodes[n])
+            self.node_clusters[nodes[n]].add(added[c])
+
+        return added
+
+    def _pool_pair(self, a, b):
+        weights = [w for u in self.clusters[a] for v, w in self.out_edges[u].items()
+                   if u != v and b in self.node_clusters[v]]
+
+        return POOL_FUNCTIONS[self.edge_pool_op](weights) if weights else None
+
+    def _set_pair(self, a, b, weight):
+        if weight is None:
+            self.pooled_edges.pop((a, b), None)
+
+            for c in (a, b):
+                if c in self.cluster_pairs:
+                    self.cluster_pairs[c].discard((a, b))
+        else:
+            self.pooled_edges[(a, b)] = weight
+            self.cluster_pairs[a].add((a, b))
+            self.cluster_pairs[b].add((a, b))
+
+    def _to_tensors(self, edges):
+        index = torch.tensor([e[:2] for e in edges], dtype=torch.long, device=self.device).view(-1, 2).t()
+        weights = torch.tensor([e[2] for e in edges], dtype=self.dtype, device=self.device)
+
+        return index, weights
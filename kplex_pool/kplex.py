@@ -1,10 +1,15 @@
 import torch
 
-from kplex_pool import kplex_cpu
+from kplex_pool import kplex_cpu, pool_edges_cpu, hierarchy_cpu, reorder_cpu
 from kplex_pool.pool import cover_pool_node, cover_pool_edge
+from kplex_pool.reorder import node_order, relabel
+from kplex_pool.adjacency import num_nodes_of, to_csr, to_edge_index
 from kplex_pool.simplify import simplify as simplify_graph
 from kplex_pool.utils import hub_promotion
-from kplex_pool.data import Cover, CustomDataset, DenseDataset
+from kplex_pool.memo import LRUMemo
+from kplex_pool.dedup import graph_groups, group_stats
+from kplex_pool.prefetch import SharedHierarchy
+from kplex_pool.data import Cover, CustomDataset, DenseDataset, CollatedDataset, HierarchyData, long_indices
 
 from torch_geometric.utils import to_networkx, from_scipy_sparse_matrix
 from torch_geometric.data import Data
@@ -17,9 +22,35 @@ from tqdm import tqdm
 
 
 class CliqueCover:
-    """CliquePool implementation"""
+    """CliquePool implementation
+    
+    Args:
+        memo_size (int, optional): Keep the covers of the last `memo_size`
+            distinct graphs in an LRU memo (see `memo.LRUMemo`), returning
+            them when the same graph is given again. Defaults to `None` (no
+            memo).
+    """
+
+    def __init__(self, memo_size=None):
+        self.memo = None if memo_size is None else LRUMemo(memo_size)
     
     def __call__(self, edge_index, num_nodes=None, batch=None):
+        if batch is not None or self.memo is None:
+            return self._cover(edge_index, num_nodes, batch)
+
+        if num_nodes is None:
+            num_nodes = edge_index.max().item() + 1
+
+        key = LRUMemo.key('cover', edge_index, int(num_nodes))
+        out = self.memo.get(key)
+
+        if out is None:
+            out = self._cover(edge_index, num_nodes)
+            self.memo.put(key, out)
+
+        return out
+    
+    def _cover(self, edge_index, num_nodes=None, batch=None):
         device = edge_index.device
         
         if num_nodes is None:
@@ -92,9 +123,19 @@ class CliqueCover:
         out_list = []
         
         for data in it:
-            cover_index, clusters, _ = self(data.edge_index, data.num_nodes)
-            edge_index, weights = cover_pool_edge(cover_index, data.edge_index, data.edge_attr,
-                                                  data.num_nodes, clusters, pool=edge_pool_op)
+            key = None if self.memo is None else LRUMemo.key('process', data.edge_index, data.edge_attr,
+                                                                 data.num_nodes, edge_pool_op)
+            cached = None if key is None else self.memo.get(key)
+
+            if cached is None:
+                cover_index, clusters, _ = self(data.edge_index, data.num_nodes)
+                edge_index, weights = cover_pool_edge(cover_index, data.edge_index, data.edge_attr,
+                                                      data.num_nodes, clusters, pool=edge_pool_op)
+
+                if key is not None:
+                    self.memo.put(key, (cover_index, clusters, edge_index, weights))
+            else:
+                cover_index, clusters, edge_index, weights = cached
             
             keys = dict(data.__iter__())
             keys['num_nodes'] = data.num_nodes
@@ -132,7 +173,8 @@ class CliqueCover:
         
         return output
     
-    def get_cover_fun(self, num_layers, dataset=None, dense=False, *args, **kwargs):
+    def get_cover_fun(self, num_layers, dataset=None, dense=False, *args, lazy=False, collated=False, 
+                      shared=False, **kwargs):
         """Build and return a function that, for a given dataset and a set of
         indices, computes and returns the graph hierarchies at that indices.
         If `dataset` is not `None`, the hiearachies are precomputed for that
@@ -146,6 +188,18 @@ class CliqueCover:
                 function will be dense starting from the given layer. `True`
                 acts as 0, while `False` as `len(ks) + 1`. Defaults to
                 `False`.
+            lazy (bool, optional): Densify the graphs only when requested,
+                padding them to the size of the batch (see `DenseDataset`).
+                Defaults to `False`.
+            collated (bool, optional): Return the sparse layers of the
+                hierarchy already batched, gathering them from the
+                concatenated tensors of every layer (see `CollatedDataset`).
+                Defaults to `False`.
+            shared (bool, optional): Move the precomputed hierarchy to shared
+                memory and return it as a `prefetch.SharedHierarchy`, which
+                can be indexed by the workers of a `prefetch.HierarchyLoader`.
+                Ignored if the hierarchy is not precomputed. Defaults to
+                `False`.
 
         Returns:
             callable: The graph-hierarchy function.
@@ -155,12 +209,16 @@ class CliqueCover:
         def cover_fun(ds, idx):
             hierarchy = self.get_representations(ds[idx], num_layers, *args, **kwargs)
             
-            return [DenseDataset(ds) if l >= dense else ds for l, ds in enumerate(hierarchy)]
+            return [DenseDataset(ds, lazy) if l >= dense else CollatedDataset(ds) if collated else ds
+                    for l, ds in enumerate(hierarchy)]
         
         if dataset is None:
             return lambda ds, idx: [c[:] for c in cover_fun(ds, idx)]
         
         cache = cover_fun(dataset, slice(None))
+
+        if shared:
+            return SharedHierarchy(cache)
         
         return lambda _, idx: [ds[idx] for ds in cache]
 
@@ -172,21 +230,55 @@ class KPlexCover:
         cover_priority (str or list, optional): Priority used to extract the 
             pivot node (`"random"`, `"min_degree"`, `"max_degree"`, 
             `"min_uncovered"`, `"max_uncovered"`, `"min_in_kplex"`, 
-            `"max_in_kplex"`, `"min_candidates"`, `"max_candidates"`, or 
-            `"default"`). Defaults to `"default"`.
+            `"max_in_kplex"`, `"min_candidates"`, `"max_candidates"`, 
+            `"min_core"`, `"max_core"`, or `"default"`). Defaults to
+            `"default"`.
         kplex_priority (str or list, optional): Priority used to extract the
             next k-plex candidate (`"random"`, `"min_degree"`, `"max_degree"`, 
             `"min_uncovered"`, `"max_uncovered"`, `"min_in_kplex"`, 
-            `"max_in_kplex"`, `"min_candidates"`, `"max_candidates"`, or 
-            `"default"`). Defaults to `"default"`.
+            `"max_in_kplex"`, `"min_candidates"`, `"max_candidates"`, 
+            `"min_core"`, `"max_core"`, or `"default"`). Defaults to
+            `"default"`.
         skip_covered (bool, optional): Give max priority to uncovered nodes.
             Defaults to `False`.
+        core_pruning (bool, optional): Compute the core number of every node
+            and use it to discard the candidates that cannot be part of a
+            larger k-plex. Defaults to `False`.
+        max_kplex_size (int, optional): Maximum number of nodes in a k-plex.
+            Defaults to `None` (no limit).
+        max_expansions (int, optional): Maximum number of nodes admitted to
+            the candidate set while growing a k-plex from a single pivot. If
+            the pivot has more neighbors, only those with the highest 
+            `kplex_priority` are considered. Defaults to `None` (no limit).
+        time_budget (float, optional): Wall-clock budget (in seconds) of the
+            computation of a single cover. When it expires, the nodes that
+            are still uncovered are assigned to singleton clusters. Defaults
+            to `None` (no limit).
+        reorder (str, optional): Relabel the nodes of every graph before
+            covering it, to improve the locality of the native kernels
+            (`"degree"`, `"rcm"` or `"bfs"`, see `reorder.node_order`). The
+            returned covers refer to the original labels, but ties between
+            priorities are broken following the new order. Defaults to
+            `None`.
+        index_dtype (torch.dtype, optional): Integer type of the node indices
+            used by the native kernels and of the returned covers and 
+            coarsened graphs (`torch.long` or `torch.int`). `torch.int`
+            halves their memory footprint. Defaults to `torch.long`.
+        memo_size (int, optional): Keep the covers and the coarsened graphs of
+            the last `memo_size` distinct graphs (and parameters) in an LRU
+            memo (see `memo.LRUMemo`), returning them when the same graph is
+            given again. Its hit and miss counters are in `memo.stats`. Note
+            that random priorities and time budgets make the covers 
+            non-deterministic, while the memoized ones are not. Defaults to
+            `None` (no memo).
     
     Raises:
-        ValueError: A given priority is not defined.
+        ValueError: A given priority, ordering or index type is not defined.
     """
 
-    def __init__(self, cover_priority="default", kplex_priority="default", skip_covered=False):
+    def __init__(self, cover_priority="default", kplex_priority="default", skip_covered=False,
+                 core_pruning=False, max_kplex_size=None, max_expansions=None, time_budget=None,
+                 reorder=None, index_dtype=torch.long, memo_size=None):
         if cover_priority == "default":
             cover_priority = ["min_degree", "min_uncovered"]
     
@@ -202,6 +294,20 @@ class KPlexCover:
         self.cover_priority = []
         self.kplex_priority = []
         self.skip_covered = skip_covered
+        self.core_pruning = core_pruning
+        self.max_kplex_size = max_kplex_size
+        self.max_expansions = max_expansions
+        self.time_budget = time_budget
+        self.reorder = reorder
+        self.index_dtype = index_dtype
+        self.memo = None if memo_size is None else LRUMemo(memo_size)
+        self.dedup_stats = None
+
+        if index_dtype not in {torch.long, torch.int}:
+            raise ValueError('Not a valid index type: %s' % index_dtype)
+
+        if reorder is not None and getattr(reorder_cpu.NodeOrder, reorder, None) is None:
+            raise ValueError('Not a valid ordering: %s' % reorder)
     
         for p in cover_priority:
             cp = getattr(kplex_cpu.NodePriority, p, None)
@@ -223,72 +329,150 @@ class KPlexCover:
                 raise ValueError('Not a valid priority: %s' % p)
             
             self.kplex_priority.append(kp)
+
+    def _config(self):
+        return ([p.name for p in self.cover_priority], [p.name for p in self.kplex_priority], 
+                self.skip_covered, self.core_pruning, self.max_kplex_size, self.max_expansions, 
+                self.time_budget, self.reorder, self.index_dtype)
     
-    def __call__(self, k, edge_index, num_nodes=None, batch=None):
+    def __call__(self, k, edge_index, num_nodes=None, batch=None, return_stats=False, 
+                 coalesced=False, self_loops=True):
         """Compute the k-plex cover of a given graph or batch of graphs.
         
         Args:
-            k (int): Number of maximum missing links per node. Must be at
-                least 1.
-            edge_index (LongTensor): Edge coordinates (sparse COO matrix 
-                form).
+            k (int or list): Number of maximum missing links per node. Must be
+                at least 1. If a list is given, a cover is computed for each 
+                of its values, building the adjacency structures only once.
+            edge_index (LongTensor, SparseTensor or tuple): Edge coordinates
+                (sparse COO matrix form), sparse adjacency matrix or CSR pair
+                `(rowptr, col)`.
             num_nodes (int, optional): Number of (total) nodes. Defaults to
                 `None`.
             batch (LongTensor, optional): Batch vector, assigning every node
                 to a specific example in the batch. Defaults to `None`.
+            return_stats (bool, optional): Also return how many times each 
+                work bound has been hit. Defaults to `False`.
+            coalesced (bool, optional): The edge coordinates are already 
+                sorted by row, so that the adjacency is built row by row.
+                Defaults to `False`.
+            self_loops (bool, optional): The graph may contain self-loops. If
+                `False`, the self-loops removal is skipped. Defaults to 
+                `True`.
         
         Returns:
-            (LongTensor, int, LongTensor): A cover index matrix, assigning
-                every node to a specific k-plex in the cover; the number of
+            (LongTensor, int, LongTensor): A cover index matrix (of type
+                `index_dtype`), assigning every node to a specific k-plex in
+                the cover; the number of
                 k-plexes; a batch vector assigning every k-plex to a specific
-                example in the batch.
+                example in the batch. If `return_stats` is `True`, a fourth
+                element is added: a dict with the number of k-plexes stopped
+                by `max_kplex_size` (`"size_cap"`), the number of pivots whose
+                candidates were limited by `max_expansions` 
+                (`"expansion_cap"`) and the number of nodes assigned to a
+                singleton after the `time_budget` expired 
+                (`"timeout_singletons"`), summed over the batch. If `k` is a
+                list, returns a list of such tuples, one for each value of
+                `k`.
         """
-        device = edge_index.device
+        multi_k = isinstance(k, (list, tuple))
+        ks = [int(v) for v in k] if multi_k else [int(k)]
+        num_nodes = num_nodes_of(edge_index, num_nodes)
 
-        if num_nodes is None:
-            num_nodes = edge_index.max().item() + 1
+        if batch is not None or self.reorder is not None:
+            edge_index = to_edge_index(edge_index)
 
         if batch is None:
-            row, col = edge_index.cpu()
-            cover_index = kplex_cpu.kplex_cover(row, col, k, int(num_nodes),
-                                                self.cover_priority,
-                                                self.kplex_priority,
-                                                self.skip_covered).to(device)
-            clusters = cover_index[1].max().item() + 1
+            if self.memo is not None:
+                key = LRUMemo.key('cover', edge_index, num_nodes, ks, self._config(), return_stats, 
+                                  coalesced, self_loops)
+                out = self.memo.get(key)
 
-            return cover_index, clusters, cover_index.new_zeros(clusters)
+                if out is not None:
+                    return out if multi_k else out[0]
+
+            if self.reorder is not None:
+                perm = node_order(edge_index, num_nodes, self.reorder)
+                edge_index = relabel(perm, edge_index)
+                coalesced = False  # The relabeled edges are no longer sorted by row.
+
+            csr = to_csr(edge_index, num_nodes, coalesced)
+            args = (ks, num_nodes, self.cover_priority, self.kplex_priority, self.skip_covered, 
+                    self.core_pruning, self.max_kplex_size, self.max_expansions, self.time_budget, 
+                    self_loops)
+
+            if csr is None:
+                device = edge_index.device
+                row, col = edge_index.cpu().to(self.index_dtype)
+                covers = kplex_cpu.kplex_cover_multi(row, col, *args)
+            else:
+                rowptr, col = csr
+                device = col.device
+                covers = kplex_cpu.kplex_cover_csr(rowptr.cpu(), col.cpu().to(self.index_dtype), *args)
+
+            out = []
+
+            for cover_index, stats in covers:
+                cover_index = cover_index.to(device)
+
+                if self.reorder is not None:
+                    cover_index[0] = perm[cover_index[0]]
+
+                clusters = cover_index[1].max().item() + 1
+                res = (cover_index, clusters, cover_index.new_zeros(clusters))
+                out.append(res + (stats,) if return_stats else res)
+
+            if self.memo is not None:
+                self.memo.put(key, out)
+
+            return out if multi_k else out[0]
 
         count = batch.bincount(minlength=batch[-1] + 1)
-        out_index = []
-        out_batch = []
-        out_clusters = 0
+        out_index = [[] for _ in ks]
+        out_batch = [[] for _ in ks]
+        out_clusters = [0 for _ in ks]
+        out_stats = [{} for _ in ks]
         min_index = 0
 
         for b, num_nodes in enumerate(count):
             mask = batch[edge_index[0]] == b
-            cover_index, clusters, zeros = self(k, edge_index[:, mask] - min_index, num_nodes)
-            cover_index[0].add_(min_index)
-            cover_index[1].add_(out_clusters)
+            covers = self(ks, edge_index[:, mask] - min_index, num_nodes, return_stats=True, 
+                          coalesced=coalesced, self_loops=self_loops)
+
+            for i, (cover_index, clusters, zeros, stats) in enumerate(covers):
+                cover_index[0].add_(min_index)
+                cover_index[1].add_(out_clusters[i])
+
+                out_index[i].append(cover_index)
+                out_batch[i].append(zeros.add_(b))
+                out_clusters[i] += clusters
+
+                for key, val in stats.items():
+                    out_stats[i][key] = out_stats[i].get(key, 0) + val
 
-            out_index.append(cover_index)
-            out_batch.append(zeros.add_(b))
-            out_clusters += clusters
             min_index += num_nodes
 
-        return torch.cat(out_index, dim=1), out_clusters, torch.cat(out_batch, dim=0)
+        out = []
+
+        for index, clusters, batch, stats in zip(out_index, out_clusters, out_batch, out_stats):
+            res = (torch.cat(index, dim=1), clusters, torch.cat(batch, dim=0))
+            out.append(res + (stats,) if return_stats else res)
+
+        return out if multi_k else out[0]
 
     def process(self, dataset, k, 
                 edge_pool_op='add', 
                 q=None, 
                 simplify=False, 
-                verbose=True):
+                verbose=True,
+                dedup=None):
         """Compute the k-plex cover for a whole dataset of graphs and 
         post-process it.
         
         Args:
             dataset (torch_geometric.Dataset): A graph dataset.
-            k (int): Number of maximum missing links per node. Must be at
-                least 1.
+            k (int or list): Number of maximum missing links per node. Must
+                be at least 1. If a list is given, the dataset is processed
+                for each of its values at once.
             edge_pool_op (str, optional): Edge-weights aggregation funciton 
                 (`"add"`, `"mul"`,` "max"`, `"min"`, or `"mean"`). Defaults
                 to `"add"`.
@@ -297,38 +481,174 @@ class KPlexCover:
             simplify (bool, optional): Apply simplification to coarsened
                 grpahs. Defaults to `False`.
             verbose (bool, optional): Show a progress bar. Defaults to `True`.
+            dedup (str, optional): Compute the cover only once for every
+                group of identical (`"exact"`) or isomorphic (`"wl"`) graphs,
+                and share it within the group (see `dedup.graph_groups`). The
+                number of graphs and groups is stored in `dedup_stats`.
+                Defaults to `None`.
         
         Returns:
             (CustomDataset, CustomDataset): The input dataset, augmented with
                 `"cover_index"` and `"num_clusters"` keys, and the coarsened
-                dataset (with no node features).
+                dataset (with no node features). If `k` is a list, returns a
+                list of such pairs, one for each value of `k`.
         """
+        multi_k = isinstance(k, (list, tuple))
+
+        if dedup is not None:
+            groups, reps = self._dedup(dataset, dedup)
+            out = self.process(dataset[reps], k, edge_pool_op, q, simplify, verbose)
+            out = [tuple(self._share_hierarchy(dataset, list(pair), groups, reps)) 
+                   for pair in (out if multi_k else [out])]
+
+            return out if multi_k else out[0]
+
         it = tqdm(dataset, desc="Processing dataset", leave=False) if verbose else dataset
-        in_list = []
-        out_list = []
+        ks = list(k) if multi_k else [k]
+        in_lists = [[] for _ in ks]
+        out_lists = [[] for _ in ks]
         
         for data in it:
-            cover_index, clusters, _ = self(k, data.edge_index, data.num_nodes)
-            
+            keys = dict(data.__iter__())
+            keys['num_nodes'] = data.num_nodes
+
+            for (cover_index, clusters, edge_index, weights), in_list, out_list in \
+                    zip(self._process_graph(data, ks, edge_pool_op, q, simplify), in_lists, out_lists):
+                in_list.append(Cover(cover_index=cover_index, num_clusters=clusters, **keys))
+                out_list.append(Cover(edge_index=edge_index, edge_attr=weights, num_nodes=clusters))
+        
+        out = [(CustomDataset(in_list), CustomDataset(out_list)) for in_list, out_list in zip(in_lists, out_lists)]
+
+        return out if multi_k else out[0]
+
+    def _process_graph(self, data, ks, edge_pool_op, q, simplify):
+        if self.memo is not None:
+            key = LRUMemo.key('process', data.edge_index, data.edge_attr, data.num_nodes, ks, 
+                              edge_pool_op, q, simplify, self._config())
+            out = self.memo.get(key)
+
+            if out is not None:
+                return out
+
+        covers = self(ks, data.edge_index, data.num_nodes)
+        in_index = data.edge_index.to(self.index_dtype)
+        out = []
+
+        for cover_index, clusters, _ in covers:
             if q is not None:
                 cover_index, clusters, _ = hub_promotion(cover_index, q=q, 
                                                          num_nodes=data.num_nodes, 
                                                          num_clusters=clusters)
 
-            edge_index, weights = cover_pool_edge(cover_index, data.edge_index, data.edge_attr, 
+            edge_index, weights = cover_pool_edge(cover_index, in_index, data.edge_attr, 
                                                   data.num_nodes, clusters, pool=edge_pool_op)
 
             if simplify:
                 edge_index, weights = simplify_graph(edge_index, weights, num_nodes=clusters)
-            
+
+            out.append((cover_index, clusters, edge_index, weights))
+
+        if self.memo is not None:
+            self.memo.put(key, out)
+
+        return out
+
+    def build_hierarchy(self, edge_index, edge_attr, ks, num_nodes=None,
+                        edge_pool_op='add',
+                        q=None,
+                        simplify=False):
+        """Build the hierarchy of coarsened graphs of a single graph in one
+        native call, without moving the intermediate graphs back to Python.
+        The result is the same of calling `process` once for every layer.
+        
+        Args:
+            edge_index (LongTensor): Edge coordinates (sparse COO matrix 
+                form).
+            edge_attr (FloatTensor): Weights of the edges. If `None`, 
+                defaults to a vector of ones.
+            ks (list): A list of k parameters, one for each layer of the 
+                hierarchy.
+            num_nodes (int, optional): Number of nodes. Defaults to `None`.
+            edge_pool_op (str, optional): Edge-weights aggregation funciton 
+                (`"add"`, `"mul"`,` "max"`, `"min"`, or `"mean"`). Defaults
+                to `"add"`.
+            q (float, optional): Hub-promotion quantile threshold (must be a
+                float in [0, 1]). Defaults to `None`.
+            simplify (bool, optional): Apply simplification to coarsened
+                grpahs. Defaults to `False`.
+        
+        Raises:
+            ValueError: If provided an undefined aggregation function.
+        
+        Returns:
+            list: A list of tuples `(cover_index, num_clusters, edge_index,
+                edge_attr)`, one for each value in `ks`, containing the cover
+                of the graph at that layer and the resulting coarsened graph.
+        """
+        pool_op = getattr(pool_edges_cpu.PoolOp, edge_pool_op, None)
+        device = edge_index.device
+
+        if pool_op is None:
+            raise ValueError('Not a valid operation: %s' % edge_pool_op)
+
+        if num_nodes is None:
+            num_nodes = edge_index.max().item() + 1
+
+        if edge_attr is None:
+            edge_attr = torch.ones(edge_index.size(1), dtype=torch.float, device=device)
+
+        if self.memo is not None:
+            key = LRUMemo.key('hierarchy', edge_index, edge_attr, num_nodes, ks, edge_pool_op, q, simplify, 
+                              self._config())
+            out = self.memo.get(key)
+
+            if out is not None:
+                return out
+
+        reorder = None if self.reorder is None else getattr(reorder_cpu.NodeOrder, self.reorder)
+        row, col = edge_index.cpu().to(self.index_dtype)
+        layers = hierarchy_cpu.build_hierarchy(row, col, edge_attr.cpu(), [int(k) for k in ks], int(num_nodes),
+                                               self.cover_priority, self.kplex_priority, 
+                                               self.skip_covered, self.core_pruning,
+                                               self.max_kplex_size, self.max_expansions,
+                                               self.time_budget, pool_op, q, simplify, reorder)
+
+        out = [(cover_index.to(device), clusters, index.to(device), weights.to(device))
+               for cover_index, clusters, index, weights in layers]
+
+        if self.memo is not None:
+            self.memo.put(key, out)
+
+        return out
+
+    def _dedup(self, dataset, method):
+        groups = graph_groups(dataset, method)
+        self.dedup_stats = group_stats(groups)
+        reps = sorted({rep for rep, _ in groups})
+
+        return groups, torch.tensor(reps, dtype=torch.long)
+
+    def _share_hierarchy(self, dataset, hierarchy, groups, reps):
+        position = {rep: i for i, rep in enumerate(reps.tolist())}
+        layers = [[] for _ in hierarchy]
+
+        for data, (rep, perm) in zip(dataset, groups):
+            shared = [layer[position[rep]] for layer in hierarchy]
+            cover_index = shared[0].cover_index
+
+            if perm is not None:
+                cover_index = torch.stack([perm[cover_index[0].long()].to(cover_index.dtype), cover_index[1]])
+
             keys = dict(data.__iter__())
             keys['num_nodes'] = data.num_nodes
-            in_list.append(Cover(cover_index=cover_index, num_clusters=clusters, **keys))
-            out_list.append(Cover(edge_index=edge_index, edge_attr=weights, num_nodes=clusters))
-        
-        return CustomDataset(in_list), CustomDataset(out_list)
+            layers[0].append(Cover(cover_index=cover_index, num_clusters=shared[0].num_clusters, **keys))
 
-    def get_representations(self, dataset, ks, verbose=True, *args, **kwargs):
+            for layer, graph in zip(layers[1:], shared[1:]):
+                layer.append(graph)
+
+        return [CustomDataset(data_list) for data_list in layers]
+
+    def get_representations(self, dataset, ks, verbose=True, *args, native=False, dedup=None, **kwargs):
         """Build a hierarchy of graphs for each graph in a given dataset.
         
         Args:
@@ -336,6 +656,14 @@ class KPlexCover:
             ks (list): A list of k parameters, one for each layer of the 
                 hierarchy.
             verbose (bool, optional): Show a progress bar. Defaults to True.
+            native (bool, optional): Build the whole hierarchy of every graph
+                with a single native call (see `build_hierarchy`). Defaults
+                to `False`.
+            dedup (str, optional): Build the hierarchy only once for every
+                group of identical (`"exact"`) or isomorphic (`"wl"`) graphs,
+                and share it within the group (see `dedup.graph_groups`). The
+                number of graphs and groups is stored in `dedup_stats`.
+                Defaults to `None`.
         
         Returns:
             list: A list of `CustomDataset`s, where every dataset (apart from 
@@ -343,6 +671,15 @@ class KPlexCover:
                 of the graph at the same index in the previous dataset in the 
                 list. 
         """
+        if dedup is not None and len(ks) > 0:
+            groups, reps = self._dedup(dataset, dedup)
+            hierarchy = self.get_representations(dataset[reps], ks, verbose, *args, native=native, **kwargs)
+
+            return self._share_hierarchy(dataset, hierarchy, groups, reps)
+
+        if native:
+            return self._get_native_representations(dataset, ks, verbose, *args, **kwargs)
+
         last_dataset = dataset
         output = []
 
@@ -357,7 +694,25 @@ class KPlexCover:
         
         return output
 
-    def get_cover_fun(self, ks, dataset=None, dense=False, *args, **kwargs):
+    def _get_native_representations(self, dataset, ks, verbose=True, *args, **kwargs):
+        it = tqdm(dataset, desc="Creating Hierarchical Representations", leave=False) if verbose else dataset
+        layers = [[] for _ in range(len(ks) + 1)]
+
+        for data in it:
+            hierarchy = self.build_hierarchy(data.edge_index, data.edge_attr, ks, data.num_nodes, *args, **kwargs)
+            keys = dict(data.__iter__())
+            keys['num_nodes'] = data.num_nodes
+
+            for l, (cover_index, clusters, edge_index, weights) in enumerate(hierarchy):
+                layers[l].append(Cover(cover_index=cover_index, num_clusters=clusters, **keys))
+                keys = {'edge_index': edge_index, 'edge_attr': weights, 'num_nodes': clusters}
+
+            layers[-1].append(Cover(**keys))
+
+        return [CustomDataset(data_list) for data_list in layers]
+
+    def get_cover_fun(self, ks, dataset=None, dense=False, *args, hierarchy=None, lazy=False, collated=False, 
+                      shared=False, lazy_layers=False, **kwargs):
         """Build and return a function that, for a given dataset and a set of
         indices, computes and returns the graph hierarchies at that indices. 
         If `dataset` is not `None`, the hiearachies are precomputed for that 
@@ -372,20 +727,237 @@ class KPlexCover:
                 function will be dense starting from the given layer. `True`
                 acts as 0, while `False` as `len(ks) + 1`. Defaults to
                 `False`.
+            hierarchy (list, optional): The already computed hierarchy of
+                `dataset` (e.g., obtained with `data.unpack_hierarchy`). If
+                given, no cover is computed. Defaults to `None`.
+            lazy (bool, optional): Densify the graphs only when requested,
+                padding them to the size of the batch (see `DenseDataset`).
+                Defaults to `False`.
+            collated (bool, optional): Return the sparse layers of the
+                hierarchy already batched, gathering them from the
+                concatenated tensors of every layer (see `CollatedDataset`).
+                Defaults to `False`.
+            shared (bool, optional): Move the precomputed hierarchy to shared
+                memory and return it as a `prefetch.SharedHierarchy`, which
+                can be indexed by the workers of a `prefetch.HierarchyLoader`.
+                Ignored if the hierarchy is not precomputed. Defaults to
+                `False`.
+            lazy_layers (bool, optional): Compute every layer of the
+                hierarchy of `dataset` only when it is first requested, and
+                return it as a `LazyHierarchy`. Cannot be combined with
+                `shared`. Defaults to `False`.
+
+        Raises:
+            ValueError: If both `shared` and `lazy_layers` are requested.
         
         Returns:
             callable: The graph-hierarchy function.
         """
         dense = int(not dense)*(len(ks) + 1) if isinstance(dense, bool) else dense
 
+        def wrap(hierarchy):
+            # Indices are upcast once here, not for every batch.
+            return [DenseDataset(ds, lazy) if l >= dense else 
+                    CollatedDataset(long_indices(ds)) if collated else long_indices(ds)
+                    for l, ds in enumerate(hierarchy)]
+
         def cover_fun(ds, idx):
-            hierarchy = self.get_representations(ds[idx], ks, *args, **kwargs)
-            
-            return [DenseDataset(ds) if l >= dense else ds for l, ds in enumerate(hierarchy)]
+            return wrap(self.get_representations(ds[idx], ks, *args, **kwargs))
 
-        if dataset is None:
+        if hierarchy is not None:
+            cache = wrap(hierarchy)
+        elif dataset is None:
             return lambda ds, idx: [c[:] for c in cover_fun(ds, idx)]
+        elif lazy_layers:
+            if shared:
+                raise ValueError('A lazy hierarchy cannot be shared, it must be precomputed')
 
-        cache = cover_fun(dataset, slice(None))
+            return LazyHierarchy(self, dataset, ks, dense, lazy, collated, *args, **kwargs)
+        else:
+            cache = cover_fun(dataset, slice(None))
+
+        if shared:
+            return SharedHierarchy(cache)
 
         return lambda _, idx: [ds[idx] for ds in cache]
+
+
+class LazyHierarchy:
+    """Graph-hierarchy function (see `KPlexCover.get_cover_fun`) computing
+    the layers of the hierarchy of a dataset only when they are first
+    requested. The lower layers are computed once, and reused by the deeper
+    ones. Calling it returns a sequence of the layers at the given indices,
+    where slicing computes only the sliced layers. The last layer of a slice
+    is not covered, unless its cover was already computed.
+
+    Args:
+        kplex_cover (KPlexCover): The cover algorithm.
+        dataset (torch_geometric.Dataset): A graph dataset.
+        ks (list): A list of k parameters, one for each layer of the 
+            hierarchy.
+        dense (int or bool, optional): The layers will be dense starting from
+            the given one. `True` acts as 0, while `False` as `len(ks) + 1`.
+            Defaults to `False`.
+        lazy (bool, optional): Densify the graphs only when requested (see
+            `DenseDataset`). Defaults to `False`.
+        collated (bool, optional): Batch the sparse layers from their
+            concatenated tensors (see `CollatedDataset`). Defaults to `False`.
+
+    Other positional and keyword arguments are passed to `KPlexCover.process`
+    (e.g., `edge_pool_op`, `q`, or `simplify`).
+
+    Raises:
+        ValueError: If the native hierarchy construction is requested, since
+            it builds every layer at once.
+    """
+    def __init__(self, kplex_cover, dataset, ks, dense=False, lazy=False, collated=False, *args, **kwargs):
+        self.kplex_cover = kplex_cover
+        self.ks = list(ks)
+        self.dense = int(not dense)*(len(ks) + 1) if isinstance(dense, bool) else dense
+        self.lazy = lazy
+        self.collated = collated
+        self.args = args
+        self.kwargs = kwargs
+        self.kwargs.setdefault('verbose', False)
+
+        if self.kwargs.pop('native', False):
+            raise ValueError('A lazy hierarchy cannot be built natively')
+
+        self._graphs = [dataset]
+        self._covers = []
+        self._layers = {}
+
+    def __len__(self):
+        return len(self.ks) + 1
+
+    @property
+    def num_computed(self):
+        """int: Number of layers whose cover has been computed."""
+        return len(self._covers)
+
+    def _compute(self, steps):
+        while len(self._covers) < steps:
+            level = len(self._covers)
+            cover, graphs = self.kplex_cover.process(self._graphs[level], self.ks[level], *self.args, **self.kwargs)
+            self._covers.append(cover)
+            self._graphs.append(graphs)
+
+    def layer(self, level, covered=True):
+        """Return (and compute, if needed) a layer of the hierarchy.
+
+        Args:
+            level (int): The layer (0 is the input dataset).
+            covered (bool, optional): If `False`, the cover of the layer is
+                not computed if missing. Defaults to `True`.
+
+        Returns:
+            torch_geometric.Dataset: The layer, wrapped as by
+                `KPlexCover.get_cover_fun`.
+        """
+        if level < 0 or level > len(self.ks):
+            raise IndexError('Not a valid layer: %s' % level)
+
+        self._compute(level + 1 if covered and level < len(self.ks) else level)
+        with_cover = level < len(self._covers)
+        key = level, with_cover
+
+        if key not in self._layers:
+            ds = self._covers[level] if with_cover else self._graphs[level]
+
+            if level >= self.dense:
+                ds = DenseDataset(ds, self.lazy)
+            elif self.collated:
+                ds = CollatedDataset(long_indices(ds))
+            else:
+                ds = long_indices(ds)
+
+            self._layers[key] = ds
+
+        return self._layers[key]
+
+    def __call__(self, dataset, idx):
+        return _LazyHierarchyView(self, idx)
+
+    def __deepcopy__(self, memo):
+        # Shared, with its computed layers (e.g., when skorch clones a
+        # model's parameters).
+        return self
+
+
+class _LazyHierarchyView:
+    # The layers of a `LazyHierarchy` at given indices.
+    def __init__(self, hierarchy, idx):
+        self.hierarchy = hierarchy
+        self.idx = idx
+
+    def __len__(self):
+        return len(self.hierarchy)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            levels = range(len(self))[key]
+            last = max(levels, default=-1)
+
+            return [self.hierarchy.layer(l, covered=l < last)[self.idx] for l in levels]
+
+        return self.hierarchy.layer(range(len(self))[key])[self.idx]
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class HierarchyTransform:
+    """Transform computing the hierarchy of covers and coarsened graphs of a
+    graph (see `KPlexCover.build_hierarchy`) and storing it in a 
+    `HierarchyData`. Used as `pre_transform` of a `torch_geometric` dataset,
+    the hierarchies are computed once, while processing it, and saved along
+    with the dataset. Use `data.unpack_hierarchy` to obtain the hierarchy of
+    datasets.
+    
+    Args:
+        kplex_cover (KPlexCover): The cover algorithm.
+        ks (list): A list of k parameters, one for each layer of the 
+            hierarchy.
+        edge_pool_op (str, optional): Edge-weights aggregation funciton 
+            (`"add"`, `"mul"`,` "max"`, `"min"`, or `"mean"`). Defaults to
+            `"add"`.
+        q (float, optional): Hub-promotion quantile threshold (must be a
+            float in [0, 1]). Defaults to `None`.
+        simplify (bool, optional): Apply simplification to coarsened
+            grpahs. Defaults to `False`.
+    """
+
+    def __init__(self, kplex_cover, ks, edge_pool_op='add', q=None, simplify=False):
+        self.kplex_cover = kplex_cover
+        self.ks = list(ks)
+        self.edge_pool_op = edge_pool_op
+        self.q = q
+        self.simplify = simplify
+
+    def __call__(self, data):
+        hierarchy = self.kplex_cover.build_hierarchy(data.edge_index, data.edge_attr, self.ks, data.num_nodes,
+                                                     edge_pool_op=self.edge_pool_op, q=self.q, 
+                                                     simplify=self.simplify)
+        out = HierarchyData(**dict(data.__iter__()))
+        out.num_nodes = data.num_nodes
+
+        for l, (cover_index, clusters, edge_index, weights) in enumerate(hierarchy):
+            out['cover_index_%d' % l] = cover_index
+            out['num_clusters_%d' % l] = clusters
+            out['edge_index_%d' % (l + 1)] = edge_index
+            out['edge_attr_%d' % (l + 1)] = weights
+
+        return out
+
+    def __repr__(self):
+        # Every setting affecting the hierarchy, so that datasets processed
+        # with a different one are detected as stale by `torch_geometric`.
+        names = ('cover_priority', 'kplex_priority', 'skip_covered', 'core_pruning', 'max_kplex_size', 
+                 'max_expansions', 'time_budget', 'reorder', 'index_dtype')
+        cover = ', '.join('{}={}'.format(n, v) for n, v in zip(names, self.kplex_cover._config()))
+
+        return '{}(ks={}, {}, edge_pool_op={}, q={}, simplify={})'.format(self.__class__.__name__, self.ks, cover,
+                                                                         self.edge_pool_op, self.q, self.simplify)
@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from hashlib import blake2b
+
+import torch
+from torch_sparse import SparseTensor
+
+
+def _clone(value):
+    if torch.is_tensor(value):
+        return value.clone()
+
+    if isinstance(value, (list, tuple)):
+        return type(value)(_clone(v) for v in value)
+
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+
+    return value
+
+
+class LRUMemo:
+    """Bounded in-memory memo, evicting the least recently used entries. The
+    keys are digests of the content of the given tensors and parameters (see
+    `key`), so that identical graphs share the same entry regardless of the
+    tensor objects holding them. Stored and returned values are cloned, hence
+    they can be safely modified in-place by the caller. The memo can be
+    shared by multiple threads.
+
+    Args:
+        max_size (int): Maximum number of entries.
+
+    Attributes:
+        hits (int): Number of `get` calls that found their key.
+        misses (int): Number of `get` calls that did not find their key.
+    """
+
+    def __init__(self, max_size):
+        if max_size < 1:
+            raise ValueError('Not a valid memo size: %s' % max_size)
+
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*items):
+        """Compute the key of a list of tensors (or sparse tensors, or tuples
+        of tensors) and other parameters.
+
+        Returns:
+            bytes: A BLAKE2b digest of the type, shape and content of the
+                tensors, and of the representation of the other items.
+        """
+        digest = blake2b(digest_size=16)
+        LRUMemo._update(digest, items)
+
+        return digest.digest()
+
+    @staticmethod
+    def _update(digest, items):
+        for item in items:
+            if isinstance(item, SparseTensor):
+                item = item.csr()
+
+            if isinstance(item, (list, tuple)):
+                digest.update(b'(')
+                LRUMemo._update(digest, item)
+                digest.update(b')')
+            elif torch.is_tensor(item):
+                item = item.detach().cpu().contiguous()
+                digest.update(repr((item.dtype, tuple(item.size()))).encode())
+                digest.update(item.numpy().tobytes())
+            else:
+                digest.update(repr(item).encode())
+
+            digest.update(b'|')
+
+    def get(self, key):
+        """Return the value of a given key (marking it as recently used), or
+        `None` if it is not in the memo."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            value = self._entries[key]
+
+        return _clone(value)
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entry if the memo
+        is full."""
+        value = _clone(value)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all the entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        """dict: Number of hits, misses and stored entries."""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
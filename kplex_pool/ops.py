@@ -0,0 +1,82 @@
+from typing import List, Optional, Tuple
+
+import torch
+
+# Loading the extension registers the `torch.ops.kplex_pool` operators.
+from kplex_pool import ops_cpu  # noqa: F401
+
+
+def kplex_cover(edge_index: torch.Tensor, k: int, num_nodes: int,
+                cover_priority: Optional[List[str]] = None,
+                kplex_priority: Optional[List[str]] = None,
+                skip_covered: bool = False,
+                core_pruning: bool = False) -> torch.Tensor:
+    """TorchScript-compatible version of `KPlexCover.__call__`, for a single
+    graph.
+
+    Args:
+        edge_index (LongTensor): Edge coordinates (sparse COO matrix form).
+        k (int): Number of maximum missing links per node.
+        num_nodes (int): Number of nodes.
+        cover_priority (list, optional): Names of the priorities used to
+            extract the pivot node (see `KPlexCover`). Defaults to `None`
+            (`["min_degree", "min_uncovered"]`).
+        kplex_priority (list, optional): Names of the priorities used to
+            extract the next k-plex candidate (see `KPlexCover`). Defaults to
+            `None` (`["max_in_kplex", "max_candidates", "max_uncovered"]`).
+        skip_covered (bool, optional): Give max priority to uncovered nodes.
+            Defaults to `False`.
+        core_pruning (bool, optional): Use the core numbers of the nodes to
+            prune the k-plex candidates. Defaults to `False`.
+
+    Returns:
+        LongTensor: The cover index matrix.
+    """
+    return torch.ops.kplex_pool.kplex_cover(edge_index, k, num_nodes, cover_priority, kplex_priority,
+                                            skip_covered, core_pruning)
+
+
+def cover_pool_edge(cover_index: torch.Tensor, edge_index: torch.Tensor, edge_attr: torch.Tensor,
+                    num_nodes: int, pool: str = "add") -> Tuple[torch.Tensor, torch.Tensor]:
+    """TorchScript-compatible version of `pool.cover_pool_edge`.
+
+    Args:
+        cover_index (LongTensor): Cover assignment matrix, in sparse
+            coordinate form.
+        edge_index (LongTensor): Edge coordinate matrix.
+        edge_attr (FloatTensor): Weights of the edges.
+        num_nodes (int): Number of total nodes.
+        pool (str, optional): Edge agregation function (`"add"`, `"mul"`,
+            `"mean"`, `"min"` or `"max"`). Defaults to "add".
+
+    Returns:
+        (LongTensor, FloatTensor): Sparse coordinate representation of the
+            coarsened graphs.
+    """
+    return torch.ops.kplex_pool.cover_pool_edge(cover_index, edge_index, edge_attr, num_nodes, pool)
+
+
+def cover_pool_node(cover_index: torch.Tensor, x: torch.Tensor, num_clusters: Optional[int] = None,
+                    pool: str = "add", dense: bool = False,
+                    cover_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+    """TorchScript-compatible version of `pool.cover_pool_node`. Supports
+    autograd.
+
+    Args:
+        cover_index (LongTensor): Cover assignment matrix, in sparse
+            coordinate form (or dense, if `dense` is `True`).
+        x (FloatTensor): Feature matrix of the nodes in the graph(s).
+        num_clusters (int, optional): Number of total k-plexes. Defaults to
+            `None`.
+        pool (str, optional): Aggregation function (`"add"`, `"mean"`, `"min"`
+            or `"max"`). Defaults to `"add"`.
+        dense (bool, optional): If `True`, compute the aggregation in dense
+            graph form. Defaults to `False`.
+        cover_mask (ByteTensor, optional): Boolean tensor representing the
+            columns of the cover assignment matrix that contain significant
+            data. Can be used only if `dense` is `True`. Defaults to `None`.
+
+    Returns:
+        FloatTensor: The feature matrix of the coarsened graph.
+    """
+    return torch.ops.kplex_pool.cover_pool_node(cover_index, x, num_clusters, pool, dense, cover_mask)
@@ -5,6 +5,8 @@ import torch_scatter
 from torch_geometric.utils import remove_self_loops
 
 from kplex_pool import pool_edges_cpu
+from kplex_pool.reorder import node_order, relabel
+from kplex_pool.adjacency import num_nodes_of, to_csr, to_edge_index
 
 
 
@@ -57,14 +59,15 @@ def cover_pool_node(cover_index, x, num_clusters=None, pool='add', dense=False,
     
     xs = x.index_select(0, cover_index[0])
     pool_op = getattr(torch_scatter, "scatter_{}".format(pool))
-    out = pool_op(xs, cover_index[1], dim=0, dim_size=num_clusters)
+    out = pool_op(xs, cover_index[1].long(), dim=0, dim_size=num_clusters)
 
     if isinstance(out, tuple):
         out = out[0]
 
     return out
 
-def cover_pool_edge(cover_index, edge_index, edge_values=None, num_nodes=None, num_clusters=None, pool="add"):
+def cover_pool_edge(cover_index, edge_index, edge_values=None, num_nodes=None, num_clusters=None, pool="add",
+                    reorder=None, coalesced=False):
     """For every two k-plexes in a given cover, aggregate the weights of all
     the edges having its endvertices on both of them.
     
@@ -72,14 +75,23 @@ def cover_pool_edge(cover_index, edge_index, edge_values=None, num_nodes=None, n
         cover_index (LongTensor): Cover assignment matrix, in sparse 
             coordinate form. It can assign nodes of different graphs in a
             batch.
-        edge_index (LongTensor): Edge coordinate matrix.
-        edge_values (FloatTensor, optional): Weights of the edges. If `None`,
-            defaults to a vector of ones. Defaults to `None`.
+        edge_index (LongTensor, SparseTensor or tuple): Edge coordinate 
+            matrix, sparse adjacency matrix or CSR pair `(rowptr, col)`.
+        edge_values (FloatTensor, optional): Weights of the edges, in the
+            same order of `edge_index`. If `None`, defaults to the values of
+            the sparse adjacency matrix or to a vector of ones. Defaults to
+            `None`.
         num_nodes (int, optional): Number of total nodes. Defaults to None.
         num_clusters (int, optional): Number of total k-plexes. Defaults to 
             `None`.
         pool (str, optional): Edge agregation function (`"add"`, `"mul"`, 
             `"mean"`, `"min"` or `"max"`). Defaults to "add".
+        reorder (str, optional): If given, relabel the nodes with the given
+            ordering method before pooling (see `reorder.node_order`). The
+            output does not depend on the node labels. Defaults to `None`.
+        coalesced (bool, optional): The edge coordinate matrix is already
+            sorted by row, so that the edges can be visited row by row.
+            Defaults to `False`.
     
     Raises:
         ValueError: If provided an undefined aggregation function.
@@ -97,17 +109,35 @@ def cover_pool_edge(cover_index, edge_index, edge_values=None, num_nodes=None, n
     if num_clusters is None:
         num_clusters = cover_index[1].max().item() + 1
     
-    if num_nodes is None:
-        num_nodes = edge_index.max().item() + 1
+    num_nodes = num_nodes_of(edge_index, num_nodes)
     
-    if edge_values is None:
-        edge_values = torch.ones(edge_index.size(1), dtype=torch.float, device=device)
+    if edge_values is None and isinstance(edge_index, torch_sparse.SparseTensor):
+        edge_values = edge_index.storage.value()
+
+    if reorder is not None:
+        edge_index = to_edge_index(edge_index)
+        perm = node_order(edge_index, num_nodes, reorder)
+        cover_row, edge_index = relabel(perm, cover_index[0], edge_index)
+        cover_index = torch.stack([cover_row, cover_index[1]])
+        coalesced = False  # The relabeled edges are no longer sorted by row.
+
+    csr = to_csr(edge_index, num_nodes, coalesced)
     
+    if edge_values is None:
+        num_edges = edge_index.size(1) if csr is None else csr[1].numel()
+        edge_values = torch.ones(num_edges, dtype=torch.float, device=device)
+
     cover_row, cover_col = cover_index.cpu()
-    row, col = edge_index.cpu()
     weight = edge_values.cpu()
     
-    out_row, out_col, out_weight = pool_edges_cpu.pool_edges(cover_row, cover_col, row, col, weight, pool_op, num_nodes)
+    if csr is None:
+        row, col = edge_index.cpu()
+        out_row, out_col, out_weight = pool_edges_cpu.pool_edges(cover_row, cover_col, row, col, 
+                                                                 weight, pool_op, num_nodes)
+    else:
+        rowptr, col = csr
+        out_row, out_col, out_weight = pool_edges_cpu.pool_edges_csr(cover_row, cover_col, rowptr.cpu(), col.cpu(), 
+                                                                     weight, pool_op, num_nodes)
     
     return torch.stack([out_row, out_col]).to(device), out_weight.to(device)
 
@@ -0,0 +1,243 @@
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import torch
+from torch.utils.data import DataLoader
+from torch.utils.data.dataloader import default_collate
+from torch_geometric.data import Batch
+
+from kplex_pool.memo import LRUMemo
+from kplex_pool.data import share_memory
+
+
+def _first(batch):
+    return batch[0]
+
+
+def _as_batch(layer):
+    # Batch the graphs of a layer, unless they already are.
+    return layer if isinstance(layer, Batch) else Batch.from_data_list(list(layer))
+
+
+class HierarchyPrefetcher:
+    """Wrap a graph-hierarchy function (see `KPlexCover.get_cover_fun`),
+    computing its results in background threads for the batches that are
+    announced with `prefetch`. Calling the prefetcher returns the prefetched
+    result of the given indices (waiting for it, if needed), or computes it
+    synchronously if it was not announced. Since the native kernels release
+    the GIL, the hierarchies are built while the model runs.
+
+    Results are shared with the caller, hence the wrapped function should
+    not reuse its output buffers (e.g., `DenseDataset` with
+    `reuse_buffers=True`).
+
+    Args:
+        cover_fun (callable): The graph-hierarchy function.
+        dataset (torch_geometric.Dataset, optional): The dataset passed to
+            `cover_fun` by the prefetching threads. Defaults to `None`.
+        max_pending (int, optional): Maximum number of prefetched batches
+            waiting to be consumed. The oldest ones are dropped if exceeded.
+            Defaults to `2`.
+        num_workers (int, optional): Number of background threads. Defaults
+            to `1`.
+
+    Attributes:
+        hits (int): Number of calls that found their batch prefetched.
+        misses (int): Number of calls computed synchronously.
+    """
+    def __init__(self, cover_fun, dataset=None, max_pending=2, num_workers=1):
+        if max_pending < 1:
+            raise ValueError('Not a valid number of pending batches: %s' % max_pending)
+
+        self.cover_fun = cover_fun
+        self.dataset = dataset
+        self.max_pending = max_pending
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(num_workers)
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(idx):
+        return LRUMemo.key(torch.as_tensor(idx).view(-1).long())
+
+    def prefetch(self, idx):
+        """Start computing the hierarchy of the graphs at the given indices."""
+        idx = torch.as_tensor(idx).view(-1).long().cpu()
+        future = self._executor.submit(self.cover_fun, self.dataset, idx)
+
+        with self._lock:
+            self._pending[self._key(idx)] = future
+
+            while len(self._pending) > self.max_pending:
+                _, dropped = self._pending.popitem(last=False)
+                dropped.cancel()
+
+    def __call__(self, dataset, idx):
+        with self._lock:
+            future = self._pending.pop(self._key(idx), None)
+
+            if future is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if future is None:
+            return self.cover_fun(dataset, idx)
+
+        return future.result()
+
+    def clear(self):
+        """Drop the pending batches and reset the counters."""
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+
+            self._pending.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __deepcopy__(self, memo):
+        # Shared, like the function it wraps (e.g., when skorch clones a
+        # model's parameters).
+        return self
+
+
+class PrefetchLoader:
+    """Iterate the batches of a loader, announcing every batch to a
+    `HierarchyPrefetcher` `max_pending` steps before yielding it. Can be used
+    as `iterator_train` (or `iterator_valid`) of a skorch model whose
+    `cover_fun` is the prefetcher.
+
+    Args:
+        dataset (torch.utils.data.Dataset): Dataset of samples.
+        prefetcher (HierarchyPrefetcher): The prefetcher to feed.
+        loader (type, optional): The wrapped loader class (e.g.,
+            `data.BucketLoader`), built with `dataset` and the remaining
+            keyword arguments. Defaults to `DataLoader`.
+        graph_index (callable, optional): Function mapping a batch to the
+            indices of its graphs. Defaults to `None` (the first element of
+            the batch, as in skorch datasets).
+    """
+    def __init__(self, dataset, prefetcher, loader=DataLoader, graph_index=None, **kwargs):
+        self.loader = loader(dataset, **kwargs)
+        self.prefetcher = prefetcher
+        self.graph_index = _first if graph_index is None else graph_index
+
+    def __iter__(self):
+        queue = deque()
+
+        for batch in self.loader:
+            self.prefetcher.prefetch(self.graph_index(batch))
+            queue.append(batch)
+
+            if len(queue) == self.prefetcher.max_pending:
+                yield queue.popleft()
+
+        while queue:
+            yield queue.popleft()
+
+    def __len__(self):
+        return len(self.loader)
+
+
+class SharedHierarchy:
+    """Graph-hierarchy function (see `KPlexCover.get_cover_fun`) over a
+    precomputed hierarchy whose tensors are moved to shared memory (see
+    `data.share_memory`). Indexing it is read-only, hence it can be done by
+    the worker processes of a `HierarchyLoader`, without copying the
+    hierarchy in every worker. Calling it returns the hierarchy of the
+    given indices, as assembled by a worker if available.
+
+    Args:
+        layers (list): The layers of the hierarchy (e.g., `CustomDataset`,
+            `CollatedDataset` or `DenseDataset`, with no reused buffers).
+        max_ready (int, optional): Maximum number of batches assembled by the
+            workers waiting to be consumed. The oldest ones are dropped if
+            exceeded. Defaults to `8`.
+    """
+    def __init__(self, layers, max_ready=8):
+        self.layers = [share_memory(layer) for layer in layers]
+        self.max_ready = max_ready
+        self._ready = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, idx):
+        return [layer[idx] for layer in self.layers]
+
+    def put(self, idx, hierarchy):
+        """Store the hierarchy of the given indices, assembled elsewhere."""
+        with self._lock:
+            self._ready[HierarchyPrefetcher._key(idx)] = hierarchy
+
+            while len(self._ready) > self.max_ready:
+                self._ready.popitem(last=False)
+
+    def __call__(self, dataset, idx):
+        with self._lock:
+            hierarchy = self._ready.pop(HierarchyPrefetcher._key(idx), None)
+
+        return self[idx] if hierarchy is None else hierarchy
+
+    def __getstate__(self):
+        # Workers only index the layers.
+        return {'layers': self.layers, 'max_ready': self.max_ready}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class _HierarchyCollate:
+    # Collate function run by the workers, assembling the hierarchy of every
+    # batch along with it.
+    def __init__(self, hierarchy, collate_fn, graph_index):
+        self.hierarchy = hierarchy
+        self.collate_fn = collate_fn
+        self.graph_index = graph_index
+
+    def __call__(self, samples):
+        batch = self.collate_fn(samples)
+        idx = torch.as_tensor(self.graph_index(batch)).view(-1).long()
+
+        return batch, idx, [_as_batch(layer) for layer in self.hierarchy[idx]]
+
+
+class HierarchyLoader:
+    """Iterate the batches of a loader whose worker processes also assemble
+    the hierarchy of every batch from a `SharedHierarchy`, handing it over to
+    the main process. Every layer is handed over as a `Batch`, so that the
+    sparse layers are batched by the workers too. Can be used as `iterator_train` (or `iterator_valid`)
+    of a skorch model whose `cover_fun` is the shared hierarchy.
+
+    Args:
+        dataset (torch.utils.data.Dataset): Dataset of samples.
+        hierarchy (SharedHierarchy): The shared hierarchy.
+        loader (type, optional): The wrapped loader class (e.g.,
+            `data.BucketLoader`), built with `dataset` and the remaining
+            keyword arguments (e.g., `num_workers`). Defaults to
+            `DataLoader`.
+        graph_index (callable, optional): Picklable function mapping a batch
+            to the indices of its graphs. Defaults to `None` (the first
+            element of the batch, as in skorch datasets).
+        collate_fn (callable, optional): The collate function of the samples.
+            Defaults to `None` (`default_collate`).
+    """
+    def __init__(self, dataset, hierarchy, loader=DataLoader, graph_index=None, collate_fn=None, **kwargs):
+        collate_fn = _HierarchyCollate(hierarchy, default_collate if collate_fn is None else collate_fn,
+                                       _first if graph_index is None else graph_index)
+        self.loader = loader(dataset, collate_fn=collate_fn, **kwargs)
+        self.hierarchy = hierarchy
+
+    def __iter__(self):
+        for batch, idx, hierarchy in self.loader:
+            self.hierarchy.put(idx, hierarchy)
+
+            yield batch
+
+    def __len__(self):
+        return len(self.loader)
@@ -0,0 +1,54 @@
+import torch
+from kplex_pool import reorder_cpu
+
+
+def node_order(edge_index, num_nodes=None, method='rcm'):
+    """Compute a permutation of the nodes of a given graph that improves the 
+    locality of the memory accesses of the native kernels.
+    
+    Args:
+        edge_index (LongTensor): Edge coordinate matrix.
+        num_nodes (int, optional): Number of nodes. Defaults to None.
+        method (str, optional): Ordering method (`"degree"`, for decreasing
+            degree, `"rcm"`, for Reverse Cuthill-McKee, or `"bfs"`, for
+            breadth-first order). Defaults to `"rcm"`.
+    
+    Raises:
+        ValueError: If provided an undefined ordering method.
+    
+    Returns:
+        LongTensor: Vector containing, at position `i`, the index of the node
+            that is the `i`-th in the new order.
+    """
+    order = getattr(reorder_cpu.NodeOrder, method, None)
+
+    if order is None:
+        raise ValueError('Not a valid ordering: %s' % method)
+
+    if num_nodes is None:
+        num_nodes = edge_index.max().item() + 1
+
+    device = edge_index.device
+    row, col = edge_index.cpu()
+
+    out = reorder_cpu.node_order(row, col, int(num_nodes), order)
+    
+    return out.to(device)
+
+
+def relabel(perm, *indices):
+    """Relabel the given node-index vectors (or matrices) according to a
+    permutation returned by `node_order`.
+
+    Args:
+        perm (LongTensor): The node permutation.
+        indices (LongTensor): The tensors containing node indices.
+
+    Returns:
+        LongTensor or tuple: The relabeled tensors.
+    """
+    rank = torch.empty_like(perm)
+    rank[perm] = torch.arange(perm.size(0), dtype=perm.dtype, device=perm.device)
+    out = tuple(rank[index] for index in indices)
+
+    return out[0] if len(out) == 1 else out
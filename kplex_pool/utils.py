@@ -1,8 +1,10 @@
 import torch
 import numpy as np
 import torch_sparse
+import torch_scatter
 
 from kplex_pool.pool import cover_pool_node
+from kplex_pool.data import Cover, CustomDataset
 
 from torch_geometric.utils import degree
 
@@ -67,33 +69,95 @@ def count_duplicates(cover_index: torch.LongTensor, normalize=False):
     
     return duplicates
 
-def coverage(cover_index_list):
-    """Compute the coverage of the nodes in the highest level in a hierarchy
-    of graphs in terms of percentage of node covered in the lowest one.
+def compose_covers(cover_index_list, num_nodes=None, num_clusters=None):
+    """Compose the cover assignment matrices of a hierarchy of graphs, 
+    obtaining the assignment of the nodes in the lowest level to the nodes of
+    every higher level. The values of the composed matrices count the number
+    of ways in which a node is assigned to a cluster: pooling with their
+    product is the same as pooling with `"add"` at every level.
     
     Args:
-        cover_index_list (list): List of cover assignment matrices.
+        cover_index_list (list): List of cover assignment matrices, from the
+            lowest level to the highest one.
+        num_nodes (int, optional): Number of nodes in the lowest level.
+            Defaults to `None`.
+        num_clusters (list, optional): Number of clusters of every cover 
+            matrix. Defaults to `None`.
     
     Returns:
-        ndarray: Coverage of each node in the topmost level of the hierarchy.
+        list: A list of tuples `(index, value, num_clusters)`, one for each
+            cover matrix, containing the composed assignment of the nodes in
+            the lowest level to the clusters of that matrix, in sparse 
+            coordinate form, and the number of clusters.
     """
-    last_idx = cover_index_list[0].clone()
+    if num_nodes is None:
+        num_nodes = cover_index_list[0][0].max().item() + 1
+
+    if num_clusters is None:
+        num_clusters = [mat[1].max().item() + 1 for mat in cover_index_list]
+
+    last_idx = cover_index_list[0].long()
     last_val = torch.ones_like(last_idx[0], dtype=torch.float)
-    num_nodes = last_idx[0].max().item() + 1
-    num_clusters = last_idx[1].max().item() + 1
+    last_dim = num_clusters[0]
+    out = [(last_idx, last_val, last_dim)]
 
-    for mat in cover_index_list[1:]:
-        dim = mat[1].max().item() + 1
+    for mat, dim in zip(cover_index_list[1:], num_clusters[1:]):
+        mat = mat.long()
         last_idx, last_val = torch_sparse.spspmm(last_idx, last_val,
                                                  mat, torch.ones_like(mat[0], dtype=torch.float),
-                                                 num_nodes, num_clusters, dim)
-        num_clusters = dim
+                                                 num_nodes, last_dim, dim)
+        last_dim = dim
+        out.append((last_idx, last_val, last_dim))
+
+    return out
+
+def compose_hierarchy(hierarchy):
+    """Precompute, for every graph in a hierarchy, the composed assignment of
+    its nodes to the nodes of every coarsened graph (see `compose_covers`),
+    and the coverage of the latter.
     
-    last_val = torch.ones_like(last_val)
-    last_idx[0] = torch.zeros_like(last_idx[0])
-    _, coverage = torch_sparse.coalesce(last_idx, last_val, 1, num_clusters)
+    Args:
+        hierarchy (list): A list of datasets, as returned by 
+            `KPlexCover.get_representations`.
+    
+    Returns:
+        list: A list of `CustomDataset`s, one for each coarsened level of 
+            `hierarchy`. The l-th dataset contains, for every graph, a 
+            `Cover` with the composed assignment of the nodes of the input
+            graph to the nodes of the (l + 1)-th level (`"cover_index"`), 
+            its multiplicities (`"cover_attr"`), and the fraction of the
+            input nodes covered by every node of that level (`"coverage"`).
+    """
+    covers = hierarchy[:-1]
+    levels = [[] for _ in covers]
+
+    for idx in range(len(covers[0])):
+        graphs = [layer[idx] for layer in covers]
+        num_nodes = graphs[0].num_nodes
+        composed = compose_covers([data.cover_index for data in graphs], num_nodes,
+                                  [data.num_clusters for data in graphs])
+
+        for level, (index, value, clusters), data in zip(levels, composed, graphs):
+            counts = torch.bincount(index[1], minlength=clusters).float()
+            level.append(Cover(cover_index=index.to(data.cover_index.dtype), cover_attr=value,
+                               coverage=counts/num_nodes, num_clusters=clusters, num_nodes=num_nodes))
+
+    return [CustomDataset(level) for level in levels]
 
-    return coverage.numpy()/num_nodes
+def coverage(cover_index_list):
+    """Compute the coverage of the nodes in the highest level in a hierarchy
+    of graphs in terms of percentage of node covered in the lowest one.
+    
+    Args:
+        cover_index_list (list): List of cover assignment matrices.
+    
+    Returns:
+        ndarray: Coverage of each node in the topmost level of the hierarchy.
+    """
+    num_nodes = cover_index_list[0][0].max().item() + 1
+    index, _, num_clusters = compose_covers(cover_index_list, num_nodes)[-1]
+    
+    return torch.bincount(index[1], minlength=num_clusters).float().cpu().numpy()/num_nodes
 
 def node_covering_index(cover_index:torch.LongTensor, distribution=False, num_nodes=None):
     """Compute the node covering index of a given cover matrix, i.e., the
@@ -156,31 +220,68 @@ def hub_promotion(cover_index:torch.LongTensor, q=0.95, num_nodes=None, num_clus
         device=device
     )
 
-    out_index = torch.cat([masked_index, torch.stack([hub_index, hub_values])], dim=1)
+    hub_index = torch.stack([hub_index, hub_values]).to(cover_index.dtype)
+    out_index = torch.cat([masked_index, hub_index], dim=1)
     out_batch = None if batch is None else batch[out_index[0]] 
 
     return out_index, out_clusters, out_batch
 
-def add_node_features(dataset):
-    """Add degree features to a dataset.
+def add_node_features(dataset, encoding='degree', max_degree=None):
+    """Add degree features to a dataset. The degrees of all the graphs are
+    computed in a single pass over the collated edge index of the dataset,
+    using its slices.
     
     Args:
-        dataset (torch_geometric.Dataset): A graph dataset.
+        dataset (torch_geometric.InMemoryDataset): A graph dataset.
+        encoding (str, optional): Degree encoding (`"degree"`, the degree
+            clamped to `max_degree` and divided by it, or `"one_hot"`, the
+            one-hot encoding of the degree clamped to `max_degree`). Defaults
+            to `"degree"`.
+        max_degree (int, optional): Maximum encoded degree. Defaults to
+            `None` (the maximum degree in the dataset).
+
+    Raises:
+        ValueError: If provided an undefined encoding.
     
     Returns:
         torch_geometric.Dataset: The same dataset, with `x` containing the
-            degree vector of the nodes. 
+            encoded degree vector of the nodes. 
     """
-    max_degree = 0.
-    degrees = []
-    slices = [0]
+    if encoding not in {'degree', 'one_hot'}:
+        raise ValueError('Not a valid degree encoding: %s' % encoding)
+
+    data, slices = dataset.data, dataset.slices
+    edge_index = data.edge_index.long()
+    num_edges = slices['edge_index'][1:] - slices['edge_index'][:-1]
+    num_graphs = num_edges.size(0)
+    owner = torch.repeat_interleave(torch.arange(num_graphs, device=edge_index.device), num_edges)
+
+    if hasattr(data, '__num_nodes__'):
+        num_nodes = torch.tensor(data.__num_nodes__, dtype=torch.long, device=edge_index.device)
+    elif 'x' in slices:
+        num_nodes = slices['x'][1:] - slices['x'][:-1]
+    else:
+        num_nodes = torch.zeros(num_graphs, dtype=torch.long, device=edge_index.device)
+
+        if edge_index.numel() > 0:
+            num_nodes = torch_scatter.scatter_max(edge_index.max(0)[0] + 1, owner, dim_size=num_graphs)[0]
+
+    offset = num_nodes.cumsum(0) - num_nodes
+    deg = degree(edge_index[0] + offset[owner], int(num_nodes.sum()), torch.float)
+
+    if max_degree is None:
+        max_degree = max(deg.max().item(), 1.) if deg.numel() > 0 else 1.
+
+    deg = deg.clamp(max=max_degree)
+
+    if encoding == 'one_hot':
+        data.x = torch.nn.functional.one_hot(deg.long(), int(max_degree) + 1).float()
+    else:
+        data.x = deg.div_(max_degree).view(-1, 1)
 
-    for data in dataset:
-        degrees.append(degree(data.edge_index[0], data.num_nodes, torch.float))
-        max_degree = max(max_degree, degrees[-1].max().item())
-        slices.append(data.num_nodes)
+    slices['x'] = torch.cat([num_nodes.new_zeros(1), num_nodes.cumsum(0)])
 
-    dataset.data.x = torch.cat(degrees, dim=0).div_(max_degree).view(-1, 1)
-    dataset.slices['x'] = torch.tensor(slices, dtype=torch.long, device=dataset.data.x.device).cumsum(0)
+    if getattr(dataset, '__data_list__', None) is not None:
+        dataset.__data_list__ = None
 
     return dataset
@@ -9,10 +9,25 @@ ext_modules = [
     CppExtension('kplex_pool.kplex_cpu', ['cpu/kplex.cpp'], extra_compile_args=extra_compile_args),
     CppExtension('kplex_pool.pool_edges_cpu', ['cpu/pool_edges.cpp'], extra_compile_args=extra_compile_args),
     CppExtension('kplex_pool.cc_cpu', ['cpu/cc.cpp'], extra_compile_args=extra_compile_args),
+    CppExtension('kplex_pool.reorder_cpu', ['cpu/reorder.cpp'], extra_compile_args=extra_compile_args),
     CppExtension('kplex_pool.simplify_cpu', [
                      'cpu/simplify.cpp',
                      'cpu/disjoint_sets.cpp'
                  ], extra_compile_args=extra_compile_args),
+    CppExtension('kplex_pool.hierarchy_cpu', [
+                     'cpu/hierarchy.cpp',
+                     'cpu/kplex.cpp',
+                     'cpu/pool_edges.cpp',
+                     'cpu/simplify.cpp',
+                     'cpu/cc.cpp',
+                     'cpu/reorder.cpp',
+                     'cpu/disjoint_sets.cpp'
+                 ], extra_compile_args=extra_compile_args, define_macros=[('KPLEX_POOL_LIBRARY', None)]),
+    CppExtension('kplex_pool.ops_cpu', [
+                     'cpu/ops.cpp',
+                     'cpu/kplex.cpp',
+                     'cpu/pool_edges.cpp'
+                 ], extra_compile_args=extra_compile_args, define_macros=[('KPLEX_POOL_LIBRARY', None)]),
 ]
 cmdclass = {'build_ext': BuildExtension}
 
@@ -0,0 +1,56 @@
+import pytest
+import torch
+from itertools import product
+from kplex_pool import KPlexCover, cover_pool_edge, connected_components
+from torch_geometric.utils import erdos_renyi_graph
+from torch_sparse import SparseTensor
+
+
+ks = [1, 2, 3]
+forms = ['sparse', 'csr', 'coalesced']
+
+
+def to_form(edge_index, num_nodes, form):
+    adj = SparseTensor(row=edge_index[0], col=edge_index[1], sparse_sizes=(num_nodes, num_nodes))
+
+    if form == 'sparse':
+        return adj, {}
+
+    rowptr, col, _ = adj.csr()
+
+    if form == 'csr':
+        return (rowptr, col), {}
+
+    return torch.stack(adj.coo()[:2]), {'coalesced': True}
+
+
+def as_set(index):
+    return set(map(tuple, index.t().tolist()))
+
+
+@pytest.mark.parametrize('k,form', product(ks, forms))
+def test_adjacency_forms(k, form):
+    torch.manual_seed(0)
+    num_nodes = 30
+    edge_index = erdos_renyi_graph(num_nodes, 0.2)
+    edge_index = edge_index[:, torch.randperm(edge_index.size(1))]
+    adj, kwargs = to_form(edge_index, num_nodes, form)
+
+    index, clusters, _ = KPlexCover()(k, edge_index, num_nodes)
+    a_index, a_clusters, _ = KPlexCover()(k, adj, num_nodes, **kwargs)
+    n_index, n_clusters, _ = KPlexCover()(k, adj, num_nodes, self_loops=False, **kwargs)
+
+    assert clusters == a_clusters == n_clusters
+    assert as_set(index) == as_set(a_index) == as_set(n_index)
+
+    pooled = cover_pool_edge(index, edge_index, None, num_nodes, clusters)
+    a_pooled = cover_pool_edge(index, adj, None, num_nodes, clusters, **kwargs)
+
+    assert set(zip(*pooled[0].tolist(), pooled[1].tolist())) == \
+           set(zip(*a_pooled[0].tolist(), a_pooled[1].tolist()))
+
+    sparse_index = edge_index[:, edge_index[0] < 10]
+    adj, kwargs = to_form(sparse_index, num_nodes, form)
+
+    assert torch.equal(connected_components(sparse_index, num_nodes), 
+                       connected_components(adj, num_nodes, **kwargs))
@@ -0,0 +1,191 @@
+import pytest
+import torch
+from kplex_pool import KPlexCover
+from kplex_pool.data import Cover, CustomDataset, DenseDataset, CollatedDataset, BucketBatchSampler, BucketLoader, graph_sizes
+from kplex_pool.data import _pack_bits, _unpack_bits
+from torch_geometric.data import Data, Batch
+
+
+def graph(num_nodes):
+    row = torch.arange(num_nodes).repeat_interleave(num_nodes)
+    col = torch.arange(num_nodes).repeat(num_nodes)
+    mask = row != col
+
+    return Data(x=torch.rand(num_nodes, 3), y=torch.tensor([num_nodes % 2]),
+                edge_index=torch.stack([row[mask], col[mask]]), num_nodes=num_nodes)
+
+
+@pytest.mark.parametrize('covered', [False, True])
+def test_lazy_dense_dataset(covered):
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4]])
+
+    if covered:
+        dataset, _ = KPlexCover().process(dataset, 1, verbose=False)
+
+    eager = DenseDataset(dataset)
+    lazy = DenseDataset(dataset, lazy=True)
+
+    assert len(lazy) == len(eager) == len(dataset)
+
+    for idx in [torch.tensor([0, 1]), torch.tensor([4, 2, 0]), torch.tensor([1, 3]), slice(None)]:
+        expected, observed = eager[idx], lazy[idx]
+
+        for key in ['x', 'mask', 'adj', 'y'] + (['cover_index', 'cover_mask'] if covered else []):
+            assert torch.equal(expected[key], observed[key])
+
+    small = lazy[torch.tensor([0, 2])]
+
+    assert small.adj.size() == (2, 3, 3)
+    assert eager.data.adj.size() == (5, 12, 12)
+    assert lazy.data is None
+
+
+@pytest.mark.parametrize('shuffle,drop_last,bucket_size', [(False, False, None), (True, False, None), 
+                                                           (True, True, None), (True, False, 2)])
+def test_bucket_batch_sampler(shuffle, drop_last, bucket_size):
+    sizes = torch.stack([torch.randint(1, 50, (103,)), torch.randint(1, 10, (103,))], 1)
+    sampler = BucketBatchSampler(sizes, 8, shuffle, drop_last, bucket_size)
+    batches = list(sampler)
+    index = torch.tensor(sum(batches, []))
+
+    assert len(batches) == len(sampler)
+    assert sorted(len(batch) for batch in batches)[1:] == [8]*(len(batches) - 1)
+
+    if drop_last:
+        assert len(index) == 96 and len(index.unique()) == 96
+    else:
+        assert torch.equal(index.sort()[0], torch.arange(103))
+
+    if bucket_size is None:
+        order = sorted(batches, key=lambda batch: sizes[batch].tolist())
+        bounds = [(sizes[batch].min(0)[0][0], sizes[batch].max(0)[0][0]) for batch in order]
+
+        assert all(hi <= lo for (_, hi), (lo, _) in zip(bounds, bounds[1:]))
+
+
+def test_bucket_loader():
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4, 7, 2]])
+    samples = [(torch.tensor([i]), 0) for i in [6, 0, 3, 1]]
+    loader = BucketLoader(samples, graph_sizes(dataset), batch_size=2)
+    batches = [batch[0].view(-1).tolist() for batch in loader]
+
+    assert batches == [[6, 0], [1, 3]]
+
+
+@pytest.mark.parametrize('size', [1, 7, 8, 13, 64])
+def test_pack_bits(size):
+    x = torch.randint(0, 2, (3, 5, size)).float()
+    packed = _pack_bits(x)
+
+    assert packed.dtype == torch.uint8 and packed.size() == (3, 5, (size + 7) // 8)
+    assert torch.equal(_unpack_bits(packed, size), x)
+
+
+def test_packed_dense_dataset():
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4]])
+    dataset, _ = KPlexCover().process(dataset, 1, verbose=False)
+    dense = DenseDataset(dataset)
+    out = dense[torch.tensor([0, 3])]
+
+    assert dense.data.cover_index.dtype == torch.uint8
+    assert dense.data.cover_index.size(-1) == (dense.max_clusters + 7) // 8
+    assert out.cover_index.dtype == torch.float
+
+    for data, cover_index, cover_mask in zip([dataset[0], dataset[3]], out.cover_index, out.cover_mask):
+        assert cover_mask.sum().item() == data.num_clusters
+        assert torch.equal(cover_index.nonzero().t(), data.cover_index.long())
+
+
+def test_dense_dataset_buffers():
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4]])
+    dataset, _ = KPlexCover().process(dataset, 1, verbose=False)
+    dense = DenseDataset(dataset)
+    buffered = DenseDataset(dataset, reuse_buffers=True)
+
+    assert torch.equal(dense.graph_nodes, torch.tensor([3, 5, 2, 12, 4]))
+    assert torch.equal(dense.graph_clusters, torch.tensor([data.num_clusters for data in dataset]))
+
+    first = buffered[torch.tensor([3, 1])]
+    ptr = first.adj.data_ptr()
+
+    for idx in [torch.tensor([0, 2]), torch.tensor([4, 0, 1]), 2]:
+        expected, observed = dense[idx], buffered[idx]
+
+        for key in ['x', 'mask', 'adj', 'y', 'cover_index', 'cover_mask']:
+            assert torch.equal(expected[key], observed[key])
+
+        if torch.is_tensor(idx):
+            assert observed.adj.data_ptr() == ptr
+
+    assert dense[2].adj.size() == (2, 2)
+
+
+@pytest.mark.parametrize('index_dtype', [torch.long, torch.int])
+def test_collated_dataset(index_dtype):
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4]])
+    kplex_cover = KPlexCover(index_dtype=index_dtype)
+    hierarchy = kplex_cover.get_representations(dataset, [1, 2], verbose=False)
+
+    for layer in hierarchy:
+        collated = CollatedDataset(layer)
+
+        for idx in [torch.tensor([0, 1]), torch.tensor([4, 2, 0, 3]), torch.tensor([3])]:
+            expected = Batch.from_data_list([layer[i] for i in idx.tolist()])
+            observed = collated[idx]
+
+            assert set(expected.keys) - {'ptr'} <= set(observed.keys)
+            assert observed.num_graphs == idx.size(0)
+
+            for key in expected.keys:
+                assert torch.equal(expected[key], observed[key])
+
+    subset = CollatedDataset(hierarchy[0][torch.tensor([3, 1])])
+
+    assert torch.equal(subset.graph_nodes, torch.tensor([12, 5]))
+    assert torch.equal(subset[:].edge_index, Batch.from_data_list([dataset[3], dataset[1]]).edge_index)
+
+
+@pytest.mark.parametrize('index_dtype', [torch.long, torch.int])
+def test_collated_cover_fun(index_dtype):
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4]])
+    kplex_cover = KPlexCover(index_dtype=index_dtype)
+    idx = torch.tensor([1, 4, 0])
+    expected = kplex_cover.get_cover_fun([1, 2], dataset, dense=2)(None, idx)
+    observed = kplex_cover.get_cover_fun([1, 2], dataset, dense=2, collated=True)(None, idx)
+
+    for l, (exp, obs) in enumerate(zip(expected, observed)):
+        if l < 2:
+            exp = Batch.from_data_list(exp)
+
+        for key in exp.keys:
+            if key != 'ptr':
+                assert torch.equal(exp[key], obs[key])
+
+        for key in ['edge_index', 'cover_index']:
+            if l < 2 and key in obs:
+                assert exp[key].dtype == obs[key].dtype == torch.long
+
+
+def test_custom_dataset_metadata():
+    covers = [Cover(cover_index=torch.tensor([[0, 1, 1], [0, 0, 1]]), num_clusters=4, 
+                    edge_index=torch.tensor([[0, 1], [1, 0]]), num_nodes=3),
+              Cover(cover_index=torch.tensor([[0, 1], [0, 0]]), num_clusters=1,
+                    edge_index=torch.tensor([[0, 1], [1, 0]]), num_nodes=2)]
+    dataset = CustomDataset(covers)
+
+    assert dataset.metadata.tolist() == [[3, 4], [2, 1]]
+    assert [(data.num_nodes, data.num_clusters) for data in dataset] == [(3, 4), (2, 1)]
+
+    subset = dataset[torch.tensor([1, 0])]
+
+    assert subset.graph_nodes.tolist() == [2, 3]
+    assert subset.graph_clusters.tolist() == [1, 4]
+    assert torch.equal(Batch.from_data_list(list(dataset)).cover_index, 
+                       torch.tensor([[0, 1, 1, 3, 4], [0, 0, 1, 4, 4]]))
+    assert torch.equal(CollatedDataset(dataset)[:].cover_index, 
+                       torch.tensor([[0, 1, 1, 3, 4], [0, 0, 1, 4, 4]]))
+
+    plain = CustomDataset([Data(edge_index=torch.tensor([[0], [1]]), num_nodes=5)])
+
+    assert plain.metadata.tolist() == [[5, -1]]
+    assert plain[0].num_nodes == 5
@@ -0,0 +1,56 @@
+import pytest
+import torch
+from itertools import product
+from kplex_pool import KPlexCover, DynamicCover, cover_pool_edge
+from torch_geometric.utils import erdos_renyi_graph
+
+
+pool_ops = ['add', 'mul', 'max', 'min', 'mean']
+ks = [1, 2, 3]
+
+
+def to_dict(edge_index, weights):
+    return {tuple(e): w for e, w in zip(edge_index.t().tolist(), weights.tolist())}
+
+
+@pytest.mark.parametrize('k,edge_pool_op', product(ks, pool_ops))
+def test_dynamic_cover(k, edge_pool_op):
+    torch.manual_seed(42)
+    num_nodes = 30
+    edge_index = erdos_renyi_graph(num_nodes, 0.2)
+    edge_attr = torch.rand(edge_index.size(1))
+    dynamic = DynamicCover(KPlexCover(), k, edge_index, edge_attr, num_nodes, edge_pool_op)
+
+    for _ in range(10):
+        old_ids = set(dynamic.cluster_ids)
+        graph_index, graph_attr = dynamic.get_graph()
+        delete_index = graph_index[:, torch.randperm(graph_index.size(1))[:4]]
+        delete_index = torch.cat([delete_index, delete_index.flip(0)], dim=1)
+        insert_index = torch.randint(num_nodes, (2, 4))
+        insert_index = torch.cat([insert_index, insert_index.flip(0)], dim=1)
+        insert_attr = torch.rand(4).repeat(2)
+
+        removed, added = dynamic.update(insert_index, insert_attr, delete_index)
+
+        assert set(dynamic.cluster_ids) == (old_ids - set(removed)) | set(added)
+
+        graph_index, graph_attr = dynamic.get_graph()
+        cover_index, clusters, _ = dynamic.get_cover()
+        neighbors = [set() for _ in range(num_nodes)]
+
+        for u, v in graph_index.t().tolist():
+            if u != v:
+                neighbors[u].add(v)
+
+        assert cover_index[0].unique().size(0) == num_nodes
+
+        for c in range(clusters):
+            nodes = set(cover_index[0, cover_index[1] == c].tolist())
+            assert all(len(nodes) - len(nodes & neighbors[n]) <= k for n in nodes)
+
+        expected = to_dict(*cover_pool_edge(cover_index, graph_index, graph_attr, num_nodes, 
+                                            clusters, pool=edge_pool_op))
+        observed = to_dict(*dynamic.get_pooled_edges())
+
+        assert expected.keys() == observed.keys()
+        assert all(abs(expected[e] - observed[e]) < 1e-4 for e in expected)
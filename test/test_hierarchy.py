@@ -0,0 +1,267 @@
+import copy
+import pytest
+import torch
+from itertools import product
+from kplex_pool import KPlexCover, HierarchyTransform, LazyHierarchy
+from kplex_pool.data import CustomDataset, unpack_hierarchy
+from torch_geometric.data import Data, Batch, InMemoryDataset
+
+
+tests = [{
+    'row': [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3],  # clique
+    'col': [1, 2, 3, 0, 2, 3, 0, 1, 3, 0, 1, 2],
+}, {
+    'row': [0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4],  # 3-plex
+    'col': [1, 2, 3, 4, 0, 2, 3, 4, 0, 1, 3, 0, 1, 2, 0, 1],
+}, {
+    'row': [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 7],  # cycle + edge
+    'col': [1, 5, 0, 2, 1, 3, 2, 4, 3, 5, 4, 0, 7, 6],
+}]
+
+options = [
+    {},
+    {'q': 0.5},
+    {'simplify': True},
+    {'edge_pool_op': 'max', 'q': 0.9, 'simplify': True},
+]
+
+
+def edge_dict(data):
+    return {(r, c): w for r, c, w in zip(*data.edge_index.tolist(), data.edge_attr.tolist())}
+
+
+@pytest.mark.parametrize('ks,kwargs,reorder', product([[1], [1, 1], [2, 1, 1]], options, 
+                                                      [None, 'degree', 'rcm', 'bfs']))
+def test_native_hierarchy(ks, kwargs, reorder):
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), 
+                                  num_nodes=max(t['row']) + 1) for t in tests])
+    kplex_cover = KPlexCover(reorder=reorder)
+    expected = kplex_cover.get_representations(dataset, ks, verbose=False, **kwargs)
+    observed = kplex_cover.get_representations(dataset, ks, verbose=False, native=True, **kwargs)
+
+    assert len(expected) == len(observed) == len(ks) + 1
+
+    for exp_layer, obs_layer in zip(expected, observed):
+        assert len(exp_layer) == len(obs_layer)
+
+        for exp, obs in zip(exp_layer, obs_layer):
+            assert exp.num_nodes == obs.num_nodes
+
+            if 'cover_index' in exp:
+                assert exp.num_clusters == obs.num_clusters
+                assert torch.equal(exp.cover_index, obs.cover_index)
+
+            if exp.edge_attr is not None:
+                assert edge_dict(exp) == edge_dict(obs)
+
+
+def test_positional_process_args():
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), 
+                                  num_nodes=max(t['row']) + 1) for t in tests])
+    expected = KPlexCover().get_representations(dataset, [2, 1], False, edge_pool_op='max', q=0.5)
+    observed = KPlexCover().get_representations(dataset, [2, 1], False, 'max', 0.5)
+
+    for exp_layer, obs_layer in zip(expected, observed):
+        for exp, obs in zip(exp_layer, obs_layer):
+            if exp.edge_attr is not None:
+                assert edge_dict(exp) == edge_dict(obs)
+
+
+@pytest.mark.parametrize('ks,kwargs,native', product([[1], [2, 1, 1]], options, [False, True]))
+def test_int32_hierarchy(ks, kwargs, native):
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), 
+                                  num_nodes=max(t['row']) + 1) for t in tests])
+    expected = KPlexCover().get_representations(dataset, ks, verbose=False, native=native, **kwargs)
+    observed = KPlexCover(index_dtype=torch.int).get_representations(dataset, ks, verbose=False, 
+                                                                      native=native, **kwargs)
+
+    for exp_layer, obs_layer in zip(expected, observed):
+        for exp, obs in zip(exp_layer, obs_layer):
+            assert exp.num_nodes == obs.num_nodes
+
+            if 'cover_index' in exp:
+                assert obs.cover_index.dtype == torch.int
+                assert torch.equal(exp.cover_index, obs.cover_index.long())
+
+            if exp.edge_attr is not None:
+                assert edge_dict(exp) == edge_dict(obs)
+
+
+class GraphDataset(InMemoryDataset):
+    def __init__(self, root, pre_transform=None):
+        super(GraphDataset, self).__init__(root, pre_transform=pre_transform)
+        self.data, self.slices = torch.load(self.processed_paths[0])
+
+    @property
+    def raw_file_names(self):
+        return []
+
+    @property
+    def processed_file_names(self):
+        return ['data.pt']
+
+    def download(self):
+        pass
+
+    def process(self):
+        data_list = [Data(edge_index=torch.tensor([t['row'], t['col']]), num_nodes=max(t['row']) + 1) 
+                     for t in tests]
+
+        if self.pre_transform is not None:
+            data_list = [self.pre_transform(data) for data in data_list]
+
+        torch.save(self.collate(data_list), self.processed_paths[0])
+
+
+@pytest.mark.parametrize('ks,kwargs', product([[1], [2, 1, 1]], options))
+def test_hierarchy_transform(tmp_path, ks, kwargs):
+    kplex_cover = KPlexCover()
+    transform = HierarchyTransform(kplex_cover, ks, **kwargs)
+    GraphDataset(str(tmp_path), pre_transform=transform)
+    dataset = GraphDataset(str(tmp_path), pre_transform=transform)  # Loaded from disk.
+    expected = kplex_cover.get_representations(GraphDataset(str(tmp_path / 'plain')), ks, 
+                                               verbose=False, native=True, **kwargs)
+    observed = unpack_hierarchy(dataset)
+
+    assert len(expected) == len(observed) == len(ks) + 1
+
+    for exp_layer, obs_layer in zip(expected, observed):
+        for exp, obs in zip(exp_layer, obs_layer):
+            assert exp.num_nodes == obs.num_nodes
+
+            if 'cover_index' in exp:
+                assert exp.num_clusters == obs.num_clusters
+                assert torch.equal(exp.cover_index, obs.cover_index)
+
+            if exp.edge_attr is not None:
+                assert edge_dict(exp) == edge_dict(obs)
+
+    batch = Batch.from_data_list([dataset[0], dataset[1]])
+    
+    for l in range(len(ks)):
+        offset = dataset[0].level_nodes(l), dataset[0].level_nodes(l + 1)
+        cover_index = dataset[1]['cover_index_%d' % l]
+        
+        assert torch.equal(batch['cover_index_%d' % l][:, -cover_index.size(1):], 
+                           cover_index + torch.tensor([offset]).t())
+
+
+def test_hierarchy_transform_repr():
+    base = repr(HierarchyTransform(KPlexCover(), [2, 1]))
+    options = [{'reorder': 'rcm'}, {'max_kplex_size': 4}, {'max_expansions': 100}, 
+               {'time_budget': 1.}, {'index_dtype': torch.int}]
+
+    for kwargs in options:
+        assert repr(HierarchyTransform(KPlexCover(**kwargs), [2, 1])) != base
+
+
+@pytest.mark.parametrize('native', [False, True])
+def test_memo_hierarchy(native):
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), 
+                                  num_nodes=max(t['row']) + 1) for t in tests])
+    kplex_cover = KPlexCover(memo_size=16)
+    expected = kplex_cover.get_representations(dataset, [2, 1], verbose=False, native=native, q=0.5)
+    hits = kplex_cover.memo.hits
+    observed = kplex_cover.get_representations(dataset, [2, 1], verbose=False, native=native, q=0.5)
+
+    assert kplex_cover.memo.hits == hits + (len(tests) if native else 2*len(tests))
+
+    for exp_layer, obs_layer in zip(expected, observed):
+        for exp, obs in zip(exp_layer, obs_layer):
+            if 'cover_index' in exp:
+                assert torch.equal(exp.cover_index, obs.cover_index)
+
+            if exp.edge_attr is not None:
+                assert edge_dict(exp) == edge_dict(obs)
+
+
+def relabel(t, perm):
+    return {'row': [perm[r] for r in t['row']], 'col': [perm[c] for c in t['col']]}
+
+
+@pytest.mark.parametrize('native,dedup', product([False, True], ['exact', 'wl']))
+def test_dedup_hierarchy(native, dedup):
+    graphs = tests + [tests[1], relabel(tests[2], [7, 6, 5, 4, 3, 2, 1, 0]), tests[0]]
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), y=torch.tensor([i]),
+                                  num_nodes=max(t['row']) + 1) for i, t in enumerate(graphs)])
+    kplex_cover = KPlexCover()
+    expected = kplex_cover.get_representations(dataset, [2, 1], verbose=False, native=native)
+    observed = kplex_cover.get_representations(dataset, [2, 1], verbose=False, native=native, dedup=dedup)
+    duplicates = 2 if dedup == 'exact' else 3
+
+    assert kplex_cover.dedup_stats == {'graphs': 6, 'groups': 6 - duplicates, 'duplicates': duplicates}
+    assert len(observed) == len(expected)
+
+    for data, obs in zip(dataset, observed[0]):
+        assert torch.equal(data.y, obs.y)
+        assert torch.equal(data.edge_index, obs.edge_index)
+        assert obs.num_nodes == data.num_nodes
+        assert set(obs.cover_index[0].tolist()) == set(range(data.num_nodes))
+
+    for l, (exp_layer, obs_layer) in enumerate(zip(expected, observed)):
+        for idx, (exp, obs) in enumerate(zip(exp_layer, obs_layer)):
+            if dedup == 'wl' and idx == 4:
+                continue
+
+            if 'cover_index' in exp:
+                assert exp.num_clusters == obs.num_clusters
+                assert torch.equal(exp.cover_index, obs.cover_index)
+
+            if l > 0:
+                assert edge_dict(exp) == edge_dict(obs)
+
+    in_data, out_data = kplex_cover.process(dataset, 1, verbose=False, dedup=dedup)
+
+    assert len(in_data) == len(out_data) == len(dataset)
+    assert kplex_cover.dedup_stats['duplicates'] == duplicates
+    assert torch.equal(in_data[3].cover_index, in_data[1].cover_index)
+    assert edge_dict(out_data[3]) == edge_dict(out_data[1])
+
+
+@pytest.mark.parametrize('dense,collated', [(False, False), (False, True), (2, False)])
+def test_lazy_hierarchy(dense, collated):
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), 
+                                  num_nodes=max(t['row']) + 1) for t in tests])
+    kplex_cover = KPlexCover()
+    ks = [1, 2, 1]
+    expected = kplex_cover.get_cover_fun(ks, dataset, dense=dense, collated=collated, q=0.5)
+    hierarchy = kplex_cover.get_cover_fun(ks, dataset, dense=dense, collated=collated, q=0.5, lazy_layers=True)
+    idx = torch.tensor([2, 0])
+
+    assert isinstance(hierarchy, LazyHierarchy)
+    assert hierarchy.num_computed == 0
+
+    view = hierarchy(None, idx)
+    layers = view[:2]
+
+    assert len(view) == 4
+    assert hierarchy.num_computed == 1
+
+    deeper = view[:3]
+
+    assert hierarchy.num_computed == 2
+    assert hierarchy.layer(0) is hierarchy.layer(0)
+
+    observed = view[:]
+
+    assert hierarchy.num_computed == 3
+
+    for layer, exp, obs in zip(range(4), expected(None, idx), observed):
+        if layer < 2 and not collated:
+            exp, obs = Batch.from_data_list(exp), Batch.from_data_list(obs)
+
+        for key in ['edge_index', 'edge_attr', 'cover_index', 'adj', 'batch']:
+            if key in exp:
+                assert torch.equal(exp[key], obs[key])
+
+    with pytest.raises(IndexError):
+        hierarchy.layer(4)
+
+    assert copy.deepcopy(hierarchy) is hierarchy
+    assert copy.deepcopy(view) is view
+
+    with pytest.raises(ValueError):
+        kplex_cover.get_cover_fun(ks, dataset, lazy_layers=True, native=True)
+
+    with pytest.raises(ValueError):
+        kplex_cover.get_cover_fun(ks, dataset, lazy_layers=True, shared=True)
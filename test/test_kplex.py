@@ -1,7 +1,7 @@
 import pytest
 import torch
 from itertools import product
-from kplex_pool import KPlexCover
+from kplex_pool import KPlexCover, CliqueCover
 from kplex_pool.kplex_cpu import NodePriority
 
 
@@ -52,3 +52,134 @@ def test_kplex_cover(test, cover_priority, kplex_priority, device):
         
         assert nodes == edge_index.max().item() + 1
         assert batch.size(0) == clusters
+
+
+@pytest.mark.parametrize('test,cover_priority,kplex_priority,device',
+                         product(tests, cover_priorities, kplex_priorities, devices))
+def test_kplex_cover_multi_k(test, cover_priority, kplex_priority, device):
+    if 'random' in {cover_priority, kplex_priority}:
+        pytest.skip("Random priorities are not comparable across calls.")
+
+    edge_index = torch.tensor([test['row'], test['col']], dtype=torch.long, device=device)
+    kplex_cover = KPlexCover(cover_priority, kplex_priority)
+    ks = list(range(1, test['k'] + 1))
+    covers = kplex_cover(ks, edge_index)
+
+    assert len(covers) == len(ks)
+
+    for k, (index, clusters, batch) in zip(ks, covers):
+        s_index, s_clusters, s_batch = kplex_cover(k, edge_index)
+
+        assert clusters == s_clusters
+        assert torch.equal(batch, s_batch)
+        assert set(map(tuple, index.t().tolist())) == set(map(tuple, s_index.t().tolist()))
+
+
+@pytest.mark.parametrize('test,kplex_priority,device',
+                         product(tests, kplex_priorities, devices))
+def test_kplex_cover_core_pruning(test, kplex_priority, device):
+    if kplex_priority == 'random' or kplex_priority.endswith('candidates'):
+        pytest.skip("Candidate-dependent priorities are affected by pruning.")
+
+    edge_index = torch.tensor([test['row'], test['col']], dtype=torch.long, device=device)
+
+    for k in range(1, test['k'] + 1):
+        index, clusters, _ = KPlexCover(kplex_priority=kplex_priority)(k, edge_index)
+        p_index, p_clusters, _ = KPlexCover(kplex_priority=kplex_priority, core_pruning=True)(k, edge_index)
+
+        assert clusters == p_clusters
+        assert set(map(tuple, index.t().tolist())) == set(map(tuple, p_index.t().tolist()))
+
+
+@pytest.mark.parametrize('test,device', product(tests, devices))
+def test_kplex_cover_bounded(test, device):
+    edge_index = torch.tensor([test['row'], test['col']], dtype=torch.long, device=device)
+    nodes = edge_index.max().item() + 1
+    k = test['k']
+
+    index, clusters, _, stats = KPlexCover(max_kplex_size=2)(k, edge_index, return_stats=True)
+
+    assert index[1].bincount().max().item() <= 2
+    assert index[0].unique().size(0) == nodes
+    assert stats['size_cap'] > 0
+
+    index, clusters, _, stats = KPlexCover(max_expansions=1)(k, edge_index, return_stats=True)
+
+    assert index[1].bincount().max().item() <= 2
+    assert index[0].unique().size(0) == nodes
+    assert stats['expansion_cap'] > 0
+
+    index, clusters, _, stats = KPlexCover(time_budget=1e-12)(k, edge_index, return_stats=True)
+
+    assert index[0].unique().size(0) == nodes
+    assert clusters == stats['timeout_singletons'] == nodes
+
+    _, _, _, stats = KPlexCover()(k, edge_index, return_stats=True)
+
+    assert not any(stats.values())
+
+
+@pytest.mark.parametrize('test,device', product(tests, devices))
+def test_kplex_cover_int32(test, device):
+    edge_index = torch.tensor([test['row'], test['col']], dtype=torch.long, device=device)
+    kplex_cover = KPlexCover(index_dtype=torch.int)
+
+    for k in range(1, test['k'] + 1):
+        index, clusters, _ = KPlexCover()(k, edge_index)
+        i_index, i_clusters, _ = kplex_cover(k, edge_index)
+        c_index, c_clusters, _ = kplex_cover(k, edge_index, coalesced=True)
+
+        assert i_index.dtype == c_index.dtype == torch.int
+        assert clusters == i_clusters == c_clusters
+        assert torch.equal(index, i_index.long())
+        assert torch.equal(index, c_index.long())
+
+
+def test_kplex_cover_index_dtype():
+    with pytest.raises(ValueError):
+        KPlexCover(index_dtype=torch.float)
+
+
+def test_kplex_cover_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    edge_index = torch.randint(200, (2, 2000)).unique(dim=1)
+    edge_index = torch.cat([edge_index, edge_index.flip(0)], dim=1)
+    kplex_cover = KPlexCover()
+    expected = [kplex_cover(k, edge_index, 200)[0] for k in range(1, 5)]
+
+    with ThreadPoolExecutor(4) as pool:
+        observed = list(pool.map(lambda k: kplex_cover(k, edge_index, 200)[0], range(1, 5)))
+        randoms = list(pool.map(lambda k: KPlexCover('random', 'random')(k, edge_index, 200), range(1, 5)))
+
+    for exp, obs in zip(expected, observed):
+        assert torch.equal(exp, obs)
+
+    for index, _, _ in randoms:
+        assert index[0].unique().size(0) == 200
+
+
+def test_kplex_cover_memo():
+    edge_index = torch.tensor([tests[1]['row'], tests[1]['col']])
+    kplex_cover = KPlexCover(memo_size=2)
+    index, clusters, _ = kplex_cover(1, edge_index)
+    index.add_(1)
+
+    m_index, m_clusters, _ = kplex_cover(1, edge_index.clone())
+    e_index, e_clusters, _ = KPlexCover()(1, edge_index)
+
+    assert kplex_cover.memo.stats == {'hits': 1, 'misses': 1, 'size': 1}
+    assert m_clusters == e_clusters
+    assert torch.equal(m_index, e_index)
+
+    kplex_cover(2, edge_index)
+    kplex_cover(3, edge_index)
+    kplex_cover(1, edge_index)
+
+    assert kplex_cover.memo.stats == {'hits': 1, 'misses': 4, 'size': 2}
+
+    clique_cover = CliqueCover(memo_size=1)
+    covers = [clique_cover(edge_index) for _ in range(2)]
+
+    assert clique_cover.memo.stats == {'hits': 1, 'misses': 1, 'size': 1}
+    assert torch.equal(covers[0][0], covers[1][0])
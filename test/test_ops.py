@@ -0,0 +1,67 @@
+import pytest
+import torch
+from itertools import product
+from typing import List, Tuple
+from kplex_pool import KPlexCover, ops
+from kplex_pool.pool import cover_pool_node, cover_pool_edge
+
+
+tests = [{
+    'row': [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3],  # clique
+    'col': [1, 2, 3, 0, 2, 3, 0, 1, 3, 0, 1, 2],
+}, {
+    'row': [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 7],  # cycle + edge
+    'col': [1, 5, 0, 2, 1, 3, 2, 4, 3, 5, 4, 0, 7, 6],
+}]
+
+
+class Pool(torch.nn.Module):
+    def forward(self, edge_index: torch.Tensor, x: torch.Tensor, k: int, 
+                pool: str) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        num_nodes = x.size(0)
+        cover_index = ops.kplex_cover(edge_index, k, num_nodes)
+        num_clusters = int(cover_index[1].max()) + 1
+        weights = torch.ones(edge_index.size(1), dtype=x.dtype)
+        pooled_index, pooled_attr = ops.cover_pool_edge(cover_index, edge_index, weights, num_nodes, pool)
+
+        return ops.cover_pool_node(cover_index, x, num_clusters, pool), pooled_index, pooled_attr
+
+
+@pytest.mark.parametrize('test,k,pool', product(tests, [1, 2], ['add', 'mean', 'max', 'min']))
+def test_scripted_ops(test, k, pool):
+    edge_index = torch.tensor([test['row'], test['col']])
+    x = torch.randn(max(test['row']) + 1, 3)
+    module = torch.jit.script(Pool())
+    x_out, index_out, attr_out = module(edge_index, x, k, pool)
+
+    cover_index, clusters, _ = KPlexCover()(k, edge_index)
+    pooled_index, pooled_attr = cover_pool_edge(cover_index, edge_index, pool=pool)
+
+    assert torch.allclose(x_out, cover_pool_node(cover_index, x, clusters, pool))
+    assert torch.equal(index_out, pooled_index)
+    assert torch.allclose(attr_out, pooled_attr)
+
+
+@pytest.mark.parametrize('pool,dense', product(['add', 'mean', 'max', 'min'], [False, True]))
+def test_cover_pool_node_grad(pool, dense):
+    cover_index = torch.tensor([[0, 1, 2, 2, 3, 4], [0, 0, 0, 1, 1, 2]])
+    x = torch.randn(5, 3, dtype=torch.double, requires_grad=True)
+
+    if dense:
+        cover_index = torch.sparse_coo_tensor(cover_index, torch.ones(6), (5, 3)).to_dense().double()
+
+    expected = cover_pool_node(cover_index, x, 3, pool, dense)
+    observed = ops.cover_pool_node(cover_index, x, 3, pool, dense)
+
+    assert torch.allclose(expected, observed)
+    assert torch.autograd.gradcheck(lambda x: ops.cover_pool_node(cover_index, x, 3, pool, dense), (x,))
+
+
+def test_invalid_ops():
+    edge_index = torch.tensor([tests[0]['row'], tests[0]['col']])
+
+    with pytest.raises(RuntimeError):
+        ops.kplex_cover(edge_index, 1, 4, ['min_foo'])
+
+    with pytest.raises(RuntimeError):
+        ops.cover_pool_node(edge_index, torch.randn(4, 3), pool='foo')
@@ -0,0 +1,117 @@
+import threading
+import pytest
+import torch
+from torch.utils.data import TensorDataset
+from kplex_pool import KPlexCover
+from kplex_pool.data import CustomDataset, BucketLoader
+from kplex_pool.prefetch import HierarchyPrefetcher, PrefetchLoader, SharedHierarchy, HierarchyLoader
+from torch_geometric.data import Data, Batch
+
+
+def graph(num_nodes):
+    row = torch.arange(num_nodes).repeat_interleave(num_nodes)
+    col = torch.arange(num_nodes).repeat(num_nodes)
+    mask = row != col
+
+    return Data(x=torch.rand(num_nodes, 3), edge_index=torch.stack([row[mask], col[mask]]), num_nodes=num_nodes)
+
+
+@pytest.mark.parametrize('max_pending', [1, 3])
+def test_prefetch_loader(max_pending):
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4, 6, 7]])
+    cover_fun = KPlexCover().get_cover_fun([1, 1], dataset, dense=2)
+    threads = set()
+
+    def traced_fun(ds, idx):
+        threads.add(threading.get_ident())
+        return cover_fun(ds, idx)
+
+    prefetcher = HierarchyPrefetcher(traced_fun, dataset, max_pending)
+    samples = TensorDataset(torch.arange(len(dataset)).view(-1, 1))
+    loader = PrefetchLoader(samples, prefetcher, batch_size=2)
+
+    assert len(loader) == 4
+
+    for batch in loader:
+        idx = batch[0].view(-1)
+        expected = cover_fun(dataset, idx)
+        observed = prefetcher(dataset, idx)
+
+        for exp, obs in zip(expected[:2], observed[:2]):
+            assert [data.num_nodes for data in exp] == [data.num_nodes for data in obs]
+            assert all(torch.equal(e.edge_index, o.edge_index) for e, o in zip(exp, obs))
+        
+        assert torch.equal(expected[2].adj, observed[2].adj)
+
+    assert prefetcher.hits == 4 and prefetcher.misses == 0
+    assert threading.get_ident() not in threads
+
+    prefetcher(dataset, torch.tensor([0]))
+
+    assert prefetcher.misses == 1
+
+
+def test_prefetch_bounded():
+    calls = []
+    prefetcher = HierarchyPrefetcher(lambda ds, idx: calls.append(idx.tolist()) or idx.tolist(), max_pending=2)
+
+    for i in range(4):
+        prefetcher.prefetch(torch.tensor([i]))
+
+    assert len(prefetcher._pending) == 2
+    assert prefetcher(None, torch.tensor([3])) == [3]
+    assert prefetcher(None, torch.tensor([0])) == [0]
+    assert prefetcher.hits == 1 and prefetcher.misses == 1
+
+    with pytest.raises(ValueError):
+        HierarchyPrefetcher(lambda ds, idx: None, max_pending=0)
+
+
+def test_prefetch_bucket_loader():
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4, 6, 7]])
+    prefetcher = HierarchyPrefetcher(lambda ds, idx: idx.tolist(), dataset)
+    samples = [(torch.tensor([i]), 0) for i in range(len(dataset))]
+    loader = PrefetchLoader(samples, prefetcher, loader=BucketLoader, sizes=dataset.graph_nodes, batch_size=3)
+    batches = [prefetcher(dataset, batch[0].view(-1)) for batch in loader]
+
+    assert batches == [[2, 0, 4], [1, 5, 6], [3]]
+    assert prefetcher.hits == 3
+
+
+@pytest.mark.parametrize('collated,num_workers', [(False, 0), (False, 2), (True, 0), (True, 2)])
+def test_shared_hierarchy(collated, num_workers):
+    dataset = CustomDataset([graph(n) for n in [3, 5, 2, 12, 4, 6, 7]])
+    kplex_cover = KPlexCover()
+    cover_fun = kplex_cover.get_cover_fun([1, 1], dataset, dense=2, collated=collated)
+    shared = kplex_cover.get_cover_fun([1, 1], dataset, dense=2, collated=collated, shared=True)
+
+    assert isinstance(shared, SharedHierarchy)
+    assert all(item.is_shared() for _, item in shared.layers[0].data)
+    assert shared.layers[2].data.adj.is_shared()
+
+    samples = TensorDataset(torch.arange(len(dataset)).view(-1, 1))
+    loader = HierarchyLoader(samples, shared, batch_size=3, num_workers=num_workers)
+    count = 0
+
+    for batch in loader:
+        idx = batch[0].view(-1)
+        expected = cover_fun(None, idx)
+
+        assert len(shared._ready) == 1
+
+        observed = shared(None, idx)
+        count += 1
+
+        assert len(shared._ready) == 0
+        assert all(isinstance(layer, Batch) for layer in observed)
+
+        for exp, obs in zip(expected[:2], observed[:2]):
+            if not collated:
+                exp = Batch.from_data_list(exp)
+
+            assert torch.equal(exp.edge_index, obs.edge_index)
+            assert torch.equal(exp.cover_index, obs.cover_index)
+
+        assert torch.equal(expected[2].adj, observed[2].adj)
+
+    assert count == len(loader) == 3
@@ -0,0 +1,65 @@
+import pytest
+import torch
+from itertools import product
+from kplex_pool import KPlexCover, cover_pool_edge
+from kplex_pool.reorder import node_order, relabel
+from torch_geometric.utils import erdos_renyi_graph
+
+
+methods = ['degree', 'rcm', 'bfs']
+ks = [1, 2, 3]
+
+
+@pytest.mark.parametrize('method,k', product(methods, ks))
+def test_reorder(method, k):
+    torch.manual_seed(0)
+    num_nodes = 40
+    edge_index = erdos_renyi_graph(num_nodes, 0.15)
+    perm = node_order(edge_index, num_nodes, method)
+
+    assert torch.equal(perm.sort()[0], torch.arange(num_nodes))
+    assert torch.equal(perm[relabel(perm, torch.arange(num_nodes))], torch.arange(num_nodes))
+
+    cover_index, clusters, _ = KPlexCover(reorder=method)(k, edge_index, num_nodes)
+    neighbors = [set() for _ in range(num_nodes)]
+
+    for u, v in edge_index.t().tolist():
+        neighbors[u].add(v)
+
+    assert cover_index[0].unique().size(0) == num_nodes
+
+    for c in range(clusters):
+        nodes = set(cover_index[0, cover_index[1] == c].tolist())
+        assert all(len(nodes) - len(nodes & neighbors[n]) <= k for n in nodes)
+
+    expected = cover_pool_edge(cover_index, edge_index, None, num_nodes, clusters)
+    observed = cover_pool_edge(cover_index, edge_index, None, num_nodes, clusters, reorder=method)
+
+    assert set(zip(*expected[0].tolist(), expected[1].tolist())) == \
+           set(zip(*observed[0].tolist(), observed[1].tolist()))
+
+
+@pytest.mark.parametrize('method', methods)
+def test_reorder_coalesced(method):
+    torch.manual_seed(0)
+    num_nodes = 40
+    edge_index = erdos_renyi_graph(num_nodes, 0.15)
+    edge_index = edge_index[:, (edge_index[0]*num_nodes + edge_index[1]).argsort()]
+    neighbors = [set() for _ in range(num_nodes)]
+
+    for u, v in edge_index.t().tolist():
+        neighbors[u].add(v)
+
+    cover_index, clusters, _ = KPlexCover(reorder=method)(2, edge_index, num_nodes, coalesced=True)
+
+    assert cover_index[0].unique().size(0) == num_nodes
+
+    for c in range(clusters):
+        nodes = set(cover_index[0, cover_index[1] == c].tolist())
+        assert all(len(nodes) - len(nodes & neighbors[n]) <= 2 for n in nodes)
+
+    expected = cover_pool_edge(cover_index, edge_index, None, num_nodes, clusters, coalesced=True)
+    observed = cover_pool_edge(cover_index, edge_index, None, num_nodes, clusters, reorder=method, coalesced=True)
+
+    assert set(zip(*expected[0].tolist(), expected[1].tolist())) == \
+           set(zip(*observed[0].tolist(), observed[1].tolist()))
@@ -0,0 +1,76 @@
+import pytest
+import torch
+from kplex_pool import KPlexCover
+from kplex_pool.pool import cover_pool_node
+from kplex_pool.data import CustomDataset
+from kplex_pool.utils import compose_covers, compose_hierarchy, coverage, add_node_features
+from torch_geometric.data import Data
+
+
+tests = [{
+    'row': [0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4],  # 3-plex
+    'col': [1, 2, 3, 4, 0, 2, 3, 4, 0, 1, 3, 0, 1, 2, 0, 1],
+}, {
+    'row': [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 7],  # cycle + edge
+    'col': [1, 5, 0, 2, 1, 3, 2, 4, 3, 5, 4, 0, 7, 6],
+}]
+
+
+@pytest.mark.parametrize('ks', [[1], [1, 1], [2, 1, 1]])
+def test_compose_hierarchy(ks):
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]), 
+                                  num_nodes=max(t['row']) + 1) for t in tests])
+    hierarchy = KPlexCover().get_representations(dataset, ks, verbose=False)
+    levels = compose_hierarchy(hierarchy)
+
+    assert len(levels) == len(ks)
+
+    for idx in range(len(dataset)):
+        x = torch.randn(dataset[idx].num_nodes, 3)
+        out = x
+
+        for l, level in enumerate(levels):
+            cover = hierarchy[l][idx]
+            out = cover_pool_node(cover.cover_index, out, cover.num_clusters)
+            composed = level[idx]
+            index, value = composed.cover_index, composed.cover_attr
+            pooled = torch.zeros(composed.num_clusters, 3).index_add_(0, index[1], x[index[0]]*value.view(-1, 1))
+            cover_list = [hierarchy[i][idx].cover_index for i in range(l + 1)]
+
+            assert composed.num_clusters == cover.num_clusters
+            assert torch.allclose(out, pooled)
+            assert torch.allclose(composed.coverage, torch.from_numpy(coverage(cover_list)))
+
+
+def test_compose_covers():
+    covers = [torch.tensor([[0, 1, 1, 2], [0, 0, 1, 1]]), torch.tensor([[0, 1], [0, 0]])]
+    (i0, v0, c0), (i1, v1, c1) = compose_covers(covers)
+
+    assert c0 == 2 and c1 == 1
+    assert torch.equal(i0, covers[0]) and torch.equal(v0, torch.ones(4))
+    assert i1.tolist() == [[0, 1, 2], [0, 0, 0]]
+    assert v1.tolist() == [1., 2., 1.]
+
+
+@pytest.mark.parametrize('encoding,max_degree,num_nodes', [('degree', None, True), ('degree', None, False),
+                                                          ('degree', 2, True), ('one_hot', None, True), 
+                                                          ('one_hot', 3, False)])
+def test_add_node_features(encoding, max_degree, num_nodes):
+    graphs = tests + [{'row': [0, 1], 'col': [1, 0]}]
+    dataset = CustomDataset([Data(edge_index=torch.tensor([t['row'], t['col']]),
+                                  **({'num_nodes': max(t['row']) + 1} if num_nodes else {})) for t in graphs])
+    list(dataset)
+    dataset = add_node_features(dataset, encoding, max_degree)
+    degrees = [torch.bincount(torch.tensor(t['row'])).float() for t in graphs]
+    top = max(d.max().item() for d in degrees) if max_degree is None else max_degree
+
+    for data, deg in zip(dataset, degrees):
+        deg = deg.clamp(max=top)
+
+        if encoding == 'one_hot':
+            assert torch.equal(data.x, torch.eye(int(top) + 1)[deg.long()])
+        else:
+            assert torch.allclose(data.x, deg.view(-1, 1)/top)
+
+    with pytest.raises(ValueError):
+        add_node_features(dataset, 'log')